@@ -0,0 +1,44 @@
+"""
+Compares card lookups through CardCatalog against the linear scan of util.get_card_entry.
+
+Run with: uv run python -m benchmarks.bench_catalog
+"""
+
+import random
+
+from benchmarks.common import load_bench_cards, report, timeit
+from src.catalog import CardCatalog
+from src.util import get_card_entry
+
+
+def main():
+    cards = load_bench_cards()
+    rng = random.Random(1)
+
+    # Mix of hits in different parts of the list and misses.
+    queries = [c["name"].lower() for c in rng.sample(cards, min(50, len(cards)))]
+    queries += ["definitely not a card"] * 10
+
+    def scan():
+        for q in queries:
+            get_card_entry(q, cards)
+
+    catalog = CardCatalog(cards)
+
+    def indexed():
+        for q in queries:
+            catalog.get(q)
+
+    print(f"Lookups of {len(queries)} card names:")
+    build = timeit(lambda: CardCatalog(cards), repeat=5)
+    linear = timeit(scan, repeat=3) / len(queries)
+    lookup = timeit(indexed, repeat=5, number=20) / len(queries)
+
+    report("CardCatalog build (once)", build)
+    report("get_card_entry scan (per lookup)", linear)
+    report("CardCatalog.get (per lookup)", lookup)
+    print(f"  speedup per lookup: {linear / lookup:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
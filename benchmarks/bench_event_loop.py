@@ -0,0 +1,80 @@
+"""
+Measures event loop lag while several deck requests are in flight.
+
+Deck commands are resolved with a fake browser that takes half a second per page,
+first directly on the event loop as before and then through BaseCommand.invoke.
+
+Run with: uv run python -m benchmarks.bench_event_loop
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeBrowser, fake_message
+from src.browser import BrowserPool
+import src.curiosa as curiosa
+from src.commands.deck import DeckCommand
+
+IN_FLIGHT = 4
+POOL_SIZE = 2
+TICK = 0.01
+
+
+async def measure(resolve) -> tuple[float, float]:
+    """
+    Returns the wall clock time and the worst event loop lag while resolving the decks.
+    """
+    worst_lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal worst_lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(TICK)
+            worst_lag = max(worst_lag, time.perf_counter() - start - TICK)
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(resolve(str(i)) for i in range(IN_FLIGHT)))
+    elapsed = time.perf_counter() - start
+
+    done = True
+    await task
+    return elapsed, worst_lag
+
+
+def main():
+    # Measure the browser path, decks are otherwise first requested over HTTP.
+    curiosa.request_deck_http = lambda url, include_maybe=False: None
+
+    browsers = BrowserPool(size=POOL_SIZE, factory=lambda: FakeBrowser(0.5))
+    command = DeckCommand(["deck"], browsers)
+    executor = ThreadPoolExecutor()
+    msg = fake_message()
+
+    async def on_loop(deck_id: str):
+        return command.get_content(msg, [deck_id])
+
+    async def in_executor(deck_id: str):
+        return await command.invoke(msg, [deck_id], executor)
+
+    print(
+        f"{IN_FLIGHT} deck requests in flight, {POOL_SIZE} browsers, 0.5 s per page load:"
+    )
+    for label, resolve in [("on event loop", on_loop), ("in executor", in_executor)]:
+        elapsed, lag = asyncio.run(measure(resolve))
+        print(
+            f"  {label:<20} total {elapsed:5.2f} s   worst loop lag {lag * 1e3:8.1f} ms"
+        )
+
+    executor.shutdown()
+    print(f"  pool metrics: {browsers.metrics()}")
+    browsers.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares Trie.fuzzy_match against the SequenceMatcher scan it replaced on misspelled names.
+
+Reports latency percentiles and checks that the best suggestion of the fuzzy index
+is at least as good as the one the scan gave.
+
+Run with: uv run python -m benchmarks.bench_fuzzy
+"""
+
+import random
+import statistics
+import string
+import time
+from difflib import SequenceMatcher as SM
+
+from benchmarks.common import load_bench_cards
+from src.trie import Trie
+from src.util import get_url_form
+
+
+def legacy_fuzzy_match(card_name: str, word_list: list[str]):
+    """
+    Trie.fuzzy_match before the fuzzy index was added.
+    """
+
+    def filter_func(s1, s2):
+        s1_len = min(4, len(s1))
+        s2_len = min(s1_len, len(s2))
+
+        for i in range(s1_len):
+            if s1[i] in s2[:s2_len]:
+                return True
+
+        return False
+
+    pruned_list = list(filter(lambda x: filter_func(card_name, x), word_list))
+    matched_words = [(SM(None, card_name, word).ratio(), word) for word in pruned_list]
+
+    if len(matched_words) == 0:
+        return None
+
+    best_match = max(matched_words)
+    return best_match if best_match[0] > 0.5 else None
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    """
+    Applies a typical typo to a name: a dropped, doubled, swapped or wrong letter.
+    """
+    if len(name) < 3:
+        return name + rng.choice(string.ascii_lowercase)
+
+    i = rng.randrange(1, len(name) - 1)
+    kind = rng.choice(["drop", "double", "swap", "replace", "drop_word"])
+
+    if kind == "drop":
+        return name[:i] + name[i + 1 :]
+    if kind == "double":
+        return name[:i] + name[i] + name[i:]
+    if kind == "swap":
+        return name[: i - 1] + name[i] + name[i - 1] + name[i + 1 :]
+    if kind == "replace":
+        return name[:i] + rng.choice(string.ascii_lowercase) + name[i + 1 :]
+
+    # Users often leave out the first word of a longer name.
+    words = name.split("_")
+    return "_".join(words[1:]) if len(words) > 1 else name[:-1]
+
+
+def percentiles(samples: list[float]) -> str:
+    q = statistics.quantiles(samples, n=100)
+    return f"p50 {q[49] * 1e3:7.2f} ms  p95 {q[94] * 1e3:7.2f} ms  p99 {q[98] * 1e3:7.2f} ms"
+
+
+def main():
+    cards = load_bench_cards()
+    names = list(dict.fromkeys(get_url_form(card["name"]) for card in cards))
+    trie = Trie(names)
+
+    rng = random.Random(3)
+    queries = [misspell(name, rng) for name in rng.choices(names, k=300)]
+
+    legacy_times, index_times = [], []
+    worse = 0
+    same = 0
+
+    for query in queries:
+        start = time.perf_counter()
+        legacy = legacy_fuzzy_match(query, trie.word_list)
+        legacy_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        indexed = trie.fuzzy_match(query)
+        index_times.append(time.perf_counter() - start)
+
+        legacy_score = legacy[0] if legacy else 0.0
+        index_score = indexed[0] if indexed else 0.0
+
+        if index_score < legacy_score:
+            worse += 1
+        elif legacy == indexed:
+            same += 1
+
+    print(f"Fuzzy matching {len(queries)} misspelled names against {len(names)} words:")
+    print(f"  {'SequenceMatcher scan':<24} {percentiles(legacy_times)}")
+    print(f"  {'FuzzyIndex':<24} {percentiles(index_times)}")
+    print(f"  same suggestion: {same}/{len(queries)}")
+    print(f"  better suggestion: {len(queries) - same - worse}/{len(queries)}")
+    print(f"  worse suggestion: {worse}/{len(queries)}")
+
+
+if __name__ == "__main__":
+    main()
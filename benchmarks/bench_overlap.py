@@ -0,0 +1,80 @@
+"""
+Compares the multiset overlap engine against the nested loop overlap it replaces.
+
+Decks are synthetic 60 and 300 card decks drawn from the card list, with a shared core so that
+the decks actually overlap.
+
+Run with: uv run python -m benchmarks.bench_overlap
+"""
+
+import random
+
+from benchmarks.common import load_bench_cards, report, timeit
+from src import overlap
+
+DECK_COUNTS = [2, 3, 8]
+DECK_SIZES = [60, 300]
+SECTIONS = ["Avatar", "Aura", "Artifact", "Minion", "Magic", "Site"]
+
+
+def legacy_overlap_in_decks(*decks):
+    """
+    The nested loop overlap, kept here for comparison.
+    """
+    base = decks[0]
+    overlapping = {}
+    for deck in decks[1 : len(decks)]:
+        for k, v in deck.items():
+            found_overlaps = []
+
+            if k not in overlapping:
+                overlapping[k] = []
+
+            if k not in base:
+                continue
+
+            for i, e in enumerate(overlapping[k]):
+                for ve in v:
+                    if ve[0] == e[0]:
+                        overlapping[k][i] = (e[0], min(e[1], ve[1]))
+                        found_overlaps.append(e[0])
+
+            for e in base[k]:
+                for ve in v:
+                    if ve[0] == e[0] and ve[0] not in found_overlaps:
+                        overlapping[k].append((ve[0], min(e[1], ve[1])))
+
+    return overlapping
+
+
+def synthetic_deck(
+    rng: random.Random, core: list[str], names: list[str], size: int
+) -> dict:
+    cards = core + rng.sample(names, size - len(core))
+    deck = {}
+    for name in cards:
+        section = SECTIONS[len(name) % len(SECTIONS)]
+        deck.setdefault(section, []).append((name, str(rng.randint(1, 4))))
+    return deck
+
+
+def main():
+    names = [card["name"] for card in load_bench_cards()]
+    rng = random.Random(0)
+
+    for size in DECK_SIZES:
+        core = rng.sample(names, size // 2)
+        for count in DECK_COUNTS:
+            decks = [synthetic_deck(rng, core, names, size) for _ in range(count)]
+            print(f"{count} decks of {size} cards:")
+            for label, func in [
+                ("nested loops", legacy_overlap_in_decks),
+                ("multiset intersection", overlap.intersection),
+                ("multiset union", overlap.union),
+                ("multiset difference", overlap.difference),
+            ]:
+                report(label, timeit(lambda: func(*decks), repeat=7, number=100))
+
+
+if __name__ == "__main__":
+    main()
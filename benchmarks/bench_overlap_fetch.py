@@ -0,0 +1,74 @@
+"""
+Measures the wall clock time of fetching the decks of an overlap request.
+
+Deck requests are answered by a fake that takes a fixed time per deck while holding one
+of the per host slots of the shared HTTP client, like a real request to curiosa.io
+would. Decks are fetched one after another as before and then with fetch_decks.
+
+The concurrency is measured with a client that does not limit the request rate. The
+default client allows 4 requests per second to curiosa.io, so the paced times are
+reported separately.
+
+Run with: uv run python -m benchmarks.bench_overlap_fetch
+"""
+
+import io
+import time
+from contextlib import redirect_stdout
+
+import src.curiosa as curiosa
+from src.http_client import HttpClient, get_http_client, set_http_client
+
+LATENCY = 0.25
+DECK_COUNTS = [2, 3, 8]
+
+DECK = {"Avatar": [("Druid", "1")], "Site": [("Forge", "4")]}
+
+
+def fake_request_deck_http(url: str, include_maybe: bool = False):
+    with get_http_client().host_slot(url):
+        time.sleep(LATENCY)
+    return dict(DECK)
+
+
+def sequential(ids: list[str]):
+    return [curiosa.request_deck_from_id(id) for id in ids]
+
+
+def fetch_decks(ids: list[str]):
+    return curiosa.fetch_decks(ids)
+
+
+def run(title: str, client: HttpClient):
+    set_http_client(client)
+    print(title)
+    for count in DECK_COUNTS:
+        ids = [f"deck{i}" for i in range(count)]
+        for label, fetch in [("sequential", sequential), ("fetch_decks", fetch_decks)]:
+            start = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                fetch(ids)
+            elapsed = time.perf_counter() - start
+            print(f"  {count} decks, {label:<14} {elapsed * 1e3:8.1f} ms")
+
+
+def main():
+    curiosa.request_deck_http = fake_request_deck_http
+
+    unpaced = HttpClient(requests_per_second=0)
+    run(
+        f"Fetching decks with {LATENCY * 1e3:.0f} ms per request, "
+        f"{unpaced.max_per_host} requests per host at a time:",
+        unpaced,
+    )
+
+    paced = HttpClient()
+    run(
+        f"With the default pacing of {paced.requests_per_second:g} requests per "
+        "second per host:",
+        paced,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Simulates a busy server to compare the reply list the client used before with the
+ReplyTracker.
+
+Messages are replied to at a fixed rate on a simulated clock, a share of them are edited
+while their replies are tracked and replies are pruned every prune_replies_time seconds,
+like DiscordClient does.
+
+Run with: uv run python -m benchmarks.bench_replies
+"""
+
+import random
+
+from benchmarks.common import report, timeit
+from src.replies import ReplyTracker
+
+# Simulated seconds and the time replies are tracked for, prune_replies_time.
+DURATION = 120
+TTL = 30
+
+# Replied messages and edits per second.
+RATES = [(10, 2), (100, 20), (500, 100)]
+
+
+class LegacyReplies:
+    def __init__(self, clock):
+        self.clock = clock
+        self.replies: list[tuple[int, int, float]] = list()
+
+    def add(self, message_id, reply_id):
+        self.replies.append((message_id, reply_id, self.clock()))
+
+    def get(self, message_id):
+        messages = list(map(lambda x: x[0], self.replies))
+        try:
+            return self.replies[messages.index(message_id)]
+        except ValueError:
+            return None
+
+    def prune(self):
+        self.replies = list(
+            filter(lambda x: self.clock() - x[2] < TTL, self.replies),
+        )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def simulate(make, messages_per_second: int, edits_per_second: int):
+    rng = random.Random(0)
+    clock = Clock()
+    replies = make(clock)
+    message_id = 0
+
+    for second in range(DURATION):
+        for i in range(messages_per_second):
+            clock.now = second + i / messages_per_second
+            message_id += 1
+            replies.add(message_id, message_id + 10**9)
+
+        # Edits mostly hit recent messages, some the ones that have already expired.
+        for _ in range(edits_per_second):
+            replies.get(message_id - rng.randint(0, messages_per_second * TTL * 2))
+
+        if second % TTL == 0:
+            replies.prune()
+
+
+def main():
+    print(f"{DURATION} simulated seconds, replies tracked for {TTL} seconds:")
+    for messages, edits in RATES:
+        print(f"  {messages} messages and {edits} edits per second")
+        report(
+            "  list with index and filter",
+            timeit(lambda: simulate(LegacyReplies, messages, edits), repeat=3),
+        )
+        report(
+            "  ReplyTracker",
+            timeit(
+                lambda: simulate(
+                    # Large enough that no message is dropped before it expires.
+                    lambda c: ReplyTracker(ttl=TTL, max_size=messages * TTL, clock=c),
+                    messages,
+                    edits,
+                ),
+                repeat=3,
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Compares the compiled MessageScanner against the per-message regex handling it replaced.
+
+Run with: uv run python -m benchmarks.bench_scanner
+"""
+
+import random
+import re
+import time
+
+from benchmarks.common import load_bench_cards
+from src.catalog import CardCatalog
+from src.scanner import MessageScanner
+from src.util import get_all_card_names, get_url_form
+
+CIMG_REGEX = r"\[!(.*?)\]"
+CARD_REGEX = r"\[\[!(.*?)\]\]"
+
+# Chat messages without any references, the bulk of traffic in a guild.
+PLAIN_MESSAGES = [
+    "anyone up for a game tonight?",
+    "gg, that last turn was brutal",
+    "I think the new set spoilers drop on friday",
+    "lol",
+    "does anyone have a spare playmat for the tournament on saturday? mine got wet",
+    "what's the best way to deal with airborne minions in a fire deck",
+    "!deck cm2d6ea5g00etsenu9qa7syod",
+    "the rulebook says you can't do that [citation needed]",
+]
+
+REFERENCE_TEMPLATES = [
+    "I was thinking of adding [!{0}] to my deck.",
+    "What does [[!{0}]] do exactly?",
+    "[[!{0}]] vs [[!{1}]], which one is better in the early game?",
+    "is [!{0}] or [!{1}] better with [[!{2}]]",
+]
+
+
+def build_corpus(names: list[str], size: int = 5000) -> list[str]:
+    """
+    Builds a message corpus where roughly one in five messages references cards.
+    """
+    rng = random.Random(2)
+    corpus = []
+
+    for _ in range(size):
+        if rng.random() < 0.8:
+            corpus.append(rng.choice(PLAIN_MESSAGES))
+        else:
+            template = rng.choice(REFERENCE_TEMPLATES)
+            corpus.append(template.format(*rng.sample(names, 3)))
+
+    return corpus
+
+
+def legacy_scan(content: str, cards: list) -> list[str] | None:
+    """
+    The message handling of DiscordClient.handle_regex before the scanner was added.
+    """
+    ci_pattern_match = re.search(CIMG_REGEX, content)
+    ct_pattern_match = re.search(CARD_REGEX, content)
+
+    if ct_pattern_match:
+        all_cards = get_all_card_names(cards)
+
+        all_ref_cards = re.findall(CIMG_REGEX, content)
+        all_ref_cards = list(map(get_url_form, all_ref_cards))
+        return list(filter(lambda x: x in all_cards, all_ref_cards))
+
+    if ci_pattern_match:
+        return [ci_pattern_match.group(1)]
+
+    return None
+
+
+def messages_per_second(func, corpus: list[str]) -> float:
+    start = time.perf_counter()
+    for content in corpus:
+        func(content)
+    return len(corpus) / (time.perf_counter() - start)
+
+
+def main():
+    cards = load_bench_cards()
+    catalog = CardCatalog(cards)
+    scanner = MessageScanner(CIMG_REGEX, CARD_REGEX)
+    corpus = build_corpus([card["name"] for card in cards])
+
+    def compiled(content: str):
+        references = scanner.scan(content)
+        if references:
+            scanner.resolve(references, catalog.by_name)
+
+    before = messages_per_second(lambda c: legacy_scan(c, cards), corpus)
+    after = messages_per_second(compiled, corpus)
+
+    print(f"Scanning {len(corpus)} chat messages:")
+    print(f"  {'before (re.search + list scan)':<40} {before:12.0f} msg/s")
+    print(f"  {'after (MessageScanner)':<40} {after:12.0f} msg/s")
+    print(f"  speedup: {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Measures how long it takes to get the card catalog and the prefix tree of card names,
+built from cards.json or loaded from the snapshot, and the wall clock time of a whole
+`main.py card` command with and without the snapshot.
+
+Run with: uv run python -m benchmarks.bench_startup
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import BENCH_CARDS_PATH, load_bench_cards, report, timeit
+from src.catalog import CardCatalog
+from src.snapshot import load_card_index, read_snapshot, snapshot_path, write_snapshot
+from src.trie import Trie
+from src.util import load_cards
+
+# The amount of times the command is started for each case.
+COMMAND_RUNS = 9
+
+
+def build(path: Path):
+    catalog = CardCatalog(load_cards(str(path)))
+    return catalog, Trie(catalog.names())
+
+
+def run_command(card_name: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "main.py", "card", card_name],
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    cards = load_bench_cards()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "cards.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(cards, f)
+
+        write_snapshot(path, *build(path))
+        size = os.path.getsize(snapshot_path(path))
+        print(f"Card index for {len(cards)} cards, snapshot {size / 1024:.0f} KiB:")
+        report("build from cards.json", timeit(lambda: build(path)))
+        report("load from snapshot", timeit(lambda: read_snapshot(path)))
+
+    if not os.path.exists(BENCH_CARDS_PATH):
+        print(f"{BENCH_CARDS_PATH} not found, skipping `main.py card`.")
+        return
+
+    # A misspelled name, so that the command also looks up suggestions from the tree.
+    name = cards[0]["name"].lower() + "x"
+    print(f"`main.py card {name}`, median of {COMMAND_RUNS} runs:")
+
+    without = []
+    for _ in range(COMMAND_RUNS):
+        snapshot_path(BENCH_CARDS_PATH).unlink(missing_ok=True)
+        without.append(run_command(name))
+    report("without snapshot", statistics.median(without))
+
+    load_card_index(BENCH_CARDS_PATH)
+    report(
+        "with snapshot",
+        statistics.median(run_command(name) for _ in range(COMMAND_RUNS)),
+    )
+
+
+if __name__ == "__main__":
+    main()
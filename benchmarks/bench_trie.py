@@ -0,0 +1,73 @@
+"""
+Reports memory use and construction time of the Trie for card names and terms.
+
+The prefix tree before the compact node layout is kept here as a reference.
+
+Run with: uv run python -m benchmarks.bench_trie
+"""
+
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.common import load_bench_cards, report, timeit
+from src.trie import Trie
+from src.util import get_url_form, load_toml
+
+
+class LegacyNode:
+    def __init__(self, word=""):
+        self.word = word
+        self.children = dict()
+        self.word_node = False
+
+
+class LegacyTrie:
+    def __init__(self, words: list):
+        self.root = LegacyNode()
+        self.word_list: list[str] = []
+
+        for word in words:
+            current = self.root
+            for i, ch in enumerate(word):
+                if ch not in current.children:
+                    current.children[ch] = LegacyNode(word[0 : i + 1])
+                current = current.children[ch]
+            current.word_node = True
+            self.word_list.append(word)
+
+
+def allocated(build) -> int:
+    """
+    Returns the amount of bytes still allocated after building a prefix tree.
+    """
+    tracemalloc.start()
+    tree = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del tree
+    return size
+
+
+def compare(label: str, words: list[str]):
+    print(f"{label} ({len(words)} words):")
+
+    legacy_bytes = allocated(lambda: LegacyTrie(words))
+    compact_bytes = allocated(lambda: Trie(words))
+    print(f"  {'legacy Node memory':<40} {legacy_bytes / 1024:10.1f} KiB")
+    print(f"  {'compact Node memory':<40} {compact_bytes / 1024:10.1f} KiB")
+
+    report("legacy Node construction", timeit(lambda: LegacyTrie(words)))
+    report("compact Node construction", timeit(lambda: Trie(words)))
+
+
+def main():
+    cards = load_bench_cards()
+    compare("Card names", [get_url_form(card["name"]) for card in cards])
+
+    terms = load_toml(Path("data/terms.toml"))
+    compare("Terms", list(terms["term"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import statistics
+import time
+from collections.abc import Callable
+from typing import Any
+
+# The cards file used for benchmarks, downloaded with `uv run main.py download`.
+BENCH_CARDS_PATH = "data/cards.json"
+
+# The amount of synthetic cards generated when cards.json is not available.
+SYNTHETIC_CARD_COUNT = 1200
+
+SYLLABLES = [
+    "ar", "bel", "cor", "dun", "el", "fen", "gor", "hal", "is", "jor",
+    "kel", "lun", "mor", "nar", "ol", "pel", "quor", "ren", "sil", "tor",
+    "ul", "vor", "wyn", "yr", "zan",
+]  # fmt: skip
+
+TYPES = ["Minion", "Magic", "Aura", "Artifact", "Site", "Avatar"]
+RARITIES = ["Ordinary", "Exceptional", "Elite", "Unique"]
+SETS = ["Alpha", "Beta", "Arthurian Legends", "Dragonlord", "Gothic"]
+
+
+def synthetic_cards(count: int = SYNTHETIC_CARD_COUNT, seed: int = 0) -> list[dict]:
+    """
+    Generates card entries that resemble cards.json entries closely enough for benchmarks.
+    """
+    rng = random.Random(seed)
+    cards = []
+    names = set()
+
+    while len(cards) < count:
+        words = [
+            "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 3)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        name = " ".join(w.capitalize() for w in words)
+        if rng.random() < 0.1:
+            name += "'s " + rng.choice(["Staff", "Crown", "Tower", "Grove"])
+        if name in names:
+            continue
+
+        names.add(name)
+        cards.append(
+            {
+                "name": name,
+                "guardian": {
+                    "rarity": rng.choice(RARITIES),
+                    "type": rng.choice(TYPES),
+                },
+                "sets": [{"name": s} for s in rng.sample(SETS, rng.randint(1, 2))],
+            }
+        )
+
+    return cards
+
+
+def load_bench_cards() -> list[dict[str, Any]]:
+    """
+    Loads the full card list if it has been downloaded, otherwise falls back to synthetic cards.
+    """
+    if os.path.exists(BENCH_CARDS_PATH):
+        with open(BENCH_CARDS_PATH, "r", encoding="utf-8") as json_file:
+            cards = json.load(json_file)
+        print(f"Using {len(cards)} cards from {BENCH_CARDS_PATH}.")
+        return cards
+
+    cards = synthetic_cards()
+    print(f"{BENCH_CARDS_PATH} not found, using {len(cards)} synthetic cards.")
+    return cards
+
+
+def timeit(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> float:
+    """
+    Returns the median time in seconds that a single call of func takes.
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return statistics.median(samples)
+
+
+def report(label: str, seconds: float):
+    """
+    Prints a single benchmark result in a human readable unit.
+    """
+    if seconds < 1e-3:
+        print(f"  {label:<40} {seconds * 1e6:10.2f} µs")
+    else:
+        print(f"  {label:<40} {seconds * 1e3:10.2f} ms")
@@ -0,0 +1,41 @@
+import time
+from types import SimpleNamespace
+
+# Deck table text in the form the curiosa.io deck page renders it.
+DECK_TABLES = [
+    "Avatar (1)\n1Druid",
+    "Minion (6)\n3\n2Porcupine Pufferfish\n4Raal Dromedary",
+    "Site (7)\n3Autumn River\n4Forge",
+]
+
+
+class FakeBrowser:
+    """
+    A stand-in for a Selenium webdriver that takes page_load seconds to load any page.
+    """
+
+    def __init__(self, page_load: float = 0.5):
+        self.page_load = page_load
+        self.pages = 0
+        self.current_url = ""
+
+    def get(self, url: str):
+        time.sleep(self.page_load)
+        self.pages += 1
+        self.current_url = url
+
+    def find_element(self, by, value):
+        return SimpleNamespace(text="")
+
+    def find_elements(self, by, value):
+        return [SimpleNamespace(text=table) for table in DECK_TABLES]
+
+    def quit(self):
+        pass
+
+
+def fake_message():
+    """
+    Returns an object that passes for a discord message sent on a server.
+    """
+    return SimpleNamespace(channel=SimpleNamespace(), content="")
@@ -1,37 +1,40 @@
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import Annotated, Any
+
 import typer
 
-import src.curiosa as curiosa
-from src.util import (
-    get_all_card_names,
-    download_cards_json,
-    load_cards,
-    get_url_form,
-)
-from src.browser import get_selenium_browser
-from src.discord_client import DiscordClient
-from src.trie import Trie
+from src.daemon_client import call_daemon, daemon_port
 
 # Typer instance
 app = typer.Typer()
 
+# Batch commands, run as `main.py batch decks` and `main.py batch cards`.
+batch = typer.Typer(help="Runs deck or card queries for every line of a file or stdin.")
+app.add_typer(batch, name="batch")
+
 
 @app.command()
 def discord():
     """
     Starts the discord bot.
     """
+    # Imported here since discord.py takes a while to import and other commands skip it.
+    from src.discord_client import DiscordClient
+
     dclient = DiscordClient()
-    with get_selenium_browser() as browser:
-        dclient.start_client(browser)
+    dclient.start_client()
 
 
 @app.command()
-def overlap(ids: str):
+def overlap(ids: str, mode: str = "intersection"):
     """
     Returns a list of cards that overlap in a list of decks. Does not support maybeboards
+
+    Mode is one of intersection, union or difference.
     """
-    with get_selenium_browser() as browser:
-        print(curiosa.get_overlapping_cards_from_str(ids, browser))
+    print(run_command("overlap", ids=ids, mode=mode))
 
 
 @app.command()
@@ -39,8 +42,7 @@ def url(url: str, include_maybe: bool = False):
     """
     Returns a deck of cards from an URL
     """
-    with get_selenium_browser() as browser:
-        print(curiosa.get_deck_from_url(url, browser, include_maybe))
+    print(run_command("url", url=url, include_maybe=include_maybe))
 
 
 @app.command()
@@ -48,8 +50,7 @@ def id(id: str, include_maybe: bool = False):
     """
     Returns a deck of cards from an ID.
     """
-    with get_selenium_browser() as browser:
-        print(curiosa.get_deck_from_id(id, browser, include_maybe))
+    print(run_command("id", id=id, include_maybe=include_maybe))
 
 
 @app.command()
@@ -57,8 +58,7 @@ def card(card_name: list[str]):
     """
     Gets a card by name and returns information associated with it.
     """
-    cn, pt, cards = command_preq(card_name)
-    print(curiosa.get_card_from_name(cn, pt, cards))
+    print(run_command("card", card_name=card_name))
 
 
 @app.command()
@@ -66,29 +66,167 @@ def faq(card_name: list[str]):
     """
     Gets a cards FAQ fields scraped from Curiosa.io
     """
-    cn, pt, cards = command_preq(card_name)
-    print(curiosa.get_faq_entries(cn, pt, cards))
+    print(run_command("faq", card_name=card_name))
+
+
+@app.command()
+def serve(port: int | None = None):
+    """
+    Starts a local daemon that keeps card data, caches and browsers loaded.
+
+    While it is running, the card, faq, id, url and overlap commands are sent to it
+    instead of starting up from scratch.
+    """
+    from src.daemon import serve_daemon
+    from src.util import load_toml
+
+    config = load_toml(Path("data/config.toml"))
+    serve_daemon(config, port or config["daemon_port"])
+
+
+@app.command()
+def prefetch(
+    set_name: Annotated[str | None, typer.Option("--set")] = None,
+    workers: int = 4,
+):
+    """
+    Downloads card images into the image cache, all cards or only the cards of a set.
+    """
+    from src.catalog import get_catalog
+    from src.images import ImageCache
+    from src.util import load_toml
+
+    config = load_toml(Path("data/config.toml"))
+    images = ImageCache(
+        config["image_cache_path"], max_bytes=config["image_cache_max_bytes"]
+    )
+
+    catalog = get_catalog()
+    cards = list(catalog) if set_name is None else catalog.get_by_set(set_name)
+    if not cards:
+        print(f"No cards found for set: {set_name}")
+        return
+
+    counts = images.prefetch(cards, workers)
+    print(
+        f"Prefetched images for {len(cards)} cards: {counts['downloaded']} downloaded, "
+        f"{counts['cached']} already cached, {counts['failed']} failed."
+    )
 
 
 @app.command()
 def download(output: str = "data"):
     """
     Downloads card data from the official curiosa.io API and saves it into a file.
+
+    Also writes the card snapshot that later commands start up from.
     """
-    download_cards_json(output)
+    from src.snapshot import load_card_index
+    from src.util import download_cards_json
 
+    if download_cards_json(output):
+        load_card_index(Path(output) / "cards.json")
 
-def command_preq(card_name: list[str]) -> tuple[str, Trie, dict]:
+
+@batch.command("decks")
+def batch_decks(
+    source: Annotated[typer.FileText, typer.Argument()] = "-",
+    workers: int = 4,
+    include_maybe: bool = False,
+):
     """
-    Shorthand for initializing card name suggestions in commands
+    Retrieves the decks of deck IDs or URLs read from a file, or stdin with "-".
+
+    Results are written as JSON Lines as each deck finishes, followed by a summary on stderr.
     """
-    cards = load_cards()
+    from src.batch import process_deck, read_items
+    from src.browser import BrowserPool
+    from src.util import load_toml
 
-    return (
-        get_url_form(" ".join(card_name)),
-        Trie(get_all_card_names(cards)),
-        cards,
+    config = load_toml(Path("data/config.toml"))
+    # A browser is only started if a deck can not be retrieved without one, and every
+    # worker may wait for one.
+    browsers = BrowserPool(
+        size=config["browser_pool_size"],
+        max_pages=config["browser_max_pages"],
+        max_waiting=workers,
     )
+    try:
+        run_batch_command(
+            read_items(source),
+            lambda item: process_deck(item, browsers, include_maybe),
+            workers,
+            config,
+        )
+    finally:
+        browsers.close()
+
+
+@batch.command("cards")
+def batch_cards(
+    source: Annotated[typer.FileText, typer.Argument()] = "-",
+    workers: int = 4,
+    faq: bool = False,
+):
+    """
+    Looks up cards by names read from a file, or stdin with "-", and optionally their FAQ entries.
+
+    Results are written as JSON Lines as each card finishes, followed by a summary on stderr.
+    """
+    from src.batch import process_card, read_items
+    from src.snapshot import load_card_index
+    from src.util import load_toml
+
+    catalog, prefix_tree = load_card_index()
+    run_batch_command(
+        read_items(source),
+        lambda item: process_card(item, catalog, prefix_tree, faq),
+        workers,
+        load_toml(Path("data/config.toml")),
+    )
+
+
+def run_batch_command(
+    items: list[str], process: Callable[[str], Any], workers: int, config: dict
+):
+    """
+    Runs a batch with the caches of the bot and exits with status 1 if any item failed.
+    """
+    from src import curiosa
+    from src.batch import format_summary, run_batch
+    from src.store import set_store
+
+    curiosa.configure_caches(config)
+    start = time.perf_counter()
+    try:
+        results = run_batch(items, process, workers)
+    finally:
+        set_store(None)
+
+    typer.echo(format_summary(results, time.perf_counter() - start), err=True)
+    if any(not r.ok for r in results):
+        raise typer.Exit(1)
+
+
+def run_command(name: str, **args) -> str:
+    """
+    Runs a command on the daemon if it is running, otherwise in this process.
+    """
+    output = call_daemon(name, args, daemon_port())
+    if output is not None:
+        return output
+
+    # Imported here since these take a while to import and are not needed when the
+    # daemon runs the command.
+    from src.browser import BrowserPool
+    from src.daemon import CommandRunner
+
+    # A browser is only started if a deck can not be retrieved without one.
+    browsers = BrowserPool(size=1)
+    try:
+        return CommandRunner(browsers).run(name, args)
+    finally:
+        browsers.close()
 
 
 if __name__ == "__main__":
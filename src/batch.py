@@ -0,0 +1,176 @@
+import json
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from typing import Any, NamedTuple, TextIO
+from urllib.parse import urlsplit
+
+import src.curiosa as curiosa
+from src.catalog import CardCatalog
+from src.trie import Trie
+from src.util import get_url_form
+
+
+class ItemFailed(Exception):
+    """
+    Raised when a batch item could not be processed, the message explains why.
+    """
+
+
+class BatchResult(NamedTuple):
+    """
+    The outcome of a single batch item.
+
+    Index is the position of the item among the items read, blank lines and comments
+    are not counted. Results are written in the order they finish, so the index tells
+    them apart.
+    """
+
+    index: int
+    item: str
+    ok: bool
+    value: Any = None
+    error: str | None = None
+    elapsed: float = 0.0
+
+    def to_json(self) -> str:
+        """
+        Returns the result as a single line of json.
+        """
+        line: dict[str, Any] = {"index": self.index, "item": self.item, "ok": self.ok}
+        if self.ok:
+            line["result"] = self.value
+        else:
+            line["error"] = self.error
+        line["ms"] = round(self.elapsed * 1e3, 1)
+
+        return json.dumps(line, ensure_ascii=False)
+
+
+def read_items(source: TextIO) -> list[str]:
+    """
+    Reads batch items, one per line. Empty lines and lines starting with # are skipped.
+    """
+    items = []
+    for line in source:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            items.append(line)
+
+    return items
+
+
+def run_batch(
+    items: list[str],
+    process: Callable[[str], Any],
+    workers: int = 4,
+    output: TextIO | None = None,
+) -> list[BatchResult]:
+    """
+    Processes items concurrently with at most workers at a time and writes each result
+    to output, stdout by default, as a line of json as soon as it finishes.
+
+    Anything printed while processing goes to stderr so that output only holds results.
+    Returns the results in the order of the items.
+    """
+
+    def timed(index: int, item: str) -> BatchResult:
+        start = time.perf_counter()
+        value, error = None, None
+        try:
+            value = process(item)
+        except ItemFailed as e:
+            error = str(e)
+        except Exception as e:
+            error = repr(e)
+
+        return BatchResult(
+            index, item, error is None, value, error, time.perf_counter() - start
+        )
+
+    # Resolved here so that a stdout replaced after import, for example by pytest, is used.
+    if output is None:
+        output = sys.stdout
+
+    results: list[BatchResult] = []
+    with redirect_stdout(sys.stderr), ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(timed, i, item) for i, item in enumerate(items)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            output.write(result.to_json() + "\n")
+            output.flush()
+
+    return sorted(results, key=lambda r: r.index)
+
+
+def format_summary(results: list[BatchResult], total: float) -> str:
+    """
+    Returns a summary of the failed items and the timings of a batch.
+    """
+    failed = [r for r in results if not r.ok]
+    summary = (
+        f"Processed {len(results)} items in {total:.2f} s: "
+        f"{len(results) - len(failed)} succeeded, {len(failed)} failed."
+    )
+
+    if results:
+        times = [r.elapsed * 1e3 for r in results]
+        summary += (
+            f"\nTime per item: median {statistics.median(times):.1f} ms, "
+            f"max {max(times):.1f} ms."
+        )
+
+    for r in failed:
+        summary += f"\n  {r.item}: {r.error}"
+
+    return summary
+
+
+def deck_id(item: str) -> str:
+    """
+    Returns the deck ID of a curiosa.io deck URL, items that are not URLs are IDs as is.
+    """
+    if "://" not in item:
+        return item
+
+    return urlsplit(item).path.rstrip("/").rsplit("/", 1)[-1]
+
+
+def process_deck(item: str, browser: curiosa.Browser, include_maybe: bool = False):
+    """
+    Retrieves the deck of an ID or URL through the disk store like the deck command.
+    """
+    deck = curiosa.request_deck_from_id(deck_id(item), browser, include_maybe)
+    if deck is None:
+        raise ItemFailed(f"Could not retrieve deck with id: {deck_id(item)}")
+
+    return deck
+
+
+def process_card(
+    item: str, catalog: CardCatalog, prefix_tree: Trie, faq: bool = False
+) -> dict[str, Any]:
+    """
+    Looks up a card by name and optionally requests its FAQ entries.
+    """
+    card_name = get_url_form(item)
+    card = catalog.get(card_name)
+    if card is None:
+        raise ItemFailed(
+            curiosa.get_content_suggestion(
+                card_name, prefix_tree, "Could not find card by card name"
+            )
+        )
+
+    if not faq:
+        return card
+
+    entries = curiosa.request_faq(card_name)
+    if isinstance(entries, dict):
+        raise ItemFailed(f"Could not retrieve FAQ entries: {entries['failed']}")
+
+    return {"card": card, "faq": entries}
@@ -1,9 +1,12 @@
 import platform
+import threading
 
-from typing import Any, Generator
+from collections import deque
+from typing import Any, Callable, Generator
 from contextlib import contextmanager
 
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
@@ -49,18 +52,204 @@ def build_browser() -> WebDriver | None:
         return None
 
 
-@contextmanager
-def get_selenium_browser() -> Generator[WebDriver, Any, Any]:
+class BrowserPoolBusy(Exception):
     """
-    A context manager that provides a Selenium webdriver instance for functions requiring it
-    and also makes sure that the webdriver gets closed properly after being used.
+    Raised when no browser could be checked out from a browser pool in time.
     """
-    _browser = build_browser()
 
-    if _browser is None:
-        raise ValueError("Failed to instantiate Selenium webdriver instance.")
-    else:
+
+class BrowserUnavailable(BrowserPoolBusy):
+    """
+    Raised when a browser pool could not start a new browser, for example because
+    Selenium could not be set up.
+    """
+
+
+class PooledBrowser:
+    """
+    A webdriver instance owned by a browser pool and the amount of pages it has served.
+    """
+
+    def __init__(self, driver: WebDriver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """
+    A pool of reusable Selenium webdriver instances.
+
+    Browsers are created lazily up to the size of the pool. Callers that find all
+    browsers in use wait in a bounded queue. Browsers are restarted after serving
+    max_pages checkouts, after crashing or when they fail a health check.
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        factory: Callable[[], WebDriver | None] = build_browser,
+        max_pages: int = 50,
+        max_waiting: int = 8,
+        checkout_timeout: float = 30,
+    ):
+        """
+        Initializes a new browser pool.
+
+        Factory is called to create new webdriver instances, tests can provide fakes here.
+        """
+        self.size = size
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_waiting = max_waiting
+        self.checkout_timeout = checkout_timeout
+
+        self._idle: deque[PooledBrowser] = deque()
+        self._condition = threading.Condition()
+        self._created = 0
+        self._closed = False
+
+        self.in_use = 0
+        self.waiting = 0
+        self.recycle_count = 0
+
+    def metrics(self) -> dict[str, int]:
+        """
+        Returns the current state of the pool.
+        """
+        with self._condition:
+            return {
+                "size": self.size,
+                "created": self._created,
+                "idle": len(self._idle),
+                "in_use": self.in_use,
+                "queue_length": self.waiting,
+                "recycle_count": self.recycle_count,
+            }
+
+    @contextmanager
+    def checkout(self, timeout: float | None = None) -> Generator[WebDriver, Any, Any]:
+        """
+        A context manager that lends a webdriver instance from the pool.
+
+        If the webdriver crashes while checked out, it is discarded instead of being
+        returned to the pool.
+        """
+        browser = self.acquire(timeout)
+        healthy = True
         try:
-            yield _browser
+            yield browser.driver
+        except TimeoutException:
+            raise
+        except WebDriverException:
+            healthy = False
+            raise
         finally:
-            _browser.quit()
+            self.release(browser, healthy)
+
+    def acquire(self, timeout: float | None = None) -> PooledBrowser:
+        """
+        Takes a healthy browser from the pool, creating one if the pool is not full.
+
+        Raises BrowserPoolBusy if the wait queue is full or no browser frees up in time,
+        and BrowserUnavailable if a new browser could not be started.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+
+        with self._condition:
+            if self._closed:
+                raise BrowserPoolBusy("Browser pool has been closed.")
+
+            if not self._available() and self.waiting >= self.max_waiting:
+                raise BrowserPoolBusy("Too many requests waiting for a browser.")
+
+            self.waiting += 1
+            try:
+                if not self._condition.wait_for(self._available, timeout):
+                    raise BrowserPoolBusy("Timed out waiting for a browser.")
+            finally:
+                self.waiting -= 1
+
+            if self._closed:
+                raise BrowserPoolBusy("Browser pool has been closed.")
+
+            self.in_use += 1
+            browser = self._idle.popleft() if self._idle else None
+            if browser is None:
+                self._created += 1
+
+        try:
+            if browser is not None and not self.is_healthy(browser.driver):
+                print("Browser failed health check, restarting it..")
+                self._quit(browser)
+                browser = None
+                with self._condition:
+                    self.recycle_count += 1
+
+            return browser if browser is not None else self._create()
+        except BaseException:
+            with self._condition:
+                self.in_use -= 1
+                self._created -= 1
+                self._condition.notify()
+            raise
+
+    def release(self, browser: PooledBrowser, healthy: bool = True):
+        """
+        Returns a browser into the pool, restarting it if it has crashed or is worn out.
+        """
+        browser.pages += 1
+        recycle = not healthy or browser.pages >= self.max_pages
+
+        if recycle or self._closed:
+            self._quit(browser)
+
+        with self._condition:
+            self.in_use -= 1
+            if recycle or self._closed:
+                self._created -= 1
+                if recycle:
+                    self.recycle_count += 1
+            else:
+                self._idle.append(browser)
+            self._condition.notify()
+
+    def close(self):
+        """
+        Quits all idle browsers, browsers in use are quit when they are released.
+        """
+        with self._condition:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._created -= len(idle)
+            self._condition.notify_all()
+
+        for browser in idle:
+            self._quit(browser)
+
+    def is_healthy(self, driver: WebDriver) -> bool:
+        """
+        Checks that the webdriver still responds to commands.
+        """
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _available(self) -> bool:
+        return self._closed or bool(self._idle) or self._created < self.size
+
+    def _create(self) -> PooledBrowser:
+        driver = self.factory()
+        if driver is None:
+            raise BrowserUnavailable(
+                "Failed to instantiate Selenium webdriver instance."
+            )
+        return PooledBrowser(driver)
+
+    def _quit(self, browser: PooledBrowser):
+        try:
+            browser.driver.quit()
+        except WebDriverException as e:
+            print(f"Failed to quit webdriver instance: {e}")
@@ -0,0 +1,201 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import Any
+
+
+class CacheEntry:
+    """
+    A cached value and the time after which it is no longer valid.
+    """
+
+    __slots__ = ("value", "expires_at", "negative")
+
+    def __init__(self, value: Any, expires_at: float, negative: bool):
+        self.value = value
+        self.expires_at = expires_at
+        self.negative = negative
+
+
+class Flight:
+    """
+    A load in progress that concurrent callers for the same key wait on.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class TTLCache:
+    """
+    A thread-safe cache whose entries expire after a time to live.
+
+    The cache holds at most max_size entries and evicts the least recently used one
+    when full. Negative results, such as lookups for something that does not exist,
+    can be cached with their own shorter time to live. Concurrent loads of the same key
+    are de-duplicated so that only one of them does the actual work.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 3600,
+        max_size: int = 512,
+        negative_ttl: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes a new cache.
+
+        Clock returns the current time in seconds, tests can provide a fake one.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.clock = clock
+
+        self._entries: OrderedDict[Any, CacheEntry] = OrderedDict()
+        self._flights: dict[Any, Flight] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def configure(self, ttl: float, max_size: int, negative_ttl: float):
+        """
+        Changes the cache parameters, evicting entries if the cache shrinks.
+        """
+        with self._lock:
+            self.ttl = ttl
+            self.max_size = max_size
+            self.negative_ttl = negative_ttl
+            self._evict()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the hit, miss and eviction counters of the cache.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+            }
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Returns the cached value for key or default if it is missing or has expired.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            return default if entry is None else entry.value
+
+    def set(
+        self, key: Any, value: Any, negative: bool = False, ttl: float | None = None
+    ):
+        """
+        Caches a value, negative values expire after the negative time to live. A given
+        ttl replaces the time to live of the cache for this value.
+        """
+        if ttl is None:
+            ttl = self.negative_ttl if negative else self.ttl
+
+        with self._lock:
+            self._entries[key] = CacheEntry(value, self.clock() + ttl, negative)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def get_or_load(
+        self,
+        key: Any,
+        loader: Callable[[], Any],
+        negative: Callable[[Any], bool] | None = None,
+        cacheable: Callable[[Any], bool] | None = None,
+    ) -> Any:
+        """
+        Returns the cached value for key, calling loader to produce it on a miss.
+
+        Negative tells whether a loaded value should be cached as a negative result and
+        cacheable whether it should be cached at all, for example errors that are
+        expected to go away should not be. If another thread is already loading the
+        same key, waits for and returns its result instead.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                self.hits += 1
+                if entry.negative:
+                    self.negative_hits += 1
+                return entry.value
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._flights[key] = Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            raise
+        else:
+            if cacheable is None or cacheable(flight.value):
+                is_negative = negative is not None and negative(flight.value)
+                self.set(key, flight.value, is_negative)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.value
+
+    def invalidate(self, key: Any):
+        """
+        Removes a key from the cache.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Removes all entries from the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key: Any) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        if entry.expires_at <= self.clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self):
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
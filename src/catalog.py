@@ -0,0 +1,225 @@
+import threading
+from typing import Any, NamedTuple
+
+from src.util import get_url_form, load_cards
+
+# The process-wide catalog, loaded on first use by get_catalog.
+_catalog: "CardCatalog | None" = None
+_catalog_lock = threading.Lock()
+
+
+class CatalogDiff(NamedTuple):
+    """
+    The differences between the cards of a catalog and a newer list of cards.
+
+    Added and changed hold the new card objects, removed the URL form names of the cards
+    that are no longer present.
+    """
+
+    added: list[dict[str, Any]]
+    changed: list[dict[str, Any]]
+    removed: list[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+
+class CardCatalog:
+    """
+    An indexed view over the card data loaded from cards.json.
+
+    Card names are normalized into their URL form once when the catalog is built,
+    after which cards can be looked up by name, set, type or rarity in constant time.
+    """
+
+    def __init__(self, cards: list[dict[str, Any]] | None = None):
+        """
+        Initializes a new card catalog.
+
+        Alternatively can be provided a list of cards for initialization.
+        """
+        self.cards: list[dict[str, Any]] = []
+        self.by_name: dict[str, dict[str, Any]] = {}
+        self.by_set: dict[str, list[dict[str, Any]]] = {}
+        self.by_type: dict[str, list[dict[str, Any]]] = {}
+        self.by_rarity: dict[str, list[dict[str, Any]]] = {}
+
+        if cards is not None:
+            self.add_all(cards)
+
+    def __len__(self) -> int:
+        return len(self.by_name)
+
+    def __contains__(self, card_name: str) -> bool:
+        return get_url_form(card_name) in self.by_name
+
+    def __iter__(self):
+        return iter(self.cards)
+
+    def add_all(self, cards: list[dict[str, Any]]):
+        """
+        Shorthand for adding all cards of a list into the catalog.
+        """
+        for card in cards:
+            self.add(card)
+
+    def add(self, card: dict[str, Any]):
+        """
+        Adds a card into the catalog and all of its indexes.
+
+        If a card with the same URL form name is already present, the first one is kept
+        so that lookups behave like the linear scan they replace.
+        """
+        name = get_url_form(card["name"])
+        if name in self.by_name:
+            return
+
+        self.cards.append(card)
+        self.by_name[name] = card
+
+        for index, key in self._index_keys(card):
+            index.setdefault(key, []).append(card)
+
+    def remove(self, card_name: str):
+        """
+        Removes a card from the catalog and all of its indexes.
+        """
+        self.remove_all([card_name])
+
+    def remove_all(self, card_names: list[str]):
+        """
+        Removes cards from the catalog and all of its indexes.
+
+        The card list and each index list the cards are in are rebuilt once, however
+        many cards are removed.
+        """
+        removed = {}
+        for card_name in card_names:
+            card = self.by_name.pop(get_url_form(card_name), None)
+            if card is not None:
+                removed[id(card)] = card
+
+        if not removed:
+            return
+
+        # Index lists the removed cards are in, by the index and key they are under.
+        touched = {}
+        for card in removed.values():
+            for index, key in self._index_keys(card):
+                touched[(id(index), key)] = (index, key)
+
+        self.cards = [c for c in self.cards if id(c) not in removed]
+        for index, key in touched.values():
+            cards = [c for c in index.get(key, []) if id(c) not in removed]
+            if cards:
+                index[key] = cards
+            else:
+                index.pop(key, None)
+
+    def diff(self, cards: list[dict[str, Any]]) -> CatalogDiff:
+        """
+        Compares the catalog against a newer list of cards.
+        """
+        new: dict[str, dict[str, Any]] = {}
+        for card in cards:
+            new.setdefault(get_url_form(card["name"]), card)
+
+        added = [card for name, card in new.items() if name not in self.by_name]
+        changed = [
+            card
+            for name, card in new.items()
+            if name in self.by_name and self.by_name[name] != card
+        ]
+        removed = [name for name in self.by_name if name not in new]
+
+        return CatalogDiff(added, changed, removed)
+
+    def patched(self, diff: CatalogDiff) -> "CardCatalog":
+        """
+        Returns a copy of the catalog with the differences applied.
+
+        Only the added, changed and removed cards are indexed again, the catalog itself
+        is left untouched so that it can still be read while the copy is built.
+        """
+        catalog = CardCatalog()
+        catalog.cards = list(self.cards)
+        catalog.by_name = dict(self.by_name)
+        catalog.by_set = {k: list(v) for k, v in self.by_set.items()}
+        catalog.by_type = {k: list(v) for k, v in self.by_type.items()}
+        catalog.by_rarity = {k: list(v) for k, v in self.by_rarity.items()}
+
+        catalog.remove_all(diff.removed + [card["name"] for card in diff.changed])
+
+        catalog.add_all(diff.changed)
+        catalog.add_all(diff.added)
+        return catalog
+
+    def get(self, card_name: str) -> dict[str, Any] | None:
+        """
+        Gets the card object by card name, the name is converted to URL form before lookup.
+        """
+        return self.by_name.get(get_url_form(card_name))
+
+    def get_by_set(self, set_name: str) -> list[dict[str, Any]]:
+        """
+        Returns all cards that have been printed in the given set.
+        """
+        return self.by_set.get(set_name.lower(), [])
+
+    def get_by_type(self, card_type: str) -> list[dict[str, Any]]:
+        """
+        Returns all cards of the given type, for example Minion or Site.
+        """
+        return self.by_type.get(card_type.lower(), [])
+
+    def get_by_rarity(self, rarity: str) -> list[dict[str, Any]]:
+        """
+        Returns all cards of the given rarity.
+        """
+        return self.by_rarity.get(rarity.lower(), [])
+
+    def names(self) -> list[str]:
+        """
+        Returns the URL form names of all cards in the catalog.
+        """
+        return list(self.by_name)
+
+    def _index_keys(self, card: dict[str, Any]):
+        for _set in card.get("sets", []):
+            yield self.by_set, _set["name"].lower()
+
+        guardian = card.get("guardian") or {}
+        if guardian.get("type"):
+            yield self.by_type, guardian["type"].lower()
+        if guardian.get("rarity"):
+            yield self.by_rarity, guardian["rarity"].lower()
+
+
+def get_catalog() -> CardCatalog:
+    """
+    Returns the process-wide card catalog, loading cards.json on first use.
+
+    Loading is deferred until the catalog is actually needed so that importing modules
+    that look up cards does not touch the disk or the network.
+    """
+    global _catalog
+
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = CardCatalog(load_cards())
+
+    return _catalog
+
+
+def set_catalog(catalog: CardCatalog | None):
+    """
+    Replaces the process-wide card catalog.
+
+    Passing None resets the catalog so that it is loaded again on next use, tests use
+    this to inject a small in-memory catalog.
+    """
+    global _catalog
+
+    with _catalog_lock:
+        _catalog = catalog
@@ -1,8 +1,24 @@
+import asyncio
+from collections.abc import Hashable
+from concurrent.futures import Executor
+
+from src.discord import check_channel
+from src.util import get_url_form
+
+
 class BaseCommand(object):
     """
     The base class for commands.
     """
 
+    # Commands whose get_content blocks, for example by making web requests, are run
+    # in a worker thread so that the event loop keeps handling other events.
+    blocking = False
+
+    # Commands whose content only depends on their coalesce_key, requests with the same
+    # key made while one is in flight share its result.
+    coalesce = False
+
     def __init__(self, command: list[str]):
         """
         Initialize a new command.
@@ -19,6 +35,31 @@ class BaseCommand(object):
         """
         raise Exception("get_content function should be overridden by a subclass.")
 
+    async def get_content_async(self, msg, parameters) -> str:
+        """
+        Returns the content from a resolving command without blocking the event loop.
+
+        Commands that are natively asynchronous override this function instead of get_content.
+        """
+        return self.get_content(msg, parameters)
+
+    def coalesce_key(self, msg, parameters) -> Hashable:
+        """
+        Returns what the content of a coalesced command depends on, the parameters unless
+        overridden.
+        """
+        return tuple(parameters)
+
+    async def invoke(self, msg, parameters, executor: Executor | None = None) -> str:
+        """
+        Resolves the command, running blocking commands in the given executor.
+        """
+        if not self.blocking:
+            return await self.get_content_async(msg, parameters)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.get_content, msg, parameters)
+
     def get_command_suffix(self) -> list[str]:
         """
         Returns the command suffix or the string after the command prefix character.
@@ -30,3 +71,23 @@ class BaseCommand(object):
         Checks if given suffix is recognized as this commands suffix.
         """
         return suffix in self.command
+
+
+class ChannelCoalesceKey:
+    """
+    Coalesces requests by their parameters and whether they were made on a server, for
+    commands that answer private messages without making a request.
+    """
+
+    def coalesce_key(self, msg, parameters) -> Hashable:
+        return check_channel(msg.channel), tuple(parameters)
+
+
+class CardNameCoalesceKey:
+    """
+    Coalesces requests by the card name in URL form, so that names that only differ in
+    case or spacing share a request.
+    """
+
+    def coalesce_key(self, msg, parameters) -> Hashable:
+        return get_url_form(" ".join(parameters))
@@ -1,5 +1,6 @@
 from src.commands.base import BaseCommand
 
+from src.catalog import CardCatalog
 from src.trie import Trie
 import src.util as util
 import src.curiosa as curiosa
@@ -11,9 +12,9 @@ class CardCommand(BaseCommand):
     Get information about a card by providing a card name.
     """
 
-    def __init__(self, command: list[str], pt: Trie, cards: dict):
+    def __init__(self, command: list[str], pt: Trie, catalog: CardCatalog):
         self.pt = pt
-        self.cards = cards
+        self.catalog = catalog
 
         super().__init__(command)
 
@@ -25,7 +26,7 @@ class CardCommand(BaseCommand):
         """
         card_name = util.get_url_form(" ".join(parameters))
 
-        # Safe to assume cards is not none here since we exit if it is
-        received_output = curiosa.get_card_from_name(card_name, self.pt, self.cards)
+        # Safe to assume catalog is not none here since we exit if cards fail to load
+        received_output = curiosa.get_card_from_name(card_name, self.pt, self.catalog)
 
         return code_blockify(received_output)
@@ -1,29 +1,49 @@
-from src.commands.base import BaseCommand
+from src.commands.base import BaseCommand, CardNameCoalesceKey
 
+from src.catalog import CardCatalog
+from src.images import ImageCache
 from src.trie import Trie
-from src.discord import code_blockify
+from src.discord import Attachment, code_blockify
+from src.util import get_url_form
 import src.curiosa as curiosa
 
 
-class CimgCommand(BaseCommand):
+class CimgCommand(CardNameCoalesceKey, BaseCommand):
     """
-    Gets card image in URL form.
+    Gets card image as an attachment or in URL form.
     """
 
-    def __init__(self, command: list[str], pt: Trie, cards: dict):
+    # Images that are not cached yet are downloaded.
+    blocking = True
+    coalesce = True
+
+    def __init__(
+        self,
+        command: list[str],
+        pt: Trie,
+        catalog: CardCatalog,
+        images: ImageCache | None = None,
+    ):
         self.pt = pt
-        self.cards = cards
+        self.catalog = catalog
+        self.images = images
 
         super().__init__(command)
 
-    def get_content(self, msg, parameters) -> str:
+    def get_content(self, msg, parameters) -> str | Attachment:
         """
         Usage:
 
-        !cimg <card_name> returns the URL for the image of the given card name.
+        !cimg <card_name> returns the image of the given card name.
         """
+        card = self.catalog.get(" ".join(parameters))
+        if card is not None and self.images is not None:
+            path = self.images.fetch(card)
+            if path is not None:
+                return Attachment(path, get_url_form(card["name"]) + ".png")
+
         image_url = curiosa.generate_image_url(
-            " ".join(parameters), self.pt, self.cards
+            " ".join(parameters), self.pt, self.catalog
         )
 
         if not image_url.startswith("https://"):
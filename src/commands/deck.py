@@ -1,16 +1,20 @@
-from src.commands.base import BaseCommand
+from src.commands.base import BaseCommand, ChannelCoalesceKey
 
+from src.browser import BrowserPool
 from src.discord import check_channel, code_blockify
 import src.curiosa as curiosa
 
 
-class DeckCommand(BaseCommand):
+class DeckCommand(ChannelCoalesceKey, BaseCommand):
     """
     Gets cards belonging to a deck from a curiosa.io URL or ID.
     """
 
-    def __init__(self, command: list[str], browser):
-        self.browser = browser
+    blocking = True
+    coalesce = True
+
+    def __init__(self, command: list[str], browsers: BrowserPool):
+        self.browsers = browsers
 
         super().__init__(command)
 
@@ -35,12 +39,12 @@ class DeckCommand(BaseCommand):
         split_request = parameters[0].split("/")
 
         if len(split_request) > 1:
-            received_output = curiosa.get_deck_from_url(
-                parameters[0], self.browser, False
-            )
+            get_deck = curiosa.get_deck_from_url
         else:
-            received_output = curiosa.get_deck_from_id(
-                parameters[0], self.browser, False
-            )
+            get_deck = curiosa.get_deck_from_id
+
+        received_output = curiosa.deck_or_busy_message(
+            get_deck, parameters[0], self.browsers, False
+        )
 
         return code_blockify(received_output)
@@ -1,19 +1,23 @@
-from src.commands.base import BaseCommand
+from src.commands.base import BaseCommand, CardNameCoalesceKey
 
+from src.catalog import CardCatalog
 from src.trie import Trie
 import src.util as util
 import src.curiosa as curiosa
 from src.discord import code_blockify, message_truncate
 
 
-class FaqCommand(BaseCommand):
+class FaqCommand(CardNameCoalesceKey, BaseCommand):
     """
     Gets FAQ entries from curiosa.io for given card name.
     """
 
-    def __init__(self, command: list[str], pt: Trie, cards: dict):
+    blocking = True
+    coalesce = True
+
+    def __init__(self, command: list[str], pt: Trie, catalog: CardCatalog):
         self.pt = pt
-        self.cards = cards
+        self.catalog = catalog
 
         super().__init__(command)
 
@@ -26,7 +30,7 @@ class FaqCommand(BaseCommand):
         """
         card_name = util.get_url_form(" ".join(parameters))
 
-        faq_entries = curiosa.get_faq_entries(card_name, self.pt, self.cards)
+        faq_entries = curiosa.get_faq_entries(card_name, self.pt, self.catalog)
 
         # preserve 6 space for code block
         truncated = message_truncate(faq_entries, 6)
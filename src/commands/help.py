@@ -1,8 +1,7 @@
 from src.commands.base import BaseCommand
+from src.commands.registry import CommandRegistry
 
-from src.discord import boldify, code_blockify
-
-import inspect
+from src.discord import code_blockify
 
 
 class HelpCommand(BaseCommand):
@@ -10,13 +9,10 @@ class HelpCommand(BaseCommand):
     Returns this message.
     """
 
-    def __init__(self, command: list[str], commands: list[BaseCommand]):
+    def __init__(self, command: list[str], registry: CommandRegistry):
         super().__init__(command)
 
-        self.commands = commands
-        self.commands.append(self)
-
-        self.content = self.build_content()
+        self.registry = registry
 
     def get_content(self, msg, parameters) -> str:
         """
@@ -26,31 +22,14 @@ class HelpCommand(BaseCommand):
         !help <command> returns usage information about a command.
         """
         if len(parameters) > 0:
-            for command in self.commands:
-                if command.is_command_suffix(parameters[0]):
-                    doc_string = inspect.getdoc(command.get_content)
-
-                    if doc_string is None:
-                        return f"No help provided for command: {parameters[0]}."
-                    else:
-                        return code_blockify(doc_string)
-
-            # Could not find explicit help for the given parameter.
-            return f"Invalid command: {parameters[0]}"
-
-        return self.content
+            if parameters[0] not in self.registry:
+                # Could not find explicit help for the given parameter.
+                return f"Invalid command: {parameters[0]}"
 
-    def build_content(self) -> str:
-        """
-        Builds the help commands content.
-        """
-        output = "Archimago provides the following commands:\n\n"
-        for command in self.commands:
-            output += "- " + boldify(", ".join(command.get_command_suffix())) + ": "
-
-            doc_string = inspect.getdoc(command)
-            if doc_string is None:
-                output += "\n"
+            usage = self.registry.usage(parameters[0])
+            if usage is None:
+                return f"No help provided for command: {parameters[0]}."
             else:
-                output += doc_string + "\n"
-        return output
+                return code_blockify(usage)
+
+        return self.registry.overview()
@@ -1,16 +1,22 @@
-from src.commands.base import BaseCommand
+from src.commands.base import BaseCommand, ChannelCoalesceKey
 
+from src.browser import BrowserPool
 from src.discord import check_channel, code_blockify
 import src.curiosa as curiosa
+from src import overlap
 
 
-class OverlapCommand(BaseCommand):
+class OverlapCommand(ChannelCoalesceKey, BaseCommand):
     """
     Get overlapping cards between decks having provided at least 2 deck IDs.
     """
 
-    def __init__(self, command: list[str], browser):
-        self.browser = browser
+    blocking = True
+    coalesce = True
+
+    def __init__(self, command: list[str], browsers: BrowserPool, max_decks: int = 8):
+        self.browsers = browsers
+        self.max_decks = max_decks
 
         super().__init__(command)
 
@@ -19,16 +25,22 @@ class OverlapCommand(BaseCommand):
         Usage:
 
         !overlap <id#1> <id#2> returns the overlapping cards between two deck IDs.
+        !overlap union <id#1> <id#2> returns the cards found in any of the decks.
+        !overlap difference <id#1> <id#2> returns the cards in the first deck but not in the second.
         """
         ctx = msg.channel
 
         if not check_channel(ctx):
             return "Overlap command can currently only be used on servers, not in private messages."
 
+        mode = "intersection"
+        if parameters and parameters[0].lower() in overlap.MODES:
+            mode, parameters = parameters[0].lower(), parameters[1:]
+
         # Avoid blocking the whole app by providing a giant list of ids.
-        if len(parameters) > 3:
-            parameters = parameters[0:3]
+        if len(parameters) > self.max_decks:
+            parameters = parameters[0 : self.max_decks]
 
-        received_output = curiosa.get_overlapping_cards(parameters, self.browser)
+        received_output = curiosa.get_overlapping_cards(parameters, self.browsers, mode)
 
         return code_blockify(received_output)
@@ -0,0 +1,116 @@
+import inspect
+from collections.abc import Iterator
+
+from src.commands.base import BaseCommand
+from src.discord import boldify
+from src.trie import Trie
+
+
+class CommandRegistry:
+    """
+    The commands of the bot by alias.
+
+    Aliases map straight to their commands, so finding a command does not depend on how
+    many commands there are. The help text of each command is taken from its docstrings
+    once when it is registered. Commands are listed in the order they were registered.
+    """
+
+    def __init__(self, commands: list[BaseCommand] | None = None):
+        self._commands: list[BaseCommand] = []
+        self._aliases: dict[str, BaseCommand] = {}
+        # Command to its description and its usage, from its class and get_content docstrings.
+        self._help: dict[BaseCommand, tuple[str | None, str | None]] = {}
+
+        # Built on first use after the commands change.
+        self._alias_tree: Trie | None = None
+        self._overview: str | None = None
+
+        for command in commands or []:
+            self.register(command)
+
+    def __len__(self) -> int:
+        return len(self._commands)
+
+    def __iter__(self) -> Iterator[BaseCommand]:
+        return iter(list(self._commands))
+
+    def __contains__(self, alias: str) -> bool:
+        return alias in self._aliases
+
+    def register(self, command: BaseCommand):
+        """
+        Registers a command under all of its aliases.
+
+        Raises ValueError if one of the aliases already belongs to another command.
+        """
+        taken = [alias for alias in command.get_command_suffix() if alias in self]
+        if taken:
+            raise ValueError(f"Command aliases already registered: {', '.join(taken)}")
+
+        self._commands.append(command)
+        for alias in command.get_command_suffix():
+            self._aliases[alias] = command
+        self._help[command] = (
+            inspect.getdoc(command),
+            inspect.getdoc(command.get_content),
+        )
+        self._changed()
+
+    def unregister(self, alias: str) -> BaseCommand | None:
+        """
+        Removes the command with the given alias along with its other aliases and returns
+        it, or None if there is no such command.
+        """
+        command = self._aliases.get(alias)
+        if command is None:
+            return None
+
+        self._commands.remove(command)
+        for name in command.get_command_suffix():
+            del self._aliases[name]
+        del self._help[command]
+        self._changed()
+
+        return command
+
+    def get(self, alias: str) -> BaseCommand | None:
+        """
+        Returns the command with the given alias, or None if there is no such command.
+        """
+        return self._aliases.get(alias)
+
+    def usage(self, alias: str) -> str | None:
+        """
+        Returns the usage information of the command with the given alias, or None if it
+        has none or there is no such command.
+        """
+        command = self._aliases.get(alias)
+        return None if command is None else self._help[command][1]
+
+    def overview(self) -> str:
+        """
+        Returns the list of commands and their descriptions.
+        """
+        if self._overview is None:
+            output = "Archimago provides the following commands:\n\n"
+            for command in self._commands:
+                aliases = ", ".join(command.get_command_suffix())
+                description = self._help[command][0]
+                output += "- " + boldify(aliases) + ": " + (description or "") + "\n"
+            self._overview = output
+
+        return self._overview
+
+    def suggest(self, alias: str) -> str | None:
+        """
+        Returns the registered alias closest to a mistyped one, or None if none is close.
+        """
+        if self._alias_tree is None:
+            self._alias_tree = Trie(list(self._aliases))
+
+        match = self._alias_tree.fuzzy_match(alias)
+        return None if match is None else match[1]
+
+    def _changed(self):
+        self._alias_tree = None
+        self._overview = None
@@ -0,0 +1,34 @@
+from collections.abc import Awaitable, Callable
+
+from src.commands.base import BaseCommand
+
+
+class ReloadCommand(BaseCommand):
+    """
+    Reloads card data, terms and configuration, only available to maintainers.
+    """
+
+    def __init__(
+        self,
+        command: list[str],
+        reload: Callable[[], Awaitable[str]],
+        maintainers: list[int],
+    ):
+        self.reload = reload
+        self.maintainers = maintainers
+
+        super().__init__(command)
+
+    def get_content(self, msg, parameters) -> str:
+        """
+        Usage:
+
+        !reload reloads cards.json, terms.toml and config.toml without restarting the bot.
+        """
+        return "Only maintainers can reload the bot."
+
+    async def get_content_async(self, msg, parameters) -> str:
+        if msg.author.id not in self.maintainers:
+            return self.get_content(msg, parameters)
+
+        return await self.reload()
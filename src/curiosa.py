@@ -1,17 +1,36 @@
 import json
+import math
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
 from typing import Any
 
 import requests
 from bs4 import BeautifulSoup
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as ec
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.remote.webdriver import WebDriver
 from selenium.webdriver.remote.webelement import WebElement
 
-from src.util import get_card_entry, get_url_form, parse_threshold, parse_sets
+from src.browser import BrowserPool, BrowserPoolBusy, BrowserUnavailable
+from src.cache import TTLCache
+from src.catalog import CardCatalog
+from src import overlap
+from src.http_client import (
+    HostBusy,
+    get_http_client,
+    http_client_from_config,
+    set_http_client,
+)
+from src.store import get_store, set_store, store_from_config
+from src.util import get_url_form, parse_threshold, parse_sets
 from src.trie import Trie
 
 # The curiosa.io base URL where deck requests are made to.
@@ -20,9 +39,51 @@ curiosa_deck_base_url = "https://curiosa.io/decks/"
 # The curiosa.io base URL where card requests are made to.
 curiosa_card_base_url = "https://curiosa.io/cards/"
 
+# The headings of overlap results and the replies when there are no cards, by mode.
+overlap_headers = {
+    "intersection": "The overlapping cards are:",
+    "union": "The cards found in any of the decks are:",
+    "difference": "The cards in the first deck that are not in the others are:",
+}
+overlap_empty_messages = {
+    "intersection": "There are no overlapping cards.",
+    "union": "There are no cards in the decks.",
+    "difference": "All cards in the first deck are also in the others.",
+}
+
+# The curiosa.io base URL and extension of card images, served through their image optimizer.
+curiosa_image_base_url = (
+    "https://curiosa.io/_next/image?url=https://d27a44hjr9gen3.cloudfront.net/"
+)
+curiosa_image_extension = "_b_s.png&w=384&q=75"
+
 # The maximum time to wait for a timeout in seconds
 maximum_wait_timeout = 3
 
+# The order in which card groups are listed on a curiosa.io deck page.
+deck_group_order = ["Aura", "Artifact", "Minion", "Magic", "Site"]
+
+# The reply when curiosa.io is rate limiting or failing requests, or too many are waiting.
+host_busy_message = "curiosa.io is busy, please try again later."
+
+# Cache for FAQ responses, configured from config.toml when the discord client starts.
+faq_cache = TTLCache(ttl=3600, max_size=512, negative_ttl=600)
+
+# Decks can be retrieved with a single webdriver or a pool of them.
+Browser = WebDriver | BrowserPool
+
+
+class DeckUnavailable(Exception):
+    """
+    Raised when a deck page could not be loaded, a browser would not load it either.
+    """
+
+
+class DeckNotFound(DeckUnavailable):
+    """
+    Raised when curiosa.io has no deck with the requested ID.
+    """
+
 
 def prettify_deck(deck: dict[str, Any]) -> str:
     """
@@ -113,33 +174,10 @@ def get_card_counts(deck) -> str:
 
 def overlap_in_decks(*decks):
     """
-    Returns a dictionary of overlapping cards between decks, all decks are compared against the first one.
+    Returns a dictionary of overlapping cards between decks, with the smallest count of
+    each card among the decks.
     """
-    base = decks[0]
-    overlapping = {}
-    for deck in decks[1 : len(decks)]:
-        for k, v in deck.items():
-            # To avoid finding the same overlaps
-            found_overlaps = []
-
-            if k not in overlapping:
-                overlapping[k] = []
-
-            if k not in base:
-                continue
-
-            for i, e in enumerate(overlapping[k]):
-                for ve in v:
-                    if ve[0] == e[0]:
-                        overlapping[k][i] = (e[0], min(e[1], ve[1]))
-                        found_overlaps.append(e[0])
-
-            for e in base[k]:
-                for ve in v:
-                    if ve[0] == e[0] and ve[0] not in found_overlaps:
-                        overlapping[k].append((ve[0], min(e[1], ve[1])))
-
-    return overlapping
+    return overlap.intersection(*decks)
 
 
 def parse_deck_table(tables: list[WebElement], include_maybe: bool = False):
@@ -170,31 +208,193 @@ def parse_deck_table(tables: list[WebElement], include_maybe: bool = False):
     return deck
 
 
+def extract_next_data(html: str) -> dict[str, Any] | None:
+    """
+    Extracts the json embedded into a curiosa.io page by Next.js.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    script = soup.find(id="__NEXT_DATA__")
+    if script is None or script.string is None:
+        return None
+
+    return json.loads(script.string)
+
+
+def get_trpc_queries(next_data: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Returns the tRPC queries the page was rendered with.
+    """
+    return next_data["props"]["pageProps"]["trpcState"]["json"]["queries"]
+
+
+def parse_deck_entry(entry: dict[str, Any]) -> tuple[str, str, str]:
+    """
+    Parses a single decklist entry into its card type, card name and quantity.
+    """
+    card = entry["card"]
+    card_type = card.get("type") or card.get("guardian", {}).get("type", "Unknown")
+
+    return card_type, card["name"], str(entry.get("quantity", 1))
+
+
+def parse_deck_json(
+    next_data: dict[str, Any], include_maybe: bool = False
+) -> dict[str, Any] | None:
+    """
+    Parses the deck json embedded into a curiosa.io deck page into a deck dictionary.
+
+    The dictionary has the same form as the one parse_deck_table returns. Raises
+    DeckNotFound if the page is for a deck that does not exist.
+    """
+    avatar: list[tuple[str, str]] = []
+    maybeboard: list[tuple[str, str]] = []
+    groups: dict[str, list[tuple[str, str]]] = {}
+    found = False
+
+    for query in get_trpc_queries(next_data):
+        procedure = query["queryKey"][0][-1]
+        data = query["state"]["data"]
+
+        if data is None:
+            if procedure == "getById":
+                raise DeckNotFound("The deck page has no deck.")
+            continue
+
+        if procedure == "getAvatarById":
+            found = True
+            avatar.append((data["card"]["name"], "1"))
+        elif procedure == "getDecklistById":
+            found = True
+            for entry in data:
+                card_type, name, quantity = parse_deck_entry(entry)
+                groups.setdefault(card_type, []).append((name, quantity))
+        elif procedure == "getMaybeboardById" and include_maybe:
+            for entry in data:
+                _, name, quantity = parse_deck_entry(entry)
+                maybeboard.append((name, quantity))
+
+    if not found:
+        return None
+
+    # Order the groups the same way the deck page lists them.
+    deck: dict[str, Any] = {"Avatar": avatar} if avatar else {}
+    for card_type in deck_group_order:
+        if card_type in groups:
+            deck[card_type] = groups.pop(card_type)
+    deck.update(groups)
+
+    if maybeboard:
+        deck["Maybeboard"] = maybeboard
+
+    return deck
+
+
 def request_faq(card_name: str):
     """
     Requests a cards FAQ information and returns the corresponding FAQ information
+
+    Responses are cached, cards that were not found are cached for a shorter time and
+    failed requests are not cached at all. FAQ entries are also kept in the disk store
+    if one is enabled, so that they survive restarts.
+    """
+    return faq_cache.get_or_load(
+        card_name,
+        lambda: load_faq(card_name),
+        negative=lambda faq: isinstance(faq, dict),
+        cacheable=lambda faq: not isinstance(faq, dict) or faq["failed"] == "not_found",
+    )
+
+
+def load_faq(card_name: str):
+    """
+    Loads a cards FAQ information from the disk store, fetching it from curiosa.io and
+    storing it if it is missing.
+    """
+    store = get_store()
+    if store is not None:
+        faq = store.get("faq", card_name)
+        if faq is not None:
+            return faq
+
+    faq = fetch_faq(card_name)
+    if store is not None and isinstance(faq, list):
+        store.put("faq", card_name, faq)
+
+    return faq
+
+
+def warm_caches(limit: int = 512):
+    """
+    Loads the most recently fetched FAQ entries from the disk store into the FAQ cache.
+
+    Entries expire as if they had been cached when they were fetched, and never later
+    than the disk store would keep them. The FAQ cache should be configured first.
+    """
+    store = get_store()
+    if store is None:
+        return
+
+    lifetime = min(faq_cache.ttl, store.max_age.get("faq", math.inf))
+    now = time.time()
+
+    loaded = 0
+    for card_name, faq, fetched_at in reversed(store.recent("faq", limit)):
+        remaining = lifetime - (now - fetched_at)
+        if remaining > 0:
+            faq_cache.set(card_name, faq, ttl=remaining)
+            loaded += 1
+
+    print(f"Loaded {loaded} FAQ entries from the disk store.")
+
+
+def configure_caches(config: dict[str, Any]):
+    """
+    Sets up the FAQ cache, the disk store and the HTTP client from the options of
+    config.toml.
+    """
+    set_http_client(http_client_from_config(config))
+    faq_cache.configure(
+        ttl=config["faq_cache_ttl"],
+        max_size=config["faq_cache_size"],
+        negative_ttl=config["faq_cache_negative_ttl"],
+    )
+
+    if config["store_enabled"]:
+        set_store(store_from_config(config))
+
+
+def fetch_faq(card_name: str):
+    """
+    Fetches a cards FAQ information from curiosa.io, bypassing the FAQ cache.
     """
     url = curiosa_card_base_url + card_name
 
-    req = requests.get(url)
+    try:
+        req = get_http_client().get(url)
+    except HostBusy as e:
+        print(f"Failed to load FAQ for card name: {card_name}, error: {e}")
+        return {"failed": "busy"}
+    except requests.RequestException as e:
+        print(f"Failed to load FAQ for card name: {card_name}, error: {e}")
+        return {"failed": "request_error"}
+
+    if req.status_code == 404:
+        print(f"Failed to load FAQ for card name: {card_name}, card not found!")
+        return {"failed": "not_found"}
+
     if req.status_code != 200:
         print(
             f"Failed to load FAQ for card name: {card_name}, status code: {req.status_code}"
         )
         return {"failed": "err_status_code"}
 
-    soup = BeautifulSoup(req.content.decode("utf-8"), "html.parser")
-
     # Extract the script content that has the json we are looking for
-    content = soup.find(id="__NEXT_DATA__").contents[0]  # type: ignore
-    if content is None:
+    card_json = extract_next_data(req.content.decode("utf-8"))
+    if card_json is None:
         return {"failed": "no_content"}
 
-    content = content.contents[0]  # type: ignore
-    card_json = json.loads(content)
-    card_data = card_json["props"]["pageProps"]["trpcState"]["json"]["queries"][0][
-        "state"
-    ]["data"]
+    card_data = get_trpc_queries(card_json)[0]["state"]["data"]
 
     if card_data is None:
         print(f"Failed to load FAQ for card name: {card_name}, card not found!")
@@ -203,15 +403,18 @@ def request_faq(card_name: str):
     return card_data["faqs"]
 
 
-def get_faq_entries(card_name: str, pt: Trie, cards: dict):
+def get_faq_entries(card_name: str, pt: Trie, catalog: CardCatalog):
     """
     Makes a request for cards FAQ and returns it in string form if the request is successful
     """
     output = f"FAQ entries found for card: {card_name}\n\n"
-    if get_card_entry(card_name, cards) is None:
+    if card_name not in catalog:
         return get_content_suggestion(card_name, pt, "Could not find card by card name")
 
     faq = request_faq(card_name)
+    if isinstance(faq, dict) and faq["failed"] == "busy":
+        return host_busy_message
+
     if isinstance(faq, dict):
         return (
             f"Retrieving FAQ for card {card_name} failed with reason: {faq['failed']}"
@@ -227,19 +430,67 @@ def get_faq_entries(card_name: str, pt: Trie, cards: dict):
     return output.rstrip()
 
 
-def request_deck(
+def request_deck_http(url: str, include_maybe: bool = False) -> dict[str, Any] | None:
+    """
+    Requests a deck from curiosa.io with a plain HTTP request, parsing the deck from the
+    json embedded into the page.
+
+    Returns None if the page loaded but the deck json could not be parsed from it.
+    Raises DeckNotFound if there is no such deck and DeckUnavailable if the page could
+    not be loaded. Raises HostBusy if curiosa.io keeps rate limiting or failing the
+    request, or if too many requests to it are waiting or they are paused. A browser
+    would not fare any better in these cases.
+    """
+    print(f"Retrieving deck information from URL: {url}.")
+
+    try:
+        req = get_http_client().get(url)
+    except HostBusy:
+        raise
+    except requests.RequestException as e:
+        raise DeckUnavailable(f"Request for deck failed: {e}") from e
+
+    if req.status_code == 404:
+        raise DeckNotFound(f"No deck found at URL: {url}")
+
+    # Rate limited or failing even after retries, the host queue is pausing requests.
+    if req.status_code == 429 or req.status_code >= 500:
+        raise HostBusy(f"curiosa.io answered with status code: {req.status_code}")
+
+    if req.status_code != 200:
+        raise DeckUnavailable(
+            f"Failed to load deck from URL: {url}, status code: {req.status_code}"
+        )
+
+    try:
+        next_data = extract_next_data(req.content.decode("utf-8"))
+        if next_data is None:
+            return None
+
+        return parse_deck_json(next_data, include_maybe)
+    except (KeyError, IndexError, TypeError, ValueError) as e:
+        print(f"Failed to parse deck json from URL: {url}, error: {e}")
+        return None
+
+
+def request_deck_selenium(
     url: str, browser: WebDriver, include_maybe: bool = False
 ) -> dict[str, Any] | None:
     """
-    Requests a deck from curiosa.io
+    Requests a deck from curiosa.io by rendering the page in a browser and scraping the
+    deck tables.
+
+    The page load takes one of the request slots of curiosa.io like any other request,
+    so it is paced and paused along with them.
     """
     try:
-        print(f"Retrieving deck information from URL: {url}.")
-        browser.get(url)
+        print(f"Retrieving deck information with browser from URL: {url}.")
+        with get_http_client().host_slot(url):
+            browser.get(url)
 
-        WebDriverWait(browser, maximum_wait_timeout).until(
-            ec.presence_of_element_located((By.CSS_SELECTOR, "div > table"))
-        )
+            WebDriverWait(browser, maximum_wait_timeout).until(
+                ec.presence_of_element_located((By.CSS_SELECTOR, "div > table"))
+            )
         try:
             tables = browser.find_elements(By.TAG_NAME, "table")
             return parse_deck_table(tables, include_maybe)
@@ -253,38 +504,140 @@ def request_deck(
     return None
 
 
-def request_deck_from_id(id: str, browser: WebDriver, include_maybe: bool = False):
+def request_deck(
+    url: str, browser: Browser | None = None, include_maybe: bool = False
+) -> dict[str, Any] | None:
+    """
+    Requests a deck from curiosa.io
+
+    The deck is first requested over plain HTTP. The browser, either a webdriver or a
+    pool of them, is only used as a fallback if the page loaded but the deck could not
+    be parsed from it. Returns None if the deck could not be retrieved.
+    """
+    try:
+        deck = request_deck_http(url, include_maybe)
+    except DeckUnavailable as e:
+        print(e)
+        return None
+
+    if deck is not None or browser is None:
+        return deck
+
+    print("Falling back to retrieving the deck with a browser.")
+    if isinstance(browser, BrowserPool):
+        with browser.checkout() as driver:
+            return request_deck_selenium(url, driver, include_maybe)
+
+    return request_deck_selenium(url, browser, include_maybe)
+
+
+def request_deck_from_id(
+    id: str, browser: Browser | None = None, include_maybe: bool = False
+):
     """
     Appends the base curiosa.io url and passes it into request_deck.
+
+    Decks are kept in the disk store if one is enabled, so that they survive restarts.
     """
-    return request_deck(curiosa_deck_base_url + id, browser, include_maybe)
+    store = get_store()
+    key = f"{id}:maybe" if include_maybe else id
 
+    if store is not None:
+        deck = store.get("deck", key)
+        if deck is not None:
+            # json turns the card entry tuples into lists.
+            return {k: [tuple(e) for e in v] for k, v in deck.items()}
 
-def get_overlapping_cards(ids, browser: WebDriver) -> str:
-    output = ""
-    decks = []
+    deck = request_deck(curiosa_deck_base_url + id, browser, include_maybe)
+    if store is not None and deck is not None:
+        store.put("deck", key, deck)
+
+    return deck
+
+
+def fetch_decks(
+    ids: list[str], browser: Browser | None = None, include_maybe: bool = False
+) -> list[dict[str, Any] | None]:
+    """
+    Requests several decks at once and returns them in the order of the IDs.
 
-    for i, id in enumerate(ids):
+    Decks are requested concurrently unless the browser is a single webdriver, which
+    can only load one page at a time. A deck that could not be retrieved is None.
+    """
+    if not ids:
+        return []
+
+    def fetch(numbered: tuple[int, str]) -> dict[str, Any] | None:
+        i, id = numbered
         print(f"Requesting deck {i + 1} with id: {id}")
-        decks.append(request_deck_from_id(id, browser, False))
+        try:
+            return request_deck_from_id(id, browser, include_maybe)
+        except (BrowserPoolBusy, HostBusy, WebDriverException) as e:
+            print(f"Failed to retrieve deck with id: {id}, error: {e!r}")
+            return None
+
+    # More workers than the HTTP client lets through to curiosa.io at once would only
+    # wait in its queue.
+    workers = 1
+    if browser is None or isinstance(browser, BrowserPool):
+        workers = min(len(ids), get_http_client().max_per_host)
+
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="archimago-deck"
+    ) as executor:
+        return list(executor.map(fetch, enumerate(ids)))
+
+
+def get_overlapping_cards(
+    ids, browser: Browser | None = None, mode: str = "intersection"
+) -> str:
+    """
+    Requests decks by ID and returns their cards combined with the given mode.
+
+    Modes are intersection for cards in all decks, union for cards in any deck and
+    difference for cards in the first deck that are not in the others.
+    """
+    if mode not in overlap.MODES:
+        return (
+            f"Unknown overlap mode: {mode}, expected one of: {', '.join(overlap.MODES)}"
+        )
 
-    overlapping = overlap_in_decks(*decks)
+    output = ""
+    decks = fetch_decks(ids, browser)
+
+    failed = [id for id, deck in zip(ids, decks) if deck is None]
+    decks = [deck for deck in decks if deck is not None]
+
+    for id in failed:
+        output += f"Could not retrieve deck with id: {id}\n"
+
+    if len(decks) < 2:
+        return output + "At least 2 decks are needed to find overlapping cards."
+
+    if failed:
+        output += "\n"
+
+    overlapping = overlap.combine(decks, mode)
 
     # No overlapping cards
     if not overlapping:
-        output = "There are no overlapping cards."
+        output += overlap_empty_messages[mode]
     else:
-        output += "The overlapping cards are:\n\n"
+        output += overlap_headers[mode] + "\n\n"
         output += prettify_deck(overlapping)
 
     return output
 
 
-def get_overlapping_cards_from_str(ids: str, browser: WebDriver) -> str:
-    return get_overlapping_cards(ids.split(" "), browser)
+def get_overlapping_cards_from_str(
+    ids: str, browser: Browser | None = None, mode: str = "intersection"
+) -> str:
+    return get_overlapping_cards(ids.split(" "), browser, mode)
 
 
-def get_deck_from_url(url: str, browser: WebDriver, include_maybe: bool = False) -> str:
+def get_deck_from_url(
+    url: str, browser: Browser | None = None, include_maybe: bool = False
+) -> str:
     output = ""
 
     deck = request_deck(url, browser, include_maybe)
@@ -300,7 +653,9 @@ def get_deck_from_url(url: str, browser: WebDriver, include_maybe: bool = False)
     return output
 
 
-def get_deck_from_id(id: str, browser: WebDriver, include_maybe: bool = False) -> str:
+def get_deck_from_id(
+    id: str, browser: Browser | None = None, include_maybe: bool = False
+) -> str:
     output = ""
 
     deck = request_deck_from_id(id, browser, include_maybe)
@@ -316,11 +671,31 @@ def get_deck_from_id(id: str, browser: WebDriver, include_maybe: bool = False) -
     return output
 
 
-def get_card_from_name(card_name: str, pt: Trie, cards: dict) -> str:
+def deck_or_busy_message(
+    get_deck: Callable[..., str],
+    location: str,
+    browser: Browser | None = None,
+    include_maybe: bool = False,
+) -> str:
+    """
+    Returns the output of get_deck_from_id or get_deck_from_url for a deck ID or URL, or
+    a message to try again later if curiosa.io or the browsers are busy.
+    """
+    try:
+        return get_deck(location, browser, include_maybe)
+    except BrowserUnavailable:
+        return "Could not start a browser to retrieve the deck, please try again later."
+    except BrowserPoolBusy:
+        return "Archimago is busy fetching other decks, please try again later."
+    except HostBusy:
+        return host_busy_message
+
+
+def get_card_from_name(card_name: str, pt: Trie, catalog: CardCatalog) -> str:
     """
     Returns card information from given card name.
     """
-    card = get_card_entry(card_name, cards)
+    card = catalog.get(card_name)
 
     if card is None:
         return get_content_suggestion(card_name, pt, "Could not find card by card name")
@@ -328,19 +703,21 @@ def get_card_from_name(card_name: str, pt: Trie, cards: dict) -> str:
         return prettify_card(card)
 
 
-def generate_image_url(card_name: str, pt: Trie, cards: dict) -> str:
+def generate_image_url(card_name: str, pt: Trie, catalog: CardCatalog) -> str:
     """
     Generates an image URL from a given card name.
     """
-    base_url = (
-        "https://curiosa.io/_next/image?url=https://d27a44hjr9gen3.cloudfront.net/"
-    )
-    extension = "_b_s.png&w=384&q=75"
-
-    card = get_card_entry(card_name, cards)
+    card = catalog.get(card_name)
     if card is None:
         return get_content_suggestion(card_name, pt, "Could not find card by card name")
 
+    return card_image_url(card)
+
+
+def card_image_url(card: dict[str, Any]) -> str:
+    """
+    Returns the image URL of a card object.
+    """
     card_name = get_url_form(card["name"])
 
     set = parse_sets(card)
@@ -348,7 +725,7 @@ def generate_image_url(card_name: str, pt: Trie, cards: dict) -> str:
     # Take the first set and the first 3 characters converted to lower case
     set_name = set[0:3].lower()
 
-    return base_url + set_name + "/" + card_name + extension
+    return curiosa_image_base_url + set_name + "/" + card_name + curiosa_image_extension
 
 
 def get_content_suggestion(content: str, pt: Trie, explanation: str) -> str:
@@ -362,11 +739,11 @@ def get_content_suggestion(content: str, pt: Trie, explanation: str) -> str:
     if pt is None:
         return f"Could not find card by card name {content}."
 
-    prefixes = pt.starts_with(content)
+    prefixes = pt.starts_with(content, limit=1)
     fuzzy = pt.fuzzy_match(content)
 
     if fuzzy is None:
-        prefix = "." if prefixes is None else f", did you mean: {prefixes[0]}?"
+        prefix = "." if not prefixes else f", did you mean: {prefixes[0]}?"
     else:
         prefix = f", did you mean: {fuzzy[1]}?"
 
@@ -0,0 +1,264 @@
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+import src.curiosa as curiosa
+from src.browser import BrowserPool
+from src.catalog import CardCatalog, set_catalog
+from src.daemon_client import DAEMON_HOST, DAEMON_TOKEN_PATH
+from src.http_client import get_http_client
+from src.snapshot import load_card_index, source_stamp
+from src.store import set_store
+from src.trie import Trie
+from src.util import get_url_form
+
+
+class CommandRunner:
+    """
+    Runs CLI commands, keeping the card index and the browser pool between commands.
+
+    The card index is loaded on first use and loaded again whenever cards.json changes,
+    so a running daemon picks up a new download without a restart.
+    """
+
+    def __init__(
+        self, browsers: BrowserPool, cards_path: str | Path = "data/cards.json"
+    ):
+        self.browsers = browsers
+        self.cards_path = Path(cards_path)
+
+        self._index: tuple[CardCatalog, Trie] | None = None
+        self._stamp: tuple[int, int] | None = None
+        self._lock = threading.Lock()
+
+        self.commands: dict[str, Callable[..., str]] = {
+            "card": self.card,
+            "faq": self.faq,
+            "id": self.id,
+            "url": self.url,
+            "overlap": self.overlap,
+        }
+
+    def run(self, name: str, args: dict[str, Any]) -> str:
+        """
+        Runs a command by name with keyword arguments and returns its output.
+
+        Raises ValueError for unknown commands and TypeError for invalid arguments.
+        """
+        command = self.commands.get(name)
+        if command is None:
+            raise ValueError(f"Unknown command: {name}")
+
+        return command(**args)
+
+    def card_index(self) -> tuple[CardCatalog, Trie]:
+        """
+        Returns the card catalog and the prefix tree of card names.
+        """
+        stamp = source_stamp(self.cards_path) if self.cards_path.exists() else None
+
+        with self._lock:
+            if self._index is None or stamp != self._stamp:
+                self._index = load_card_index(self.cards_path)
+                # Loading may have downloaded cards.json, so the stamp is taken again.
+                self._stamp = source_stamp(self.cards_path)
+                set_catalog(self._index[0])
+
+            return self._index
+
+    def card(self, card_name: list[str]) -> str:
+        catalog, prefix_tree = self.card_index()
+        return curiosa.get_card_from_name(
+            get_url_form(" ".join(card_name)), prefix_tree, catalog
+        )
+
+    def faq(self, card_name: list[str]) -> str:
+        catalog, prefix_tree = self.card_index()
+        return curiosa.get_faq_entries(
+            get_url_form(" ".join(card_name)), prefix_tree, catalog
+        )
+
+    def id(self, id: str, include_maybe: bool = False) -> str:
+        return curiosa.deck_or_busy_message(
+            curiosa.get_deck_from_id, id, self.browsers, include_maybe
+        )
+
+    def url(self, url: str, include_maybe: bool = False) -> str:
+        return curiosa.deck_or_busy_message(
+            curiosa.get_deck_from_url, url, self.browsers, include_maybe
+        )
+
+    def overlap(self, ids: str, mode: str = "intersection") -> str:
+        return curiosa.get_overlapping_cards_from_str(ids, self.browsers, mode)
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """
+    Handles requests to the daemon.
+
+     - GET /status returns the uptime and the amount of commands run
+     - POST /command runs {"name": ..., "args": {...}} and returns {"output": ...}
+     - POST /shutdown stops the daemon
+
+    Every request needs the token of the daemon as a bearer token, and POST requests
+    need a json Content-Type, which browsers can not send across origins without asking
+    first.
+    """
+
+    server: "DaemonServer"
+
+    def do_GET(self):
+        if not self.authorized():
+            return self.send_json(403, {"error": "Missing or invalid token."})
+
+        if self.path != "/status":
+            return self.send_json(404, {"error": f"Not found: {self.path}"})
+
+        self.send_json(200, self.server.status())
+
+    def do_POST(self):
+        if not self.authorized():
+            return self.send_json(403, {"error": "Missing or invalid token."})
+
+        content_type = self.headers.get("Content-Type", "").split(";")[0].strip()
+        if content_type != "application/json":
+            return self.send_json(415, {"error": "Expected application/json."})
+
+        if self.path == "/shutdown":
+            self.send_json(200, {"output": "Shutting down."})
+            # shutdown waits for serve_forever to return, so it can not run on this thread.
+            threading.Thread(target=self.server.shutdown).start()
+            return
+
+        if self.path != "/command":
+            return self.send_json(404, {"error": f"Not found: {self.path}"})
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length))
+            name, args = request["name"], request.get("args", {})
+        except (ValueError, KeyError, TypeError) as e:
+            return self.send_json(400, {"error": f"Invalid request: {e}"})
+
+        start = time.perf_counter()
+        try:
+            output = self.server.runner.run(name, args)
+        except (ValueError, TypeError) as e:
+            return self.send_json(400, {"error": str(e)})
+        except Exception as e:
+            print(f"Command {name} failed with arguments: {args}, error: {e}")
+            return self.send_json(500, {"error": str(e)})
+
+        self.server.commands_run += 1
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(f"Ran command {name} in {elapsed:.1f} ms")
+        self.send_json(200, {"output": output})
+
+    def authorized(self) -> bool:
+        """
+        Checks that the request carries the token of the daemon.
+        """
+        expected = f"Bearer {self.server.token}"
+        return hmac.compare_digest(
+            self.headers.get("Authorization", "").encode("utf-8"),
+            expected.encode("utf-8"),
+        )
+
+    def send_json(self, status: int, body: dict[str, Any]):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        # Commands are logged when they are run, request lines would only add noise.
+        pass
+
+
+class DaemonServer(ThreadingHTTPServer):
+    """
+    A local HTTP server that runs CLI commands with a resident CommandRunner.
+
+    Only binds to the loopback interface, the daemon is not meant to be reachable from
+    other machines.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        runner: CommandRunner,
+        port: int,
+        host: str = DAEMON_HOST,
+        token: str | None = None,
+    ):
+        """
+        Starts listening on the given port, a random token is created if none is given.
+        """
+        super().__init__((host, port), DaemonHandler)
+        self.runner = runner
+        self.token = token or secrets.token_urlsafe(32)
+        self.started_at = time.time()
+        self.commands_run = 0
+
+    def status(self) -> dict[str, Any]:
+        """
+        Returns the uptime of the daemon, the amount of commands it has run and the
+        state of the browsers, the FAQ cache and the requests to each host.
+        """
+        return {
+            "uptime": time.time() - self.started_at,
+            "commands_run": self.commands_run,
+            "browsers": self.runner.browsers.metrics(),
+            "faq_cache": curiosa.faq_cache.stats(),
+            "hosts": get_http_client().stats(),
+        }
+
+
+def write_token(path: str | Path, token: str):
+    """
+    Writes the token of the daemon into a file only readable by the current user.
+    """
+    path = Path(path)
+    path.unlink(missing_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def serve_daemon(config: dict[str, Any], port: int):
+    """
+    Starts the daemon and serves commands until it is shut down or interrupted.
+    """
+    curiosa.configure_caches(config)
+
+    browsers = BrowserPool(
+        size=config["browser_pool_size"],
+        max_pages=config["browser_max_pages"],
+        max_waiting=config["browser_max_waiting"],
+    )
+    runner = CommandRunner(browsers)
+    runner.card_index()
+
+    server = DaemonServer(runner, port)
+    write_token(DAEMON_TOKEN_PATH, server.token)
+    print(f"Archimago daemon listening on http://{DAEMON_HOST}:{port}")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("Closing Archimago daemon..")
+        Path(DAEMON_TOKEN_PATH).unlink(missing_ok=True)
+        server.server_close()
+        browsers.close()
+        set_store(None)
@@ -0,0 +1,90 @@
+import http.client
+import json
+import sys
+import tomllib
+from pathlib import Path
+from typing import Any
+
+# The address the daemon listens on, it only accepts connections from this machine.
+DAEMON_HOST = "127.0.0.1"
+
+# The file the daemon writes its token into when it starts. Commands are only accepted
+# with the token, so that web pages open in a browser can not send commands to it.
+DAEMON_TOKEN_PATH = "data/daemon.token"
+
+# The time in seconds to wait for the daemon to accept a connection. The daemon runs on
+# the same machine, so a daemon that is not running is noticed right away.
+CONNECT_TIMEOUT = 0.5
+
+# The time in seconds to wait for a command to finish, deck commands may start a browser.
+COMMAND_TIMEOUT = 120
+
+
+def call_daemon(
+    name: str,
+    args: dict[str, Any],
+    port: int,
+    host: str = DAEMON_HOST,
+    token_path: str | Path | None = None,
+) -> str | None:
+    """
+    Runs a command on the daemon and returns its output.
+
+    The token is read from token_path, DAEMON_TOKEN_PATH by default. Returns None if the
+    daemon is not running or could not run the command, in which case the command should
+    be run in process instead.
+    """
+    token = read_token(token_path or DAEMON_TOKEN_PATH)
+    if token is None:
+        return None
+
+    conn = http.client.HTTPConnection(host, port, timeout=CONNECT_TIMEOUT)
+    try:
+        conn.connect()
+        conn.sock.settimeout(COMMAND_TIMEOUT)
+
+        body = json.dumps({"name": name, "args": args})
+        headers = {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {token}",
+        }
+        conn.request("POST", "/command", body, headers)
+        response = conn.getresponse()
+        data = json.loads(response.read())
+    except (OSError, http.client.HTTPException, ValueError):
+        return None
+    finally:
+        conn.close()
+
+    if not isinstance(data, dict):
+        return None
+
+    if response.status != 200 or not isinstance(data.get("output"), str):
+        print(
+            f"Daemon failed to run command: {name}, error: {data.get('error')}",
+            file=sys.stderr,
+        )
+        return None
+
+    return data["output"]
+
+
+def read_token(path: str | Path) -> str | None:
+    """
+    Returns the token of the running daemon, or None if no daemon has written one.
+    """
+    try:
+        return Path(path).read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+
+def daemon_port(config_path: str | Path = "data/config.toml") -> int:
+    """
+    Returns the port of the daemon from config.toml.
+
+    The config is read with tomllib directly so that commands sent to the daemon do not
+    import the rest of Archimago.
+    """
+    with open(config_path, "rb") as f:
+        return tomllib.load(f)["daemon_port"]
@@ -1,4 +1,16 @@
-from discord import DMChannel, GroupChannel
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from discord import DMChannel, File, GroupChannel
+
+
+class Attachment(NamedTuple):
+    """
+    A file that is sent as an attachment instead of a text reply.
+    """
+
+    path: Path
+    filename: str
 
 
 def check_channel(ctx) -> bool:
@@ -38,3 +50,16 @@ def message_truncate(message: str, preserve: int) -> str:
         message += "..."
 
     return message
+
+
+def reply_arguments(content: str | Attachment, edit: bool = False) -> dict[str, Any]:
+    """
+    Returns the keyword arguments for sending or editing a reply with the given content.
+
+    Attachments replace the text of a reply and text replaces the attachments of a reply.
+    """
+    if isinstance(content, Attachment):
+        file = File(content.path, filename=content.filename)
+        return {"content": None, "attachments": [file]} if edit else {"file": file}
+
+    return {"content": content, "attachments": []} if edit else {"content": content}
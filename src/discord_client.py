@@ -1,34 +1,44 @@
 import asyncio
+import math
 import os
 import random
-import re
 import time
 from asyncio import run as aiorun
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
 import discord
 from discord import CustomActivity
 from dotenv import load_dotenv
-from selenium.webdriver.remote.webdriver import WebDriver
 
-from src.commands.base import BaseCommand
 from src.commands.card import CardCommand
 from src.commands.cimg import CimgCommand
 from src.commands.deck import DeckCommand
 from src.commands.faq import FaqCommand
 from src.commands.help import HelpCommand
 from src.commands.overlap import OverlapCommand
+from src.commands.registry import CommandRegistry
 from src.commands.rulebook import RulebookCommand
+from src.commands.reload import ReloadCommand
 from src.commands.term import TermCommand
 
-from src.util import (
-    get_all_card_names,
-    get_url_form,
-    load_cards,
-    load_toml,
+import src.curiosa as curiosa
+from src.browser import BrowserPool
+from src.catalog import set_catalog
+from src.http_client import get_http_client, http_client_from_config, set_http_client
+from src.images import ImageCache
+from src.ratelimit import Coalescer, RateLimiter
+from src.scheduler import Scheduler
+from src.store import set_store, store_from_config
+from src.replies import Reply, ReplyTracker
+from src.reload import (
+    CARDS_PATH,
+    CONFIG_PATH,
+    TERMS_PATH,
+    BotState,
+    FileWatcher,
+    load_state,
 )
-from src.discord import code_blockify
-from src.trie import Trie
+from src.discord import Attachment, code_blockify, reply_arguments
 
 load_dotenv()
 DISCORD_BOT_TOKEN = os.getenv("discord-bot-token", "")
@@ -44,14 +54,27 @@ class DiscordClient(discord.Client):
 
         super().__init__(intents=intents, **options)
 
-        self._browser: WebDriver | None = None
+        self._browsers: BrowserPool | None = None
+        self._images: ImageCache | None = None
+        self._reload_lock = asyncio.Lock()
+        self._watcher: FileWatcher | None = None
+
+        # Periodic jobs such as presence changes, started once the client is ready.
+        self.scheduler = Scheduler()
+
+        # Limits on how often commands can be used, and identical requests in flight.
+        self.limiter = RateLimiter()
+        self.coalescer = Coalescer()
+
+        # Worker threads for commands that would otherwise block the event loop.
+        self._executor = ThreadPoolExecutor(thread_name_prefix="archimago-worker")
         self.current_status = ""
-        self.commands: list[BaseCommand] = []
+        self.commands = CommandRegistry()
 
-        # Store all replies sent by the bot and the time they are sent
-        self.replies: list[tuple[int, int, float]] = list()
+        # Replies sent by the bot by the message they reply to, so that they can be edited.
+        self.replies = ReplyTracker()
 
-    async def handle_command(self, msg) -> str | None:
+    async def handle_command(self, msg) -> str | Attachment | None:
         """
         Matches commands that start with command prefix to their respective functionality.
         """
@@ -68,40 +91,32 @@ class DiscordClient(discord.Client):
         if command == "stop" and DISCORD_BOT_MODE == "debug":
             await self.close_client()
 
-        return self.invoke_command(command, msg, parameters)
+        return await self.invoke_command(command, msg, parameters)
 
-    def handle_regex(self, msg) -> str | None:
+    async def handle_regex(self, msg) -> str | Attachment | None:
         """
         Handles regex commands
         """
-        content = msg.content
-
-        # Regex patterns for commands that are within messages.
-        card_image_pattern = self.config["cimg_regex"]
-        ci_pattern_match = re.search(card_image_pattern, content)
+        references = self.scanner.scan(msg.content)
+        if not references:
+            return None
 
-        card_text_pattern = self.config["card_regex"]
-        ct_pattern_match = re.search(card_text_pattern, content)
+        card_references = [ref for ref in references if ref.kind == "card"]
 
-        if ct_pattern_match:
+        if card_references:
             # Check if there are more than once matches.
-            all_cards = get_all_card_names(self.cards)
-
-            all_ref_cards = re.findall(card_image_pattern, content)
-            all_ref_cards = list(map(get_url_form, all_ref_cards))
-            all_ref_cards = list(filter(lambda x: x in all_cards, all_ref_cards))
+            all_ref_cards = self.scanner.resolve(references, self.catalog.by_name)
 
-            if len(all_ref_cards) == 1:
-                card_name = ct_pattern_match.group(1).split(" ")
-                return self.invoke_command("card", msg, card_name)
+            # A single unresolved reference still goes through the card command so
+            # that the user gets a card name suggestion.
+            if len(all_ref_cards) <= 1:
+                card_name = card_references[0].name.split(" ")
+                return await self.invoke_command("card", msg, card_name)
 
             return self.get_referenced_cards(all_ref_cards)
 
-        if ci_pattern_match:
-            card_name = ci_pattern_match.group(1).split(" ")
-            return self.invoke_command("cimg", msg, card_name)
-
-        return None
+        card_name = references[0].name.split(" ")
+        return await self.invoke_command("cimg", msg, card_name)
 
     def get_referenced_cards(self, cards: list[str]):
         """
@@ -119,27 +134,41 @@ class DiscordClient(discord.Client):
     def handle_incorrect_command(self, command) -> str:
         """
         Handle case where user send a message that is invalid.
-        """
-        return f"Invalid command: {code_blockify(command)}"
 
-    async def handle_concurrent(self):
+        Suggests the closest command if the command looks mistyped.
         """
-        Handles concurrent events.
+        output = f"Invalid command: {code_blockify(command)}"
 
-         - Changes the activity message of bot randomly every 15 minutes
-         - Prunes reply list
-        """
-        current_time: int = 0
+        suggestion = self.commands.suggest(command)
+        if suggestion is not None:
+            output += f", did you mean: {code_blockify(suggestion)}?"
 
-        while True:
-            if current_time % self.config["status_update_time"] == 0:
-                await self.presence_change()
+        return output
 
-            if current_time % self.config["prune_replies_time"] == 0:
-                self.prune_replies()
+    def schedule_jobs(self):
+        """
+        Registers the periodic jobs of the bot with the intervals of the current config.
 
-            current_time += 1
-            await asyncio.sleep(1)
+         - Changes the activity message of bot randomly every status_update_time seconds
+         - Prunes expired replies every prune_replies_time seconds
+         - Reloads changed data files every reload_watch_interval seconds, if enabled
+        """
+        self.scheduler.add(
+            "presence",
+            self.presence_change,
+            self.config["status_update_time"],
+            jitter=0.1,
+            immediate=True,
+        )
+        self.scheduler.add(
+            "prune_replies", self.replies.prune, self.config["prune_replies_time"]
+        )
+
+        if self._watcher is None:
+            self._watcher = FileWatcher([CARDS_PATH, TERMS_PATH, CONFIG_PATH])
+        self.scheduler.add(
+            "watch_files", self.check_files, self.config["reload_watch_interval"]
+        )
 
     async def presence_change(self):
         """
@@ -161,40 +190,34 @@ class DiscordClient(discord.Client):
             status=None, activity=CustomActivity(self.current_status)
         )
 
-    def prune_replies(self):
+    async def handle_edit(self, replies: list[Reply], message, after):
         """
-        Prunes replies list so that it doesn't grow congested.
+        Handles the edit event by editing the replies to the message.
 
-        When this is called, filter out messages that were replied to more than 30 seconds ago.
+        Command replies are edited with the output of the edited command and regex replies
+        with the edited card references. A reply is left as is if the edited message no
+        longer has anything for it.
         """
-        self.replies = list(
-            filter(
-                lambda x: time.time() - x[2] < self.config["prune_replies_time"],
-                self.replies,
-            )
-        )
+        for reply in replies:
+            if reply.kind == "regex":
+                content = await self.handle_regex(after)
+            else:
+                content = await self.handle_command(after)
 
-    async def handle_edit(self, index, message, after):
-        """
-        Handles the edit event by editing the reply message if the reply message is still present.
-        """
-        reply = self.replies[index]
-        reply_id = reply[1]
-
-        content = self.handle_regex(after)
+            if content is None:
+                continue
 
-        if content is None:
-            content = await self.handle_command(after)
-
-        reply_msg = await message.channel.fetch_message(reply_id)
-        await reply_msg.edit(content=content)
+            reply_msg = await message.channel.fetch_message(reply.id)
+            await reply_msg.edit(**reply_arguments(content, edit=True))
 
     async def on_ready(self):
         """
         Handles the event after the client is initialized.
         """
         print("Archimago now running.")
-        await self.handle_concurrent()
+
+        # on_ready is called again after reconnecting, jobs that run already are kept.
+        self.scheduler.start()
 
     async def on_message(self, msg):
         """
@@ -206,11 +229,11 @@ class DiscordClient(discord.Client):
 
         content = await self.handle_command(msg)
         if content is not None:
-            await self.send_reply(msg, content)
+            await self.send_reply(msg, content, "command")
 
-        ic_content = self.handle_regex(msg)
+        ic_content = await self.handle_regex(msg)
         if ic_content is not None:
-            await self.send_reply(msg, ic_content)
+            await self.send_reply(msg, ic_content, "regex")
 
     async def on_message_edit(self, before, after):
         """
@@ -222,67 +245,116 @@ class DiscordClient(discord.Client):
         if len(after.content) == 0 or before.author == self.user:
             return
 
-        messages = list(map(lambda x: x[0], self.replies))
-        msg_id = before.id
-
-        try:
-            # If we have already replied to the edited message, edit the reply
-            index = messages.index(msg_id)
-
-            await self.handle_edit(index, before, after)
-        except ValueError:
-            # No reply, just return.
-            return
+        # If we have already replied to the edited message, edit the replies.
+        replies = self.replies.get(before.id)
+        if replies:
+            await self.handle_edit(replies, before, after)
 
-    def invoke_command(self, command: str, msg, parameters) -> str:
+    async def invoke_command(self, command: str, msg, parameters) -> str | Attachment:
         """
         Invokes a command by command name and given parameters.
+
+        Blocking commands are run in the worker threads and are given up on after the
+        configured command timeout.
         """
-        for comm in self.commands:
-            if comm.is_command_suffix(command):
-                return comm.get_content(msg, parameters)
+        comm = self.commands.get(command)
 
         # If command was not found in registered commands, return the base case.
-        return self.handle_incorrect_command(command)
+        if comm is None:
+            return self.handle_incorrect_command(command)
+
+        # Aliases of a command share its limits and in flight requests.
+        name = comm.get_command_suffix()[0]
+        guild = getattr(msg, "guild", None)
+        limited = self.limiter.acquire(
+            name, msg.author.id, guild.id if guild is not None else None
+        )
+        if limited is not None:
+            return self.handle_rate_limited(name, *limited)
+
+        def request():
+            return comm.invoke(msg, parameters, self._executor)
 
-    async def send_reply(self, message, content):
+        try:
+            if comm.coalesce:
+                key = (name, comm.coalesce_key(msg, parameters))
+                content = self.coalescer.run(name, key, request)
+            else:
+                content = request()
+
+            return await asyncio.wait_for(content, self.config["command_timeout"])
+        except TimeoutError:
+            print(f"Command {command} timed out with parameters: {parameters}")
+            return f"Command {command} timed out, please try again later."
+
+    def handle_rate_limited(self, command: str, scope: str, retry_after: float) -> str:
+        """
+        Returns the reply to a command that was rejected by the rate limits of a scope.
+        """
+        command = code_blockify(self.config["command_prefix"] + command)
+        wait = f"try again in {math.ceil(retry_after)} seconds."
+
+        if scope == "user":
+            return f"You are using {command} too often, {wait}"
+        if scope == "guild":
+            return f"{command} is used too often on this server, {wait}"
+        return f"{command} is used too often right now, {wait}"
+
+    def request_stats(self) -> dict[str, dict[str, int]]:
+        """
+        Returns the allowed, rejected and coalesced command requests by command.
         """
-        Helper function that adds bots replies to a trackable list.
+        stats = self.limiter.stats()
+        return {
+            "allowed": stats["allowed"],
+            "rejected": stats["rejected"],
+            "coalesced": dict(self.coalescer.coalesced),
+        }
+
+    async def send_reply(
+        self, message, content: str | Attachment, kind: str = "command"
+    ):
         """
-        reply = await message.reply(content)
-        self.replies.append((message.id, reply.id, time.time()))
+        Helper function that replies to a message and tracks the reply by its kind.
+        """
+        reply = await message.reply(**reply_arguments(content))
+        self.replies.add(message.id, reply.id, kind)
 
-    def start_client(self, browser: WebDriver):
+    def start_client(self):
         """
         Starts the discord client and initializes card data.
 
         If card data fails to load, throws an exception.
         """
-        self._browser = browser
-
         try:
-            self.cards = load_cards()
-            self.terms = load_toml(Path("data/terms.toml"))
-            self.config = load_toml(Path("data/config.toml"))
+            state, _ = load_state()
         except Exception as e:
             print(f"Failed to initialize discord client due to exception: {e}")
             return
 
-        self.prefixTree = Trie(get_all_card_names(self.cards))
+        self.config = state.config
+        set_http_client(http_client_from_config(self.config))
 
-        self.commands = list(
-            [
-                CardCommand(["card"], self.prefixTree, self.cards),
-                FaqCommand(["faq", "faqs"], self.prefixTree, self.cards),
-                CimgCommand(["cimg"], self.prefixTree, self.cards),
-                DeckCommand(["deck"], self._browser),
-                OverlapCommand(["overlap"], self._browser),
-                TermCommand(["term"], self.terms),
-                RulebookCommand(["rulebook", "rb"]),
-            ]
+        if self.config["store_enabled"]:
+            set_store(store_from_config(self.config))
+
+        if self.config["image_cache_enabled"]:
+            self._images = ImageCache(
+                self.config["image_cache_path"],
+                max_bytes=self.config["image_cache_max_bytes"],
+            )
+
+        self._browsers = BrowserPool(
+            size=self.config["browser_pool_size"],
+            max_pages=self.config["browser_max_pages"],
+            max_waiting=self.config["browser_max_waiting"],
         )
 
-        self.commands.append(HelpCommand(["help"], self.commands))
+        self.apply_state(state, self.build_commands(state))
+
+        # The FAQ cache is configured by apply_state, warmed entries use its options.
+        if self.config["store_enabled"] and self.config["store_warm_on_start"]:
+            curiosa.warm_caches(self.config["faq_cache_size"])
 
         async def runner():
             async with self:
@@ -291,14 +363,117 @@ class DiscordClient(discord.Client):
         try:
             aiorun(runner())
         except KeyboardInterrupt:
-            self._browser.quit()
+            self._browsers.close()
             return
 
+    def build_commands(self, state: BotState) -> CommandRegistry:
+        """
+        Builds the commands from the given bot state.
+        """
+        commands = CommandRegistry(
+            [
+                CardCommand(["card"], state.prefix_tree, state.catalog),
+                FaqCommand(["faq", "faqs"], state.prefix_tree, state.catalog),
+                CimgCommand(["cimg"], state.prefix_tree, state.catalog, self._images),
+                DeckCommand(["deck"], self._browsers),
+                OverlapCommand(
+                    ["overlap"], self._browsers, state.config["overlap_max_decks"]
+                ),
+                TermCommand(["term"], state.terms),
+                RulebookCommand(["rulebook", "rb"]),
+                ReloadCommand(["reload"], self.reload, state.config["maintainers"]),
+            ]
+        )
+
+        commands.register(HelpCommand(["help"], commands))
+        return commands
+
+    def apply_state(self, state: BotState, commands: CommandRegistry):
+        """
+        Replaces the bot state and commands.
+
+        Nothing here awaits, so event handlers see either the previous state or the new
+        one as a whole.
+        """
+        self.state = state
+        self.catalog = state.catalog
+        self.terms = state.terms
+        self.config = state.config
+        self.prefixTree = state.prefix_tree
+        self.scanner = state.scanner
+        self.commands = commands
+
+        set_catalog(state.catalog)
+        self.limiter.configure(self.config["rate_limits"])
+        self.replies.configure(
+            ttl=self.config["prune_replies_time"],
+            max_size=self.config["reply_tracker_size"],
+        )
+        curiosa.faq_cache.configure(
+            ttl=self.config["faq_cache_ttl"],
+            max_size=self.config["faq_cache_size"],
+            negative_ttl=self.config["faq_cache_negative_ttl"],
+        )
+        self.schedule_jobs()
+
+    async def reload(self) -> str:
+        """
+        Reloads cards.json, terms.toml and config.toml.
+
+        The new state is built in a worker thread and swapped in once it is complete. If
+        loading fails, the current state is kept.
+        """
+        async with self._reload_lock:
+            start = time.perf_counter()
+            loop = asyncio.get_running_loop()
+
+            def prepare():
+                state, summary = load_state(self.state)
+                return state, self.build_commands(state), summary
+
+            try:
+                state, commands, summary = await loop.run_in_executor(
+                    self._executor, prepare
+                )
+            except Exception as e:
+                print(f"Reload failed, keeping the current state: {e}")
+                return f"Reload failed: {e}"
+
+            self.apply_state(state, commands)
+
+            elapsed = (time.perf_counter() - start) * 1e3
+            print(f"Reloaded in {elapsed:.1f} ms: {summary}.")
+            return f"Reloaded in {elapsed:.0f} ms: {summary}."
+
+    async def check_files(self):
+        """
+        Reloads the bot state if one of the files it is built from has changed.
+        """
+        loop = asyncio.get_running_loop()
+
+        changed = await loop.run_in_executor(self._executor, self._watcher.changed)
+        if changed:
+            print(f"Files changed: {', '.join(map(str, changed))}, reloading..")
+            await self.reload()
+
     async def close_client(self):
         """
         Closes the discord client instance.
         """
         print("Closing Archimago..")
-        if self._browser:
-            self._browser.close()
+        await self.scheduler.close()
+        for name, metrics in self.scheduler.metrics().items():
+            print(
+                f"Job {name}: {metrics['runs']} runs, {metrics['failures']} failed, "
+                f"{metrics['mean_time'] * 1e3:.1f} ms on average"
+            )
+        print(f"Command requests: {self.request_stats()}")
+        print(f"FAQ cache: {curiosa.faq_cache.stats()}")
+        for host, stats in get_http_client().stats().items():
+            print(f"Requests to {host}: {stats}")
+
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._browsers:
+            self._browsers.close()
+        set_store(None)
         await self.close()
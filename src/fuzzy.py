@@ -0,0 +1,90 @@
+from collections import defaultdict
+from difflib import SequenceMatcher as SM
+
+
+class FuzzyIndex:
+    """
+    A character n-gram inverted index for fuzzy word matching.
+
+    Instead of scoring a query against every word, the index first narrows the words
+    down to the ones sharing the most n-grams with the query and only scores those.
+    """
+
+    def __init__(
+        self, words: list[str] | None = None, n: int = 2, candidates: int = 30
+    ):
+        """
+        Initializes a new fuzzy index.
+
+        N is the length of the character n-grams and candidates the maximum amount of
+        words that are scored for a single query.
+        """
+        self.n = n
+        self.candidates = candidates
+        self.words: list[str] = []
+        self.gram_counts: list[int] = []
+        self.postings: defaultdict[str, list[int]] = defaultdict(list)
+
+        if words is not None:
+            self.insert_all(words)
+
+    def grams(self, word: str) -> set[str]:
+        """
+        Returns the distinct n-grams of a word.
+
+        Words are padded so that the first and last characters also form their own
+        n-grams, which weights matching word starts and ends higher.
+        """
+        padded = " " * (self.n - 1) + word + " "
+        return {padded[i : i + self.n] for i in range(len(padded) - self.n + 1)}
+
+    def insert_all(self, words: list[str]):
+        """
+        Shorthand for inserting all words of a list into the index.
+        """
+        for word in words:
+            self.insert(word)
+
+    def insert(self, word: str):
+        """
+        Inserts a new word into the index.
+        """
+        word_id = len(self.words)
+        grams = self.grams(word)
+
+        self.words.append(word)
+        self.gram_counts.append(len(grams))
+        for gram in grams:
+            self.postings[gram].append(word_id)
+
+    def matches(self, query: str, limit: int = 5) -> list[tuple[float, str]]:
+        """
+        Returns up to limit best matching words and their ratios, best match first.
+        """
+        query_grams = self.grams(query)
+
+        shared: defaultdict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for word_id in self.postings.get(gram, ()):
+                shared[word_id] += 1
+
+        # Rank candidates by their Dice coefficient over n-grams before scoring them.
+        def dice(word_id: int) -> float:
+            return shared[word_id] / (len(query_grams) + self.gram_counts[word_id])
+
+        candidates = sorted(shared, key=dice, reverse=True)[: self.candidates]
+
+        scored = [
+            (SM(None, query, self.words[word_id]).ratio(), self.words[word_id])
+            for word_id in candidates
+        ]
+        scored.sort(reverse=True)
+
+        return scored[:limit]
+
+    def best_match(self, query: str) -> tuple[float, str] | None:
+        """
+        Returns the best matching word and its ratio, or None if the index is empty.
+        """
+        matches = self.matches(query, limit=1)
+        return matches[0] if matches else None
@@ -0,0 +1,422 @@
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable, Generator
+from contextlib import contextmanager
+from typing import Any
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Status codes that are retried with backoff, the server is expected to recover from these.
+# 429 is retried by HttpClient itself so that the whole host is slowed down.
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# Priority classes of requests, requests of earlier classes are made first.
+PRIORITIES = ("interactive", "background")
+
+# The process-wide HTTP client, created on first use by get_http_client.
+_http_client: "HttpClient | None" = None
+_http_client_lock = threading.Lock()
+
+
+class HostBusy(requests.RequestException):
+    """
+    Raised when too many requests to a host are already waiting.
+    """
+
+
+class CircuitOpen(HostBusy):
+    """
+    Raised when requests to a host are paused because its last requests failed.
+    """
+
+
+class HostSlot:
+    """
+    A permission to make a request to a host, held while the request is made.
+    """
+
+    __slots__ = ("ok", "retry_after", "trial")
+
+    def __init__(self, trial: bool):
+        self.trial = trial
+        self.ok = True
+        self.retry_after = 0.0
+
+    def record(self, ok: bool, retry_after: float = 0.0):
+        """
+        Records whether the request succeeded and how long the host asked to wait.
+        """
+        self.ok = ok
+        self.retry_after = retry_after
+
+
+class HostQueue:
+    """
+    The queue of outbound requests to a single host.
+
+    Requests are started in priority order, at most max_concurrent at a time and at
+    most per_second per second. When max_queued requests are already waiting, further
+    requests are rejected with HostBusy.
+
+    After failure_threshold failed or rate limited requests in a row the circuit opens
+    and requests are rejected with CircuitOpen for cooldown seconds. After that a single
+    trial request is let through, closing the circuit if it succeeds and opening it again
+    if it fails.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_concurrent: int = 4,
+        per_second: float = 4,
+        max_queued: int = 32,
+        failure_threshold: int = 5,
+        cooldown: float = 60,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes an empty queue, a per_second of 0 does not limit the request rate.
+        """
+        self.host = host
+        self.max_concurrent = max_concurrent
+        self.per_second = per_second
+        self.max_queued = max_queued
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.clock = clock
+
+        self._cond = threading.Condition()
+        # Waiting requests as (priority, arrival) so that equal priorities keep order.
+        self._waiting: list[tuple[int, int]] = []
+        self._arrivals = itertools.count()
+        self._active = 0
+        self._next_start = 0.0
+
+        self._failures = 0
+        self._open_until: float | None = None
+        self._trial = False
+
+        self.requests = 0
+        self.rejected = 0
+        self.failed = 0
+        self.throttled = 0
+        self.opened = 0
+
+    def acquire(self, priority: int = 0) -> HostSlot:
+        """
+        Waits until a request may be made to the host and returns its slot.
+        """
+        with self._cond:
+            self._check_circuit()
+            if len(self._waiting) >= self.max_queued:
+                self.rejected += 1
+                raise HostBusy(f"Too many requests to {self.host} are waiting")
+
+            ticket = (priority, next(self._arrivals))
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    wait = None
+                    if (
+                        self._waiting[0] == ticket
+                        and self._active < self.max_concurrent
+                    ):
+                        wait = self._next_start - self.clock()
+                        if wait <= 0:
+                            break
+
+                    self._cond.wait(wait)
+                    self._check_circuit()
+            except BaseException:
+                self._waiting.remove(ticket)
+                heapq.heapify(self._waiting)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._waiting)
+            trial = self._open_until is not None
+            self._trial = self._trial or trial
+            self._active += 1
+            self.requests += 1
+            if self.per_second > 0:
+                self._next_start = max(self._next_start, self.clock()) + (
+                    1 / self.per_second
+                )
+
+            # The next request in line may be able to start right away.
+            self._cond.notify_all()
+            return HostSlot(trial)
+
+    def release(self, slot: HostSlot):
+        """
+        Frees a slot and records the outcome of its request.
+        """
+        with self._cond:
+            self._active -= 1
+            now = self.clock()
+
+            if slot.retry_after > 0:
+                self.throttled += 1
+                self._next_start = max(self._next_start, now + slot.retry_after)
+
+            if slot.ok:
+                self._failures = 0
+                if slot.trial:
+                    self._open_until = None
+            else:
+                self.failed += 1
+                self._failures += 1
+                if slot.trial or self._failures >= self.failure_threshold:
+                    if self._open_until is None or slot.trial:
+                        self.opened += 1
+                        print(
+                            f"Pausing requests to {self.host} for {self.cooldown} s "
+                            f"after {self._failures} failed requests."
+                        )
+                    self._open_until = now + self.cooldown
+
+            if slot.trial:
+                self._trial = False
+            self._cond.notify_all()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the amount of waiting and active requests, the request counters and
+        the state of the circuit.
+        """
+        with self._cond:
+            if self._open_until is None:
+                circuit = "closed"
+            elif self.clock() < self._open_until:
+                circuit = "open"
+            else:
+                circuit = "half-open"
+
+            return {
+                "waiting": len(self._waiting),
+                "active": self._active,
+                "requests": self.requests,
+                "rejected": self.rejected,
+                "failed": self.failed,
+                "throttled": self.throttled,
+                "opened": self.opened,
+                "circuit": circuit,
+            }
+
+    def _check_circuit(self):
+        if self._open_until is None:
+            return
+
+        remaining = self._open_until - self.clock()
+        if remaining > 0:
+            self.rejected += 1
+            raise CircuitOpen(
+                f"Requests to {self.host} are paused for {remaining:.0f} s after failures"
+            )
+        if self._trial:
+            self.rejected += 1
+            raise CircuitOpen(f"Requests to {self.host} are paused until one succeeds")
+
+
+class HttpClient:
+    """
+    A shared HTTP client for all outbound requests made by Archimago.
+
+    Connections are kept alive and pooled per host so that repeated requests skip the
+    TCP and TLS handshakes. Every request has explicit connect and read timeouts and
+    failed requests are retried with exponential backoff.
+
+    Requests to each host go through a HostQueue that caps concurrent requests and the
+    request rate, makes interactive requests before background ones and pauses requests
+    to a host that keeps failing. A 429 response pauses the whole host for the time it
+    asks for before the request is retried.
+    """
+
+    def __init__(
+        self,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10,
+        retries: int = 3,
+        backoff_factor: float = 0.5,
+        max_per_host: int = 4,
+        requests_per_second: float = 4,
+        max_queued: int = 32,
+        failure_threshold: int = 5,
+        cooldown: float = 60,
+    ):
+        """
+        Initializes a new HTTP client.
+
+        The request rate, queue and circuit options apply to each host separately, a
+        requests_per_second of 0 does not limit the request rate.
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.max_per_host = max_per_host
+        self.requests_per_second = requests_per_second
+        self.max_queued = max_queued
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        retry = Retry(
+            total=retries,
+            # Read timeouts are not retried, the timeout already bounds the wait.
+            read=False,
+            backoff_factor=backoff_factor,
+            status_forcelist=RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            # Retry-After is handled by HttpClient, urllib3 would retry 429 responses
+            # that have one without pausing the rest of the host.
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=8, pool_maxsize=max_per_host, max_retries=retry
+        )
+
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = "archimago-bot"
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._hosts: dict[str, HostQueue] = {}
+        self._hosts_lock = threading.Lock()
+
+    def get(
+        self, url: str, priority: str = "interactive", **kwargs
+    ) -> requests.Response:
+        """
+        Makes a GET request, waiting for its turn in the queue of the host.
+
+        Priority is one of PRIORITIES. Keyword arguments are passed on to requests, the
+        default timeouts are used unless a timeout is given. Raises HostBusy if too many
+        requests to the host are waiting or requests to it are paused.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.retries + 1):
+            with self.host_slot(url, priority) as slot:
+                response = self.session.get(url, **kwargs)
+
+                if response.status_code == 429:
+                    slot.record(False, self.retry_after(response, attempt))
+                elif response.status_code >= 500:
+                    slot.record(False)
+
+            if response.status_code != 429 or attempt == self.retries:
+                return response
+
+            # The body of a response that is not returned is never read.
+            response.close()
+
+        return response
+
+    def retry_after(self, response: requests.Response, attempt: int) -> float:
+        """
+        Returns the time in seconds to wait before retrying a rate limited request, the
+        Retry-After header of the response or exponential backoff if it has none.
+        """
+        try:
+            return max(0.0, float(response.headers["Retry-After"]))
+        except (KeyError, ValueError):
+            return self.backoff_factor * 2**attempt
+
+    @contextmanager
+    def host_slot(
+        self, url: str, priority: str = "interactive"
+    ) -> Generator[HostSlot, Any, Any]:
+        """
+        A context manager that holds one of the request slots of a host.
+
+        The request is counted as failed if an exception is raised while the slot is held,
+        and as successful unless recorded otherwise.
+        """
+        queue = self.host_queue(urlsplit(url).netloc)
+
+        slot = queue.acquire(PRIORITIES.index(priority))
+        try:
+            yield slot
+        except BaseException:
+            slot.record(False)
+            raise
+        finally:
+            queue.release(slot)
+
+    def host_queue(self, host: str) -> HostQueue:
+        """
+        Returns the request queue of a host, creating it on first use.
+        """
+        with self._hosts_lock:
+            queue = self._hosts.get(host)
+            if queue is None:
+                queue = self._hosts[host] = HostQueue(
+                    host,
+                    max_concurrent=self.max_per_host,
+                    per_second=self.requests_per_second,
+                    max_queued=self.max_queued,
+                    failure_threshold=self.failure_threshold,
+                    cooldown=self.cooldown,
+                )
+
+            return queue
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns the queue and circuit statistics of every host by host.
+        """
+        with self._hosts_lock:
+            queues = list(self._hosts.values())
+
+        return {queue.host: queue.stats() for queue in queues}
+
+    def close(self):
+        """
+        Closes all pooled connections.
+        """
+        self.session.close()
+
+
+def http_client_from_config(config: dict[str, Any]) -> HttpClient:
+    """
+    Creates an HTTP client with the outbound request options of config.toml.
+    """
+    return HttpClient(
+        requests_per_second=config["http_requests_per_second"],
+        max_queued=config["http_max_queued"],
+        failure_threshold=config["http_failure_threshold"],
+        cooldown=config["http_circuit_cooldown"],
+    )
+
+
+def get_http_client() -> HttpClient:
+    """
+    Returns the process-wide HTTP client, creating it on first use.
+    """
+    global _http_client
+
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = HttpClient()
+
+    return _http_client
+
+
+def set_http_client(client: HttpClient | None):
+    """
+    Replaces the process-wide HTTP client.
+
+    Passing None closes the current client and a new one is created on next use.
+    """
+    global _http_client
+
+    with _http_client_lock:
+        if _http_client is not None and _http_client is not client:
+            _http_client.close()
+        _http_client = client
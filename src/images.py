@@ -0,0 +1,240 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any
+
+import requests
+from PIL import Image, UnidentifiedImageError
+
+from src.curiosa import card_image_url
+from src.http_client import get_http_client
+from src.util import get_url_form
+
+# Site cards are printed sideways, their images are turned 90 degrees clockwise so that
+# they display the right way up.
+SITE_ROTATION = Image.Transpose.ROTATE_270
+
+
+def is_site(card: dict[str, Any]) -> bool:
+    """
+    Checks if a card is a Site.
+    """
+    guardian = card.get("guardian") or {}
+    return guardian.get("type") == "Site"
+
+
+def rotate_image(data: bytes) -> bytes:
+    """
+    Rotates a portrait image into landscape, landscape images are returned as is.
+    """
+    with Image.open(BytesIO(data)) as image:
+        if image.width >= image.height:
+            return data
+
+        output = BytesIO()
+        image.transpose(SITE_ROTATION).save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+class ImageCache:
+    """
+    Card images downloaded once and kept on disk.
+
+    Images are stored under a path derived from the hash of their content, an index maps
+    card names to those paths. Site images are rotated before they are stored. When the
+    images take more than max_bytes, the least recently used ones are removed first.
+    """
+
+    def __init__(
+        self, root: str | Path = "data/images", max_bytes: int = 256 * 1024**2
+    ):
+        """
+        Initializes an image cache in the given directory, loading its index if present.
+        """
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.index_path = self.root / "index.json"
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Card name to [content hash, size in bytes, last used time].
+        self.index: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+        if self.index_path.exists():
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                self.index = json.load(f)
+
+    def path_of(self, digest: str) -> Path:
+        """
+        Returns the path where an image with the given content hash is stored.
+        """
+        return self.root / digest[:2] / f"{digest}.png"
+
+    def get(self, card: dict[str, Any]) -> Path | None:
+        """
+        Returns the path of a cached card image, or None if it has not been cached.
+        """
+        key = get_url_form(card["name"])
+
+        with self._lock:
+            entry = self.index.get(key)
+            if entry is None or not self.path_of(entry[0]).exists():
+                return None
+
+            entry[2] = time.time()
+            return self.path_of(entry[0])
+
+    def fetch(
+        self, card: dict[str, Any], priority: str = "interactive", save: bool = True
+    ) -> Path | None:
+        """
+        Returns the path of a card image, downloading it into the cache if needed.
+
+        Priority is the priority class of the download, see PRIORITIES of http_client.
+        Save is passed on to put. Returns None if the image could not be downloaded.
+        """
+        path = self.get(card)
+        if path is not None:
+            self.hits += 1
+            return path
+
+        self.misses += 1
+        url = card_image_url(card)
+
+        try:
+            req = get_http_client().get(url, priority)
+        except requests.RequestException as e:
+            print(f"Failed to download image for card: {card['name']}, error: {e}")
+            return None
+
+        if req.status_code != 200:
+            print(
+                f"Failed to download image for card: {card['name']}, status code: {req.status_code}"
+            )
+            return None
+
+        try:
+            data = rotate_image(req.content) if is_site(card) else req.content
+            Image.open(BytesIO(data)).verify()
+        except (UnidentifiedImageError, OSError) as e:
+            print(f"Downloaded image for card: {card['name']} is not valid, error: {e}")
+            return None
+
+        return self.put(get_url_form(card["name"]), data, save)
+
+    def put(self, key: str, data: bytes, save: bool = True) -> Path:
+        """
+        Stores image data for a key and returns the path it was stored into.
+
+        The new image is never evicted, even if it alone is over max_bytes. Unless save
+        is False the index is written to disk, callers storing many images at once save
+        it once afterwards with save_index.
+        """
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_of(digest)
+
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(path, data)
+
+        with self._lock:
+            self.index[key] = [digest, len(data), time.time()]
+            self._evict(keep=key)
+            if save:
+                self._save_index()
+
+        return path
+
+    def prefetch(self, cards: list[dict[str, Any]], workers: int = 4) -> dict[str, int]:
+        """
+        Downloads the images of all given cards that are not cached yet, behind any
+        images requested by commands.
+
+        Returns the amount of images that were already cached, downloaded and failed.
+        """
+        counts = {"cached": 0, "downloaded": 0, "failed": 0}
+        missing = [card for card in cards if self.get(card) is None]
+        counts["cached"] = len(cards) - len(missing)
+
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for path in executor.map(
+                    lambda card: self.fetch(card, "background", save=False), missing
+                ):
+                    counts["downloaded" if path is not None else "failed"] += 1
+        finally:
+            self.save_index()
+
+        return counts
+
+    def save_index(self):
+        """
+        Writes the index to disk.
+        """
+        with self._lock:
+            self._save_index()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the amount of images and bytes cached, and the hit and miss counters.
+        """
+        with self._lock:
+            return {
+                "images": len(self.index),
+                "bytes": self._size(),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _size(self) -> int:
+        # Cards that share an image only take its space once.
+        return sum({digest: size for digest, size, _ in self.index.values()}.values())
+
+    def _evict(self, keep: str | None = None):
+        size = self._size()
+        if size <= self.max_bytes:
+            return
+
+        for key in sorted(self.index, key=lambda k: self.index[k][2]):
+            if size <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+
+            digest, entry_size, _ = self.index.pop(key)
+            self.evictions += 1
+
+            if any(entry[0] == digest for entry in self.index.values()):
+                continue
+
+            self.path_of(digest).unlink(missing_ok=True)
+            size -= entry_size
+
+    def _save_index(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.index_path, json.dumps(self.index).encode("utf-8"))
+
+
+def write_atomic(path: Path, data: bytes):
+    """
+    Writes data into a temporary file and moves it over path, so that readers never see
+    a partially written file.
+    """
+    fd, temp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
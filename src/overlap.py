@@ -0,0 +1,109 @@
+from typing import Any
+
+# The ways decks can be combined, the first one is the default.
+MODES = ("intersection", "union", "difference")
+
+# A deck as a multiset of card counts keyed by deck section and card name.
+Multiset = dict[tuple[str, str], int]
+
+
+def to_multiset(deck: dict[str, Any]) -> Multiset:
+    """
+    Counts the cards of a deck by section and card name.
+    """
+    counts: Multiset = {}
+    get = counts.get
+    for section, entries in deck.items():
+        for entry in entries:
+            key = (section, entry[0])
+            counts[key] = get(key, 0) + int(entry[1])
+
+    return counts
+
+
+def from_multiset(
+    counts: Multiset, decks: tuple[dict[str, Any], ...]
+) -> dict[str, list[tuple[str, str]]]:
+    """
+    Turns card counts back into a deck, keeping sections and cards in the order they
+    first appear in the given decks. Sections without cards are left out.
+    """
+    deck: dict[str, list[tuple[str, str]]] = {}
+    # Each card is taken out once so that it is only listed where it first appears.
+    remaining = counts.copy()
+
+    for source in decks:
+        for section, entries in source.items():
+            for entry in entries:
+                count = remaining.pop((section, entry[0]), 0)
+                if count > 0:
+                    deck.setdefault(section, []).append((entry[0], str(count)))
+
+    return deck
+
+
+def intersection(*decks: dict[str, Any]) -> dict[str, list[tuple[str, str]]]:
+    """
+    Returns the cards found in every deck, with the smallest count among the decks.
+    """
+    if not decks:
+        return {}
+
+    counts = to_multiset(decks[0])
+    for deck in decks[1:]:
+        other = to_multiset(deck)
+        counts = {
+            key: min(count, other[key]) for key, count in counts.items() if key in other
+        }
+
+    # Every card in the intersection is in the first deck, so its order is enough.
+    return from_multiset(counts, decks[:1])
+
+
+def union(*decks: dict[str, Any]) -> dict[str, list[tuple[str, str]]]:
+    """
+    Returns the cards found in any deck, with the largest count among the decks.
+    """
+    counts: Multiset = {}
+    for deck in decks:
+        for key, count in to_multiset(deck).items():
+            if count > counts.get(key, 0):
+                counts[key] = count
+
+    return from_multiset(counts, decks)
+
+
+def difference(*decks: dict[str, Any]) -> dict[str, list[tuple[str, str]]]:
+    """
+    Returns the cards of the first deck that are not in the other decks.
+
+    Counts are subtracted, so a card the first deck has more copies of is kept with the
+    amount of extra copies.
+    """
+    if not decks:
+        return {}
+
+    counts = to_multiset(decks[0])
+    for deck in decks[1:]:
+        for key, count in to_multiset(deck).items():
+            if key in counts:
+                counts[key] -= count
+
+    # Cards left with zero or fewer copies are dropped when turned back into a deck.
+    return from_multiset(counts, decks[:1])
+
+
+def combine(
+    decks: list[dict[str, Any]], mode: str = "intersection"
+) -> dict[str, list[tuple[str, str]]]:
+    """
+    Combines decks with the given mode, raises ValueError for unknown modes.
+    """
+    if mode == "intersection":
+        return intersection(*decks)
+    if mode == "union":
+        return union(*decks)
+    if mode == "difference":
+        return difference(*decks)
+
+    raise ValueError(f"Unknown overlap mode: {mode}, expected one of {MODES}")
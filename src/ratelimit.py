@@ -0,0 +1,180 @@
+import asyncio
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+# The scopes a command can be limited in, checked in this order.
+SCOPES = ("user", "guild", "global")
+
+
+class TokenBucket:
+    """
+    Allows up to capacity requests at once, refilling at rate requests per second.
+    """
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: float, rate: float, now: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = now
+
+    def refill(self, now: float):
+        """
+        Adds the tokens refilled since the last update.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def retry_after(self) -> float:
+        """
+        Returns the time in seconds until a token is available, 0 if one is available.
+        """
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    Token bucket rate limits of commands per user, per guild and for everyone.
+
+    Limits map command names to scopes and their [requests, seconds], for example
+    {"deck": {"user": [3, 60]}} allows a user 3 deck requests at once and one more every
+    20 seconds. A request has to be allowed in every scope of its command and only takes
+    a token if it is. At most max_buckets user and guild buckets are kept, the least
+    recently used ones are dropped first, which only ever makes a limit more lenient.
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, dict[str, list[float]]] | None = None,
+        max_buckets: int = 8192,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes a rate limiter.
+
+        Clock returns the current time in seconds, tests can provide a fake one.
+        """
+        self.limits = limits or {}
+        self.max_buckets = max_buckets
+        self.clock = clock
+
+        self._buckets: OrderedDict[tuple[str, str, Hashable], TokenBucket] = (
+            OrderedDict()
+        )
+        self.allowed: Counter[str] = Counter()
+        self.rejected: Counter[str] = Counter()
+
+    def configure(self, limits: dict[str, dict[str, list[float]]]):
+        """
+        Replaces the limits, requests made so far no longer count if the limits change.
+        """
+        if limits != self.limits:
+            self.limits = limits
+            self._buckets.clear()
+
+    def acquire(
+        self, command: str, user: Hashable, guild: Hashable | None = None
+    ) -> tuple[str, float] | None:
+        """
+        Takes a token for a request of a user in a guild, guild is None for private
+        messages.
+
+        Returns None if the request is allowed, otherwise the scope that rejected it and
+        the time in seconds until it would be allowed.
+        """
+        limits = self.limits.get(command)
+        if not limits:
+            return None
+
+        now = self.clock()
+        ids = {"user": user, "guild": guild, "global": None}
+
+        buckets = []
+        for scope in SCOPES:
+            if scope not in limits or (scope == "guild" and guild is None):
+                continue
+
+            bucket = self._bucket(command, scope, ids[scope], limits[scope], now)
+            bucket.refill(now)
+            retry_after = bucket.retry_after()
+            if retry_after > 0:
+                self.rejected[command] += 1
+                return scope, retry_after
+            buckets.append(bucket)
+
+        for bucket in buckets:
+            bucket.tokens -= 1
+
+        self.allowed[command] += 1
+        return None
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns the allowed and rejected requests by command and the amount of buckets.
+        """
+        return {
+            "allowed": dict(self.allowed),
+            "rejected": dict(self.rejected),
+            "buckets": len(self._buckets),
+        }
+
+    def _bucket(
+        self, command: str, scope: str, id: Hashable, limit: list[float], now: float
+    ) -> TokenBucket:
+        key = (command, scope, id)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            self._buckets.move_to_end(key)
+            return bucket
+
+        requests, seconds = limit
+        bucket = self._buckets[key] = TokenBucket(requests, requests / seconds, now)
+        if len(self._buckets) > self.max_buckets:
+            self._buckets.popitem(last=False)
+
+        return bucket
+
+
+class Coalescer:
+    """
+    Shares the result of a request with identical requests made while it is in flight.
+
+    Requests are run as tasks that callers wait on without cancelling them, so a caller
+    that gives up does not cancel the request for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self.coalesced: Counter[str] = Counter()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    async def run(
+        self, name: str, key: Hashable, request: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Runs a request unless an identical one is in flight, returning the result of
+        whichever request runs. Name is what the coalesced requests are counted by.
+        """
+        future = self._in_flight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(request())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda f: self._done(key, f))
+        else:
+            self.coalesced[name] += 1
+
+        return await asyncio.shield(future)
+
+    def _done(self, key: Hashable, future: asyncio.Future):
+        if self._in_flight.get(key) is future:
+            del self._in_flight[key]
+
+        # Retrieves the exception so that it is not reported as never retrieved when
+        # every caller has given up.
+        if not future.cancelled():
+            future.exception()
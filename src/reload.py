@@ -0,0 +1,118 @@
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from src.catalog import CardCatalog
+from src.scanner import MessageScanner
+from src.snapshot import load_card_index
+from src.trie import Trie
+from src.util import load_cards, load_toml
+
+# The files that the bot state is built from.
+CARDS_PATH = Path("data/cards.json")
+TERMS_PATH = Path("data/terms.toml")
+CONFIG_PATH = Path("data/config.toml")
+
+
+class BotState:
+    """
+    Everything the bot builds from cards.json, terms.toml and config.toml.
+
+    A state is never modified after it has been built, reloading builds a new state
+    that replaces the previous one as a whole.
+    """
+
+    def __init__(
+        self,
+        catalog: CardCatalog,
+        terms: dict[str, Any],
+        config: dict[str, Any],
+        prefix_tree: Trie,
+        scanner: MessageScanner,
+    ):
+        self.catalog = catalog
+        self.terms = terms
+        self.config = config
+        self.prefix_tree = prefix_tree
+        self.scanner = scanner
+
+
+def load_state(previous: BotState | None = None) -> tuple[BotState, str]:
+    """
+    Builds the bot state from disk and returns it with a summary of what changed.
+
+    If a previous state is given, only the cards that changed are indexed again and the
+    prefix tree and regex patterns are only rebuilt if the card names or the patterns
+    changed.
+    """
+    start = time.perf_counter()
+
+    terms = load_toml(TERMS_PATH)
+    config = load_toml(CONFIG_PATH)
+
+    if previous is None:
+        catalog, prefix_tree = load_card_index(CARDS_PATH)
+        summary = f"{len(catalog)} cards"
+    else:
+        diff = previous.catalog.diff(load_cards(str(CARDS_PATH)))
+        catalog = previous.catalog.patched(diff) if diff else previous.catalog
+
+        # The prefix tree only holds card names, so changed cards do not affect it.
+        if diff.added or diff.removed:
+            prefix_tree = Trie(catalog.names())
+        else:
+            prefix_tree = previous.prefix_tree
+
+        summary = (
+            f"{len(diff.added)} cards added, {len(diff.changed)} changed, "
+            f"{len(diff.removed)} removed"
+        )
+
+    patterns = (config["cimg_regex"], config["card_regex"])
+    if previous is not None and patterns == (
+        previous.config["cimg_regex"],
+        previous.config["card_regex"],
+    ):
+        scanner = previous.scanner
+    else:
+        scanner = MessageScanner(*patterns)
+
+    if previous is not None:
+        if terms != previous.terms:
+            summary += ", terms changed"
+        if config != previous.config:
+            summary += ", config changed"
+
+    elapsed = time.perf_counter() - start
+    print(f"Loaded bot state in {elapsed * 1e3:.1f} ms: {summary}.")
+
+    return BotState(catalog, terms, config, prefix_tree, scanner), summary
+
+
+class FileWatcher:
+    """
+    Detects changes to files by polling their modification times.
+    """
+
+    def __init__(self, paths: list[Path]):
+        self.mtimes = {path: self._mtime(path) for path in paths}
+
+    def changed(self) -> list[Path]:
+        """
+        Returns the files that changed since the last call.
+        """
+        changed = []
+        for path, mtime in self.mtimes.items():
+            current = self._mtime(path)
+            if current != mtime:
+                self.mtimes[path] = current
+                changed.append(path)
+
+        return changed
+
+    def _mtime(self, path: Path) -> float | None:
+        try:
+            return os.stat(path).st_mtime
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,121 @@
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from typing import NamedTuple
+
+
+class Reply(NamedTuple):
+    """
+    A reply sent by the bot and the kind of reply it is, "command" or "regex".
+    """
+
+    id: int
+    kind: str
+
+
+class TrackedMessage:
+    """
+    The replies sent to a single message and the time the first one was sent.
+    """
+
+    __slots__ = ("sent_at", "replies")
+
+    def __init__(self, sent_at: float):
+        self.sent_at = sent_at
+        self.replies: list[Reply] = []
+
+
+class ReplyTracker:
+    """
+    The replies of the bot keyed by the ID of the message they reply to, so that the
+    replies can be edited when that message is edited.
+
+    Messages are kept in the order they were first replied to, which is also the order
+    they expire in, so pruning only looks at the expired messages. At most max_size
+    messages are tracked, the oldest ones are dropped first when the tracker is full.
+
+    The tracker is only used from the event loop and is not thread-safe.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 30,
+        max_size: int = 4096,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes an empty tracker.
+
+        Clock returns the current time in seconds, tests can provide a fake one.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self.clock = clock
+
+        self._messages: OrderedDict[int, TrackedMessage] = OrderedDict()
+
+        self.expired = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def configure(self, ttl: float, max_size: int):
+        """
+        Changes the time to live and the size of the tracker, dropping messages if it
+        shrinks.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._evict()
+
+    def add(self, message_id: int, reply_id: int, kind: str = "command"):
+        """
+        Tracks a reply to a message, a message can have several replies.
+        """
+        now = self.clock()
+        self.prune(now)
+
+        message = self._messages.get(message_id)
+        if message is None:
+            message = self._messages[message_id] = TrackedMessage(now)
+
+        message.replies.append(Reply(reply_id, kind))
+        self._evict()
+
+    def get(self, message_id: int) -> list[Reply]:
+        """
+        Returns the replies to a message, or an empty list if it has no replies or they
+        have expired.
+        """
+        message = self._messages.get(message_id)
+        if message is None or self.clock() - message.sent_at >= self.ttl:
+            return []
+
+        return list(message.replies)
+
+    def prune(self, now: float | None = None) -> int:
+        """
+        Stops tracking the messages that were replied to more than ttl seconds ago and
+        returns how many there were.
+        """
+        if now is None:
+            now = self.clock()
+
+        pruned = 0
+        messages = self._messages
+        while messages:
+            message = next(iter(messages.values()))
+            if now - message.sent_at < self.ttl:
+                break
+
+            messages.popitem(last=False)
+            pruned += 1
+
+        self.expired += pruned
+        return pruned
+
+    def _evict(self):
+        while len(self._messages) > self.max_size:
+            self._messages.popitem(last=False)
+            self.evictions += 1
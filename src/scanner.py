@@ -0,0 +1,65 @@
+import re
+from collections.abc import Container
+from typing import NamedTuple
+
+from src.util import get_url_form
+
+
+class CardReference(NamedTuple):
+    """
+    A card referenced within a message.
+
+    Kind is either "card" for card text references or "cimg" for card image references.
+    """
+
+    kind: str
+    name: str
+
+
+class MessageScanner:
+    """
+    Finds inter-message card references with precompiled regex patterns.
+
+    Both patterns are combined into a single alternation so that a message is only
+    scanned once. Card text patterns are tried first since they usually enclose the
+    card image pattern, for example [[!name]] encloses [!name].
+    """
+
+    def __init__(self, cimg_regex: str, card_regex: str):
+        """
+        Compiles the card image and card text patterns.
+
+        Both patterns are expected to capture the card name in their first group.
+        """
+        card = re.compile(card_regex)
+        cimg = re.compile(cimg_regex)
+
+        self.pattern = re.compile(f"(?P<card>{card.pattern})|(?P<cimg>{cimg.pattern})")
+
+        # Group of the card name within the combined pattern, the named wrapper groups
+        # shift the numbering of the original groups by one.
+        self.card_group = self.pattern.groupindex["card"] + min(card.groups, 1)
+        self.cimg_group = self.pattern.groupindex["cimg"] + min(cimg.groups, 1)
+
+    def scan(self, content: str) -> list[CardReference]:
+        """
+        Returns all card references in the order they appear in the content.
+        """
+        references = []
+
+        for match in self.pattern.finditer(content):
+            if match.group("card") is not None:
+                references.append(CardReference("card", match.group(self.card_group)))
+            else:
+                references.append(CardReference("cimg", match.group(self.cimg_group)))
+
+        return references
+
+    def resolve(
+        self, references: list[CardReference], names: Container[str]
+    ) -> list[str]:
+        """
+        Converts referenced names to URL form and keeps only the ones found in names.
+        """
+        resolved = (get_url_form(reference.name) for reference in references)
+        return [name for name in resolved if name in names]
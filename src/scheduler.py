@@ -0,0 +1,178 @@
+import asyncio
+import inspect
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+
+class Job:
+    """
+    A function run periodically by the scheduler, and how long its runs have taken.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any] | Any],
+        interval: float,
+        jitter: float = 0.0,
+        immediate: bool = False,
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.immediate = immediate
+        self.task: asyncio.Task | None = None
+
+        self.runs = 0
+        self.failures = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.last_time = 0.0
+        self.last_error: str | None = None
+
+    def running(self) -> bool:
+        """
+        Checks if the loop of the job has been started and has not ended.
+        """
+        return self.task is not None and not self.task.done()
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Returns the amount of runs and failures and the run times in seconds.
+        """
+        return {
+            "interval": self.interval,
+            "runs": self.runs,
+            "failures": self.failures,
+            "mean_time": self.total_time / self.runs if self.runs else 0.0,
+            "max_time": self.max_time,
+            "last_time": self.last_time,
+            "last_error": self.last_error,
+        }
+
+
+class Scheduler:
+    """
+    Runs named jobs periodically on the event loop.
+
+    Each job waits its interval, randomly spread by up to jitter times the interval so
+    that jobs with the same interval do not all run at once, after its previous run has
+    finished. Jobs may be coroutine functions or plain functions, plain functions run on
+    the event loop and should be quick.
+
+    Starting an already started scheduler does nothing, so a job never has more than
+    one loop running.
+    """
+
+    def __init__(self, rng: random.Random | None = None):
+        self.jobs: dict[str, Job] = {}
+        self.started = False
+        self._rng = rng or random.Random()
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any] | Any],
+        interval: float,
+        jitter: float = 0.0,
+        immediate: bool = False,
+    ) -> Job | None:
+        """
+        Adds a job, or updates the job with the same name in place.
+
+        Immediate jobs run as soon as they are started instead of after their first
+        interval. An interval of 0 or less removes the job. If the scheduler has been
+        started, the job is started right away.
+        """
+        if interval <= 0:
+            self.remove(name)
+            return None
+
+        job = self.jobs.get(name)
+        if job is None:
+            job = self.jobs[name] = Job(name, func, interval, jitter, immediate)
+        else:
+            # A running loop picks up the new values after its current wait.
+            job.func = func
+            job.interval = interval
+            job.jitter = jitter
+
+        if self.started and not job.running():
+            job.task = asyncio.create_task(self._loop(job), name=f"job-{name}")
+
+        return job
+
+    def remove(self, name: str):
+        """
+        Removes a job, cancelling its loop.
+        """
+        job = self.jobs.pop(name, None)
+        if job is not None and job.task is not None:
+            job.task.cancel()
+
+    def start(self):
+        """
+        Starts the loops of all jobs that are not running yet.
+
+        Must be called from the event loop.
+        """
+        self.started = True
+        for job in self.jobs.values():
+            if not job.running():
+                job.task = asyncio.create_task(self._loop(job), name=f"job-{job.name}")
+
+    async def close(self):
+        """
+        Cancels all jobs and waits for them to stop.
+        """
+        self.started = False
+        tasks = [job.task for job in self.jobs.values() if job.running()]
+        for task in tasks:
+            task.cancel()
+
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """
+        Returns the metrics of every job by name.
+        """
+        return {name: job.metrics() for name, job in self.jobs.items()}
+
+    def delay(self, job: Job) -> float:
+        """
+        Returns the time in seconds to wait before the next run of a job.
+        """
+        spread = job.interval * job.jitter
+        return max(0.0, job.interval + self._rng.uniform(-spread, spread))
+
+    async def run(self, job: Job):
+        """
+        Runs a job once and records how long it took. Failures are logged and recorded
+        but do not stop the job.
+        """
+        start = time.perf_counter()
+        try:
+            result = job.func()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            job.failures += 1
+            job.last_error = repr(e)
+            print(f"Job {job.name} failed: {e!r}")
+
+        elapsed = time.perf_counter() - start
+        job.runs += 1
+        job.total_time += elapsed
+        job.last_time = elapsed
+        job.max_time = max(job.max_time, elapsed)
+
+    async def _loop(self, job: Job):
+        if job.immediate:
+            await self.run(job)
+
+        while True:
+            await asyncio.sleep(self.delay(job))
+            await self.run(job)
@@ -0,0 +1,108 @@
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+from src.catalog import CardCatalog
+from src.trie import Trie
+from src.util import load_cards
+
+# Bumped whenever CardCatalog, Trie or their nodes change shape, older snapshots are
+# then ignored and written again.
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(json_path: str | Path) -> Path:
+    """
+    Returns the path of the snapshot for a cards.json file, for example cards.snapshot.
+    """
+    return Path(json_path).with_suffix(".snapshot")
+
+
+def source_stamp(json_path: str | Path) -> tuple[int, int]:
+    """
+    Returns the size and modification time of a cards.json file.
+    """
+    stat = os.stat(json_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def write_snapshot(
+    json_path: str | Path, catalog: CardCatalog, prefix_tree: Trie
+) -> Path:
+    """
+    Saves the card catalog and prefix tree built from a cards.json file next to it.
+
+    The snapshot records the size and modification time of cards.json so that a
+    snapshot of an older cards.json is never used.
+    """
+    path = snapshot_path(json_path)
+    snapshot = {
+        "version": SNAPSHOT_VERSION,
+        "source": source_stamp(json_path),
+        "catalog": catalog,
+        "prefix_tree": prefix_tree,
+    }
+
+    fd, temp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+    return path
+
+
+def read_snapshot(json_path: str | Path) -> tuple[CardCatalog, Trie] | None:
+    """
+    Loads the card catalog and prefix tree of a cards.json file from its snapshot.
+
+    Returns None if there is no snapshot or it does not match the current cards.json.
+    Snapshots are pickles, so only snapshots written by Archimago itself should be read.
+    """
+    path = snapshot_path(json_path)
+    if not path.exists() or not os.path.exists(json_path):
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+        print(f"Failed to read card snapshot: {path}, error: {e}")
+        return None
+
+    if (
+        not isinstance(snapshot, dict)
+        or snapshot.get("version") != SNAPSHOT_VERSION
+        or snapshot.get("source") != source_stamp(json_path)
+    ):
+        return None
+
+    return snapshot["catalog"], snapshot["prefix_tree"]
+
+
+def load_card_index(
+    json_path: str | Path = "data/cards.json",
+) -> tuple[CardCatalog, Trie]:
+    """
+    Returns the card catalog and the prefix tree of card names.
+
+    Both are loaded from the snapshot when it is up to date. Otherwise they are built
+    from cards.json and the snapshot is written again for the next start.
+    """
+    snapshot = read_snapshot(json_path)
+    if snapshot is not None:
+        return snapshot
+
+    catalog = CardCatalog(load_cards(str(json_path)))
+    prefix_tree = Trie(catalog.names())
+
+    try:
+        write_snapshot(json_path, catalog, prefix_tree)
+    except OSError as e:
+        print(f"Failed to write card snapshot for: {json_path}, error: {e}")
+
+    return catalog, prefix_tree
@@ -0,0 +1,203 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+# The process-wide disk store, None until one is opened with set_store.
+_store: "DiskStore | None" = None
+_store_lock = threading.Lock()
+
+
+class DiskStore:
+    """
+    A persistent key-value store for fetched curiosa.io data, backed by SQLite.
+
+    Entries are json values grouped by namespace, for example decks by deck ID and FAQs
+    by card name, and remember when they were fetched. When the stored values exceed
+    max_bytes, the entries fetched longest ago are evicted first.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_bytes: int = 32 * 1024 * 1024,
+        max_age: dict[str, float] | None = None,
+    ):
+        """
+        Opens a store at the given path, creating the database if it does not exist.
+
+        Max age maps namespaces to the time in seconds their entries stay valid, entries
+        of other namespaces never go stale. Passing ":memory:" as the path keeps the
+        store in memory, which tests use.
+        """
+        self.path = str(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age or {}
+        self.evictions = 0
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        # Losing the last writes on a power failure is fine for a cache, so writes are
+        # not synced to disk on every commit.
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " namespace TEXT NOT NULL,"
+            " key TEXT NOT NULL,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_fetched_at ON entries (fetched_at)"
+        )
+        self._db.commit()
+
+    def get(self, namespace: str, key: str) -> Any | None:
+        """
+        Returns the stored value or None if it is missing or has gone stale.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, fetched_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        value, fetched_at = row
+        if fetched_at < self._oldest(namespace):
+            return None
+
+        return json.loads(value)
+
+    def put(
+        self, namespace: str, key: str, value: Any, fetched_at: float | None = None
+    ):
+        """
+        Stores a json serializable value, replacing any previous value for the key.
+        """
+        data = json.dumps(value, separators=(",", ":"))
+        if fetched_at is None:
+            fetched_at = time.time()
+
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, data, len(data), fetched_at),
+            )
+            self._evict()
+            self._db.commit()
+
+    def delete(self, namespace: str, key: str):
+        """
+        Removes an entry from the store.
+        """
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+            )
+            self._db.commit()
+
+    def recent(self, namespace: str, limit: int) -> list[tuple[str, Any, float]]:
+        """
+        Returns up to limit valid keys, values and fetch times of a namespace, most
+        recently fetched first.
+        """
+        oldest = self._oldest(namespace)
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT key, value, fetched_at FROM entries"
+                " WHERE namespace = ? AND fetched_at >= ?"
+                " ORDER BY fetched_at DESC LIMIT ?",
+                (namespace, oldest, limit),
+            ).fetchall()
+
+        return [(key, json.loads(value), fetched_at) for key, value, fetched_at in rows]
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the amount of entries and bytes stored, and the amount of evictions.
+        """
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+
+        return {"entries": count, "bytes": size, "evictions": self.evictions}
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        with self._lock:
+            self._db.close()
+
+    def _oldest(self, namespace: str) -> float:
+        max_age = self.max_age.get(namespace)
+        return 0.0 if max_age is None else time.time() - max_age
+
+    def _evict(self):
+        (size,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()
+        if size <= self.max_bytes:
+            return
+
+        rows = self._db.execute(
+            "SELECT rowid, size FROM entries ORDER BY fetched_at"
+        ).fetchall()
+
+        evicted = []
+        for rowid, entry_size in rows:
+            if size <= self.max_bytes:
+                break
+            evicted.append((rowid,))
+            size -= entry_size
+
+        self._db.executemany("DELETE FROM entries WHERE rowid = ?", evicted)
+        self.evictions += len(evicted)
+
+
+def store_from_config(config: dict[str, Any]) -> DiskStore:
+    """
+    Opens the disk store configured by the store options of config.toml.
+    """
+    return DiskStore(
+        config["store_path"],
+        max_bytes=config["store_max_bytes"],
+        max_age={
+            "deck": config["store_deck_max_age"],
+            "faq": config["store_faq_max_age"],
+        },
+    )
+
+
+def get_store() -> DiskStore | None:
+    """
+    Returns the process-wide disk store, or None if caching to disk is not enabled.
+    """
+    return _store
+
+
+def set_store(store: DiskStore | None):
+    """
+    Replaces the process-wide disk store, closing the previous one.
+
+    Passing None disables caching to disk.
+    """
+    global _store
+
+    with _store_lock:
+        if _store is not None and _store is not store:
+            _store.close()
+        _store = store
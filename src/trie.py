@@ -1,16 +1,47 @@
-from difflib import SequenceMatcher as SM
+from bisect import bisect_left
+from collections.abc import Iterator
+from itertools import islice
 from typing import List
 
+from src.fuzzy import FuzzyIndex
+
 
 class Node:
     """
     A prefix tree node.
+
+    Children are kept in two parallel sequences instead of a dictionary: a string of
+    the child characters in sorted order and a tuple of the child nodes. Most nodes
+    in a tree of names have a single child, for which this is far more compact.
+
+    Nodes do not store the prefix they represent, words are rebuilt from the path
+    taken from the root instead. Count is the amount of whole words in the subtree.
     """
 
-    def __init__(self, word=""):
-        self.word = word
-        self.children = dict()
+    __slots__ = ("keys", "nodes", "word_node", "count")
+
+    def __init__(self):
+        self.keys = ""
+        self.nodes: tuple[Node, ...] = ()
         self.word_node = False
+        self.count = 0
+
+    def child(self, ch: str) -> "Node | None":
+        """
+        Returns the child node for given character if one exists.
+        """
+        i = self.keys.find(ch)
+        return self.nodes[i] if i >= 0 else None
+
+    def add_child(self, ch: str) -> "Node":
+        """
+        Adds a new child node for given character while keeping the keys sorted.
+        """
+        i = bisect_left(self.keys, ch)
+        node = Node()
+        self.keys = self.keys[:i] + ch + self.keys[i:]
+        self.nodes = self.nodes[:i] + (node,) + self.nodes[i:]
+        return node
 
 
 class Trie:
@@ -26,6 +57,11 @@ class Trie:
         """
         self.root = Node()
         self.word_list: list[str] = []
+        self.fuzzy_index = FuzzyIndex()
+
+        # Node and word counts are kept up to date on insert.
+        self.node_count = 1
+        self.word_count = 0
 
         if words is not None:
             self.insert_all(words)
@@ -41,14 +77,28 @@ class Trie:
         """
         Inserts a new word into the prefix tree.
         """
+        path = [self.root]
         current = self.root
-        for i, ch in enumerate(word):
-            if ch not in current.children:
-                prefix = word[0 : i + 1]
-                current.children[ch] = Node(prefix)
-            current = current.children[ch]
+        for ch in word:
+            # Inlined Node.child since this is the hot path of building the tree.
+            i = current.keys.find(ch)
+            if i >= 0:
+                current = current.nodes[i]
+            else:
+                current = current.add_child(ch)
+                self.node_count += 1
+            path.append(current)
+
+        # Inserting a word that is already present has no effect.
+        if current.word_node:
+            return
+
+        for node in path:
+            node.count += 1
         current.word_node = True
+        self.word_count += 1
         self.word_list.append(word)
+        self.fuzzy_index.insert(word)
 
     def find(self, word):
         """
@@ -56,100 +106,81 @@ class Trie:
         """
         current = self.root
         for ch in word:
-            if ch not in current.children:
+            current = current.child(ch)
+            if current is None:
                 return None
-            current = current.children[ch]
 
-        return current.word if current.word_node else None
+        return word if current.word_node else None
 
     def size(self):
         """
         Returns the size of the trie.
         """
-        stack = [self.root]
-        count = 0
-
-        while stack:
-            curr = stack.pop()
-            count += 1
-
-            for ch in curr.children:
-                stack.append(curr.children[ch])
-
-        return count
+        return self.node_count
 
     def count(self):
         """
         Returns the count of whole words in trie
         """
-        stack = [self.root]
-        count = 0
+        return self.word_count
 
-        while stack:
-            curr = stack.pop()
-            if curr.word_node:
-                count += 1
+    def starts_with(self, prefix: str, limit: int | None = None) -> List[str] | None:
+        """
+        Checks the prefix tree for words starting with given prefix.
 
-            for ch in curr.children:
-                stack.append(curr.children[ch])
+        Words are returned in alphabetical order. If limit is given, only the first limit
+        words are produced and the rest of the subtree is never visited.
+        """
+        words = self.iter_prefix(prefix)
+        if words is None:
+            return None
 
-        return count
+        return list(islice(words, limit))
 
-    def starts_with(self, prefix: str) -> List[str] | None:
+    def iter_prefix(self, prefix: str) -> Iterator[str] | None:
         """
-        Checks the prefix tree for words starting with given prefix.
+        Returns a lazy iterator over the words starting with given prefix in alphabetical order.
+
+        Returns None if no word starts with the prefix.
         """
         current = self.root
         for ch in prefix:
-            if ch not in current.children:
+            current = current.child(ch)
+            if current is None:
                 return None
-            current = current.children[ch]
 
-        # Iteratively check all children to find all complete words in the tree.
-        stack = [current]
-        words = list()
+        return self._iter_words(current, prefix)
+
+    def _iter_words(self, node: Node, prefix: str) -> Iterator[str]:
+        """
+        Yields the whole words of a subtree in alphabetical order.
+        """
+        # A pre-order walk over sorted children visits the words in alphabetical order,
+        # children are pushed in reverse so that the smallest one is popped first.
+        stack = [(node, prefix)]
         while stack:
-            curr = stack.pop()
+            curr, word = stack.pop()
 
             if curr.word_node:
-                words.append(curr.word)
-
-            for ch in curr.children:
-                stack.append(curr.children[ch])
+                yield word
 
-        return words
+            for i in range(len(curr.keys) - 1, -1, -1):
+                stack.append((curr.nodes[i], word + curr.keys[i]))
 
     def fuzzy_match(self, card_name: str) -> tuple[float, str] | None:
         """
         Returns the best rating fuzzy word match from trie.
         """
+        best_match = self.fuzzy_index.best_match(card_name)
 
-        def filter_func(s1, s2):
-            """
-            Filter based on first four characters when possible
-            """
-            s1_len = min(4, len(s1))
-            s2_len = min(s1_len, len(s2))
-
-            for i in range(s1_len):
-                if s1[i] in s2[:s2_len]:
-                    return True
-
-            return False
-
-        # Simple pruning where we only evaluate the words with the same starting letter.
-        pruned_list: list[str] = list(
-            filter(lambda x: filter_func(card_name, x), self.word_list)
-        )
-
-        matched_words = [
-            (SM(None, card_name, word).ratio(), word) for word in pruned_list
-        ]
-
-        if len(matched_words) == 0:
+        if best_match is None:
             return None
 
-        best_match = max(matched_words)
-
         # Return best match if ratio is higher than 0.5
         return best_match if best_match[0] > 0.5 else None
+
+    def fuzzy_matches(self, card_name: str, limit: int = 5) -> list[tuple[float, str]]:
+        """
+        Returns up to limit best rating fuzzy word matches from trie with their ratios.
+        """
+        return self.fuzzy_index.matches(card_name, limit)
@@ -1,12 +1,31 @@
 import json
 import os
 import re
+import tempfile
 import tomllib
 from pathlib import Path
-from typing import Any
+from typing import Any, NamedTuple
 
 import requests
 
+from src.http_client import get_http_client
+
+# The name of the file that the validators of the last cards.json download are kept in.
+CARDS_META_NAME = "cards.json.meta"
+
+
+class CardsUpdate(NamedTuple):
+    """
+    The result of updating cards.json.
+
+    Status is "updated", "unchanged" or "failed". Added and changed hold the names of
+    the cards that differ from the previous cards.json when it was updated.
+    """
+
+    status: str
+    added: tuple[str, ...] = ()
+    changed: tuple[str, ...] = ()
+
 
 def download_cards_json(
     output: str = "data", api_url="https://api.sorcerytcg.com/api/cards"
@@ -14,32 +33,139 @@ def download_cards_json(
     """
     Makes a request to Curiosa.io API to download the official card data.
 
-    Returns whether or not the download was successful.
+    Returns whether or not the download was successful, an up to date cards.json counts
+    as a successful download.
     """
-    print(f"Retrieving sorcery card json file from {api_url}..")
+    return update_cards_json(output, api_url).status != "failed"
 
-    req = requests.get(api_url)
-    req.raise_for_status()
 
-    if req.status_code != 200:
-        print(f"Failed to get cards API with status code: {req.status_code}")
-        return False
+def update_cards_json(
+    output: str = "data", api_url="https://api.sorcerytcg.com/api/cards"
+) -> CardsUpdate:
+    """
+    Downloads the official card data if it has changed since the last download.
 
+    The validators of the last response are kept next to cards.json, so that the API can
+    answer with 304 Not Modified instead of the whole card data. The response is streamed
+    into a temporary file that replaces cards.json only once it has been parsed, so that
+    a failed download never leaves a partially written cards.json behind.
+    """
     output_path = Path(output) / "cards.json"
-    content = req.content.decode("utf-8")
+    meta_path = Path(output) / CARDS_META_NAME
+
+    headers = {}
+    meta = read_cards_meta(meta_path) if output_path.exists() else {}
+    if meta.get("url") == api_url:
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+
+    print(f"Retrieving sorcery card json file from {api_url}..")
 
-    if not is_json(content):
-        print("The requested path did not provide valid json, can not save to file.")
-        return False
+    try:
+        req = get_http_client().get(api_url, headers=headers, stream=True)
+    except requests.RequestException as e:
+        print(f"Failed to get cards API, error: {e}")
+        return CardsUpdate("failed")
+
+    with req:
+        if req.status_code == 304:
+            print(f"Card data has not changed, keeping: {output_path}.")
+            return CardsUpdate("unchanged")
+
+        if req.status_code != 200:
+            print(f"Failed to get cards API with status code: {req.status_code}")
+            return CardsUpdate("failed")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "wb", dir=output_path.parent, suffix=".tmp", delete=False
+        ) as temp:
+            try:
+                for chunk in req.iter_content(chunk_size=64 * 1024):
+                    temp.write(chunk)
+            except requests.RequestException as e:
+                print(f"Failed to download card data, error: {e}")
+                temp.close()
+                os.unlink(temp.name)
+                return CardsUpdate("failed")
 
+    try:
+        with open(temp.name, "r", encoding="utf-8") as json_file:
+            cards = json.load(json_file)
+        if not isinstance(cards, list):
+            raise ValueError("expected a list of cards")
+    except ValueError as e:
+        print(f"The requested path did not provide valid card json, error: {e}")
+        os.unlink(temp.name)
+        return CardsUpdate("failed")
+
+    previous = []
     if output_path.exists():
         print("Cards.json already present, overwriting..")
+        try:
+            with open(output_path, "r", encoding="utf-8") as json_file:
+                previous = json.load(json_file)
+        except ValueError:
+            print("Cards.json present was not valid json, all cards count as added.")
+
+    os.replace(temp.name, output_path)
+    write_cards_meta(
+        meta_path,
+        {
+            "url": api_url,
+            "etag": req.headers.get("ETag"),
+            "last_modified": req.headers.get("Last-Modified"),
+        },
+    )
+
+    update = compare_cards(previous, cards)
+    print(f"Card data successfully downloaded and saved into: {output_path}!")
+    print(f"{len(update.added)} cards added, {len(update.changed)} changed.")
+    for name in update.added:
+        print(f"  + {name}")
+    for name in update.changed:
+        print(f"  ~ {name}")
 
-    with open(output_path, "w+", encoding="utf-8") as json_file:
-        json_file.write(content)
+    return update
 
-    print(f"Card data successfully downloaded and saved into: {output_path}!")
-    return True
+
+def compare_cards(
+    previous: list[dict[str, Any]], cards: list[dict[str, Any]]
+) -> CardsUpdate:
+    """
+    Returns the names of the cards that were added or changed between two card lists.
+    """
+    old = {card["name"]: card for card in previous}
+
+    added = tuple(card["name"] for card in cards if card["name"] not in old)
+    changed = tuple(
+        card["name"]
+        for card in cards
+        if card["name"] in old and old[card["name"]] != card
+    )
+
+    return CardsUpdate("updated", added, changed)
+
+
+def read_cards_meta(meta_path: Path) -> dict[str, Any]:
+    """
+    Reads the validators of the last card data download, or nothing if there are none.
+    """
+    try:
+        with open(meta_path, "r", encoding="utf-8") as meta_file:
+            return json.load(meta_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_cards_meta(meta_path: Path, meta: dict[str, Any]):
+    """
+    Saves the validators of a card data download next to cards.json.
+    """
+    with open(meta_path, "w", encoding="utf-8") as meta_file:
+        json.dump(meta, meta_file)
 
 
 def load_cards(json_path: str = "data/cards.json") -> dict:
@@ -71,18 +197,6 @@ def load_toml(toml_path: Path) -> dict[str, Any]:
         return tomllib.load(toml_file)
 
 
-def is_json(value: str) -> bool:
-    """
-    Checks if string is a valid json.
-    """
-    try:
-        json.loads(value)
-    except ValueError as e:
-        print(f"Failed to load JSON from {value}, error: {e}")
-        return False
-    return True
-
-
 def get_url_form(text: str) -> str:
     """
     Converts text to lower case, replaces spaces with underscores and removes special characters.
@@ -129,11 +243,17 @@ def parse_threshold(guardian) -> str:
     return output
 
 
-def get_card_entry(card_name: str, cards: dict = load_cards()) -> Any | None:
+def get_card_entry(card_name: str, cards: list | None = None) -> Any | None:
     """
     Gets the card object from given card dictionary.
+
+    If no cards are given, the card is looked up from the process-wide card catalog.
     """
-    assert cards is not None
+    if cards is None:
+        # Imported here since the catalog module depends on this one.
+        from src.catalog import get_catalog
+
+        return get_catalog().get(card_name)
 
     for card in cards:
         if get_url_form(card["name"]) == get_url_form(card_name):
@@ -0,0 +1,80 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.http_client import HttpClient, set_http_client
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Serves the responses registered into the routes of the stub server.
+
+    A route is either a (status, headers, body) tuple or a function taking the handler
+    and returning one.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.hits.append(self.path)
+
+        route = self.server.routes.get(self.path, (404, {}, b"Not found"))
+        if callable(route):
+            route = route(self)
+        status, headers, body = route
+
+        self.send_response(status)
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    """Runs a local HTTP server that serves stub responses"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.routes = {}
+    server.hits = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    """A clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A fake clock starting at 0 for classes that take a clock"""
+    return FakeClock()
+
+
+@pytest.fixture
+def http_client():
+    """Sets up a process-wide HTTP client that retries quickly"""
+    # The request rate is not limited so that only the concurrency of requests is timed.
+    client = HttpClient(
+        connect_timeout=1, read_timeout=1, backoff_factor=0, requests_per_second=0
+    )
+    set_http_client(client)
+    yield client
+    set_http_client(None)
@@ -0,0 +1,131 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import src.curiosa as curiosa
+from src.batch import (
+    ItemFailed,
+    deck_id,
+    format_summary,
+    process_card,
+    process_deck,
+    read_items,
+    run_batch,
+)
+from src.catalog import CardCatalog
+from src.trie import Trie
+
+TEST_CARDS_PATH = "test/resources/cards.json"
+
+
+@pytest.fixture
+def catalog():
+    """Sets up a catalog with the test card"""
+    with open(TEST_CARDS_PATH, "r", encoding="utf-8") as f:
+        return CardCatalog(json.load(f))
+
+
+def test_read_items():
+    """Test that empty lines and comments are skipped"""
+    source = io.StringIO("deck1\n\n  # round 2\n deck2 \n")
+    assert read_items(source) == ["deck1", "deck2"]
+
+
+def test_deck_id():
+    """Test that deck IDs are taken from deck URLs"""
+    assert deck_id("cm2d6ea5g00etsenu9qa7syod") == "cm2d6ea5g00etsenu9qa7syod"
+    assert deck_id("https://curiosa.io/decks/abc123/") == "abc123"
+    assert deck_id("https://curiosa.io/decks/abc123?tab=list") == "abc123"
+
+
+def test_run_batch_streams_results():
+    """Test that results are written as they finish and returned in item order"""
+    output = io.StringIO()
+
+    def process(item):
+        time.sleep(0.05 if item == "slow" else 0)
+        if item == "bad":
+            raise ItemFailed("bad item")
+        return item.upper()
+
+    results = run_batch(["slow", "fast", "bad"], process, workers=3, output=output)
+
+    assert [r.item for r in results] == ["slow", "fast", "bad"]
+    assert [r.ok for r in results] == [True, True, False]
+    assert results[2].error == "bad item"
+
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert lines[-1]["item"] == "slow"
+    assert lines[-1]["result"] == "SLOW"
+    assert {line["index"] for line in lines} == {0, 1, 2}
+
+
+def test_run_batch_bounded_workers():
+    """Test that no more than the given amount of items are processed at a time"""
+    lock = threading.Lock()
+    running = 0
+    peak = 0
+
+    def process(item):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.01)
+        with lock:
+            running -= 1
+
+    run_batch([str(i) for i in range(12)], process, workers=3, output=io.StringIO())
+    assert peak == 3
+
+
+def test_run_batch_unexpected_error():
+    """Test that an unexpected error fails the item instead of the batch"""
+
+    def process(item):
+        raise KeyError(item)
+
+    results = run_batch(["a"], process, output=io.StringIO())
+    assert results[0].error == "KeyError('a')"
+    assert "1 failed" in format_summary(results, 0.1)
+    assert "a: KeyError('a')" in format_summary(results, 0.1)
+
+
+def test_run_batch_default_output(capsys):
+    """Test that results go to the current stdout when no output is given"""
+    run_batch(["a"], lambda item: item.upper())
+
+    assert json.loads(capsys.readouterr().out)["result"] == "A"
+
+
+def test_process_card(catalog):
+    """Test that cards are looked up by name and unknown names get a suggestion"""
+    prefix_tree = Trie(catalog.names())
+
+    card = process_card("Apprentice Wizard", catalog, prefix_tree)
+    assert card["guardian"]["cost"] == 3
+
+    with pytest.raises(ItemFailed, match="did you mean: apprentice_wizard"):
+        process_card("aprentice wizard", catalog, prefix_tree)
+
+
+def test_process_deck(monkeypatch):
+    """Test that decks are requested by ID and missing decks fail the item"""
+    requested = []
+
+    def fake_request_deck_from_id(id, browser=None, include_maybe=False):
+        requested.append(id)
+        return {"Avatar": [("Druid", "1")]} if id == "abc123" else None
+
+    monkeypatch.setattr(curiosa, "request_deck_from_id", fake_request_deck_from_id)
+
+    deck = process_deck("https://curiosa.io/decks/abc123", None)
+    assert deck == {"Avatar": [("Druid", "1")]}
+
+    with pytest.raises(ItemFailed, match="missing"):
+        process_deck("missing", None)
+
+    assert requested == ["abc123", "missing"]
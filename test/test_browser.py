@@ -0,0 +1,144 @@
+import threading
+
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from src.browser import BrowserPool, BrowserPoolBusy, BrowserUnavailable
+
+
+class FakeDriver:
+    """A stand-in for a webdriver instance that can be made to crash"""
+
+    def __init__(self):
+        self.crashed = False
+        self.quit_called = False
+
+    @property
+    def current_url(self):
+        if self.crashed:
+            raise WebDriverException("chrome not reachable")
+        return "about:blank"
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def drivers():
+    """Keeps track of all fake drivers created by the pool"""
+    return []
+
+
+@pytest.fixture
+def pool(drivers):
+    """Sets up a browser pool of two fake drivers"""
+
+    def factory():
+        drivers.append(FakeDriver())
+        return drivers[-1]
+
+    pool = BrowserPool(size=2, factory=factory, max_pages=3, max_waiting=1)
+    yield pool
+    pool.close()
+
+
+def test_reuses_browsers(pool, drivers):
+    """Test that browsers are created lazily and reused between checkouts"""
+    assert pool.metrics()["created"] == 0
+
+    for _ in range(2):
+        with pool.checkout() as driver:
+            assert pool.metrics()["in_use"] == 1
+
+    assert len(drivers) == 1
+    assert driver is drivers[0]
+    assert pool.metrics()["in_use"] == 0
+    assert pool.metrics()["idle"] == 1
+
+
+def test_recycles_after_max_pages(pool, drivers):
+    """Test that a browser is restarted after serving max_pages checkouts"""
+    for _ in range(4):
+        with pool.checkout():
+            pass
+
+    assert len(drivers) == 2
+    assert drivers[0].quit_called
+    assert pool.metrics()["recycle_count"] == 1
+
+
+def test_recycles_on_crash(pool, drivers):
+    """Test that a browser that crashes while checked out is discarded"""
+    with pytest.raises(WebDriverException):
+        with pool.checkout():
+            raise WebDriverException("tab crashed")
+
+    with pool.checkout() as driver:
+        assert driver is drivers[1]
+
+    assert drivers[0].quit_called
+    assert pool.metrics()["recycle_count"] == 1
+
+
+def test_timeouts_do_not_recycle(pool, drivers):
+    """Test that page load timeouts do not count as crashes"""
+    with pytest.raises(TimeoutException):
+        with pool.checkout():
+            raise TimeoutException()
+
+    assert pool.metrics()["recycle_count"] == 0
+    assert pool.metrics()["idle"] == 1
+
+
+def test_health_check(pool, drivers):
+    """Test that unhealthy idle browsers are replaced on checkout"""
+    with pool.checkout():
+        pass
+
+    drivers[0].crashed = True
+
+    with pool.checkout() as driver:
+        assert driver is drivers[1]
+
+    assert pool.metrics()["recycle_count"] == 1
+
+
+def test_bounded_wait_queue(pool):
+    """Test that checkouts fail fast when the wait queue is full"""
+    with pool.checkout(), pool.checkout():
+        assert pool.metrics()["in_use"] == 2
+
+        with pytest.raises(BrowserPoolBusy):
+            pool.checkout(timeout=0.01).__enter__()
+
+        waiter = threading.Thread(target=lambda: pool.acquire(timeout=0.5))
+        waiter.start()
+        while pool.metrics()["queue_length"] == 0:
+            pass
+
+        with pytest.raises(BrowserPoolBusy):
+            pool.acquire(timeout=0.5)
+
+    waiter.join()
+
+
+def test_close(pool, drivers):
+    """Test that closing the pool quits all browsers"""
+    with pool.checkout():
+        pool.close()
+        assert not drivers[0].quit_called
+
+    assert drivers[0].quit_called
+    with pytest.raises(BrowserPoolBusy):
+        pool.acquire()
+
+
+def test_browser_unavailable():
+    """Test that a browser that fails to start frees its slot in the pool"""
+    pool = BrowserPool(size=1, factory=lambda: None)
+
+    with pytest.raises(BrowserUnavailable):
+        pool.acquire()
+
+    assert pool.metrics()["created"] == 0
+    assert pool.metrics()["in_use"] == 0
@@ -0,0 +1,116 @@
+import threading
+import time
+
+import pytest
+
+from src.cache import TTLCache
+
+
+@pytest.fixture
+def cache(clock):
+    return TTLCache(ttl=10, max_size=3, negative_ttl=2, clock=clock)
+
+
+def test_expiry(cache, clock):
+    """Test that entries expire after their time to live"""
+    cache.set("a", 1)
+    cache.set("b", None, negative=True)
+
+    clock.now = 1
+    assert cache.get("a") == 1
+    assert cache.get("b", "missing") is None
+
+    clock.now = 2
+    assert cache.get("a") == 1
+    assert cache.get("b", "missing") == "missing"
+
+    clock.now = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction(cache):
+    """Test that the least recently used entry is evicted when the cache is full"""
+    for key in "abc":
+        cache.set(key, key)
+
+    cache.get("a")
+    cache.set("d", "d")
+
+    assert cache.get("b") is None
+    assert [cache.get(key) for key in "acd"] == ["a", "c", "d"]
+    assert cache.stats()["evictions"] == 1
+
+    cache.configure(ttl=10, max_size=1, negative_ttl=2)
+    assert len(cache) == 1
+
+
+def test_get_or_load(cache):
+    """Test that loaded values are cached unless they are not cacheable"""
+    calls = []
+
+    def loader(value):
+        def load():
+            calls.append(value)
+            return value
+
+        return load
+
+    assert cache.get_or_load("a", loader(1)) == 1
+    assert cache.get_or_load("a", loader(2)) == 1
+
+    def is_cacheable(value):
+        return value != "error"
+
+    cache.get_or_load("b", loader("error"), cacheable=is_cacheable)
+    cache.get_or_load("b", loader("error"), cacheable=is_cacheable)
+
+    assert calls == [1, "error", "error"]
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 3
+
+
+def test_get_or_load_error(cache):
+    """Test that errors raised by the loader are passed on and not cached"""
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        cache.get_or_load("a", fail)
+
+    assert cache.get_or_load("a", lambda: 1) == 1
+
+
+def test_single_flight(cache):
+    """Test that concurrent loads of the same key only call the loader once"""
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "value"
+
+    results = []
+
+    def worker():
+        results.append(cache.get_or_load("a", slow_load))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < 3 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["value"] * 4
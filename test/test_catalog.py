@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from src.catalog import CardCatalog
+
+TEST_CARDS_PATH = "test/resources/cards.json"
+
+
+@pytest.fixture
+def catalog():
+    """Sets up a catalog with the test card and two additional cards"""
+    with open(TEST_CARDS_PATH, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+
+    cards.append(
+        {
+            "name": "Wills-o'-the-Wisp",
+            "guardian": {"rarity": "Elite", "type": "Minion"},
+            "sets": [{"name": "Beta"}],
+        }
+    )
+    cards.append(
+        {
+            "name": "Autumn River",
+            "guardian": {"rarity": "Ordinary", "type": "Site"},
+            "sets": [{"name": "Alpha"}, {"name": "Beta"}],
+        }
+    )
+    return CardCatalog(cards)
+
+
+def test_get(catalog):
+    """Test that cards are found regardless of the form of the name"""
+    assert catalog.get("apprentice_wizard")["name"] == "Apprentice Wizard"
+    assert catalog.get("Apprentice Wizard")["name"] == "Apprentice Wizard"
+    assert catalog.get("wills o the wisp")["name"] == "Wills-o'-the-Wisp"
+    assert catalog.get("not a card") is None
+
+
+def test_contains(catalog):
+    """Test that membership checks use the URL form of the name"""
+    assert "autumn river" in catalog
+    assert "autumn_river" in catalog
+    assert "autumn" not in catalog
+    assert len(catalog) == 3
+
+
+def test_indexes(catalog):
+    """Test that set, type and rarity indexes hold the correct cards"""
+    assert [c["name"] for c in catalog.get_by_set("beta")] == [
+        "Apprentice Wizard",
+        "Wills-o'-the-Wisp",
+        "Autumn River",
+    ]
+    assert len(catalog.get_by_set("Alpha")) == 2
+    assert [c["name"] for c in catalog.get_by_type("site")] == ["Autumn River"]
+    assert len(catalog.get_by_type("Minion")) == 2
+    assert len(catalog.get_by_rarity("ordinary")) == 2
+    assert catalog.get_by_set("arthurian legends") == []
+
+
+def test_duplicate_names(catalog):
+    """Test that adding a card with an already present name keeps the first one"""
+    catalog.add({"name": "Autumn river", "guardian": {}, "sets": []})
+    assert len(catalog) == 3
+    assert catalog.get("autumn river")["guardian"]["type"] == "Site"
+    assert catalog.names() == ["apprentice_wizard", "wills_o_the_wisp", "autumn_river"]
+
+
+def test_patched(catalog):
+    """Test that applying a diff gives the same catalog as building it again"""
+    cards = [dict(card) for card in catalog.cards if card["name"] != "Autumn River"]
+    cards[0]["guardian"] = {"rarity": "Unique", "type": "Minion"}
+    cards.append(
+        {
+            "name": "Forge",
+            "guardian": {"rarity": "Ordinary", "type": "Site"},
+            "sets": [{"name": "Gothic"}],
+        }
+    )
+
+    diff = catalog.diff(cards)
+    assert [card["name"] for card in diff.added] == ["Forge"]
+    assert [card["name"] for card in diff.changed] == ["Apprentice Wizard"]
+    assert diff.removed == ["autumn_river"]
+    assert not catalog.diff(catalog.cards)
+
+    patched = catalog.patched(diff)
+    rebuilt = CardCatalog(cards)
+
+    assert patched.by_name == rebuilt.by_name
+    for index in ["by_set", "by_type", "by_rarity"]:
+        assert {
+            k: sorted(c["name"] for c in v) for k, v in getattr(patched, index).items()
+        } == {
+            k: sorted(c["name"] for c in v) for k, v in getattr(rebuilt, index).items()
+        }
+
+    # The original catalog is left untouched.
+    assert "autumn_river" in catalog.by_name
+    assert catalog.get_by_rarity("unique") == []
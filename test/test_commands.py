@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.commands.base import BaseCommand
+from src.commands.help import HelpCommand
+from src.commands.registry import CommandRegistry
+
+
+class ThreadCommand(BaseCommand):
+    """Returns the name of the thread the command was resolved in"""
+
+    def get_content(self, msg, parameters) -> str:
+        time.sleep(0.05)
+        return threading.current_thread().name
+
+
+class BlockingThreadCommand(ThreadCommand):
+    blocking = True
+
+
+def test_non_blocking_runs_on_loop():
+    """Test that non-blocking commands are resolved on the event loop thread"""
+    content = asyncio.run(ThreadCommand(["t"]).invoke(None, []))
+
+    assert content == threading.current_thread().name
+
+
+def test_blocking_runs_in_executor():
+    """Test that blocking commands are resolved in the given executor"""
+    with ThreadPoolExecutor(thread_name_prefix="test-worker") as executor:
+        content = asyncio.run(BlockingThreadCommand(["t"]).invoke(None, [], executor))
+
+    assert content.startswith("test-worker")
+
+
+def test_blocking_keeps_loop_responsive():
+    """Test that the event loop keeps running while blocking commands are in flight"""
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        command = BlockingThreadCommand(["t"])
+        await asyncio.gather(*(command.invoke(None, []) for _ in range(3)))
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(run()) > 3
+
+
+class EchoCommand(BaseCommand):
+    """
+    Echoes the parameters.
+    """
+
+    def get_content(self, msg, parameters) -> str:
+        """
+        Usage:
+
+        !echo <text> returns the text.
+        """
+        return " ".join(parameters)
+
+
+def test_registry_aliases():
+    """Test that commands are found by any of their aliases"""
+    echo = EchoCommand(["echo", "say"])
+    registry = CommandRegistry([echo, ThreadCommand(["thread"])])
+
+    assert registry.get("echo") is echo
+    assert registry.get("say") is echo
+    assert registry.get("card") is None
+    assert len(registry) == 2
+
+    with pytest.raises(ValueError, match="say"):
+        registry.register(EchoCommand(["say"]))
+
+
+def test_registry_unregister():
+    """Test that unregistering removes all aliases and the help of a command"""
+    echo = EchoCommand(["echo", "say"])
+    registry = CommandRegistry([echo])
+    assert "echo" in registry.overview()
+
+    assert registry.unregister("say") is echo
+    assert registry.get("echo") is None
+    assert "echo" not in registry.overview()
+    assert registry.unregister("say") is None
+
+    registry.register(EchoCommand(["say"]))
+    assert registry.suggest("sya") == "say"
+
+
+def test_registry_suggest():
+    """Test that mistyped commands get the closest alias as a suggestion"""
+    registry = CommandRegistry([EchoCommand(["echo"]), ThreadCommand(["thread"])])
+
+    assert registry.suggest("ecoh") == "echo"
+    assert registry.suggest("thred") == "thread"
+    assert registry.suggest("xyz") is None
+
+
+def test_help_command():
+    """Test that help lists every command once and returns usage by alias"""
+    registry = CommandRegistry([EchoCommand(["echo", "say"])])
+    registry.register(HelpCommand(["help"], registry))
+    help_command = registry.get("help")
+
+    overview = help_command.get_content(None, [])
+    assert overview.count("**help**") == 1
+    assert "- **echo, say**: Echoes the parameters." in overview
+
+    assert "!echo <text> returns the text." in help_command.get_content(None, ["say"])
+    assert help_command.get_content(None, ["nope"]) == "Invalid command: nope"
@@ -1,8 +1,14 @@
 import json
+import time
+from types import SimpleNamespace
 
 import pytest
 
 import src.curiosa as curiosa
+from src.browser import BrowserPool
+from src.catalog import CardCatalog
+from src.http_client import HostBusy
+from src.store import DiskStore, set_store
 from src.trie import Trie
 
 TEST_CARDS_PATH = "test/resources/cards.json"
@@ -15,7 +21,7 @@ def get_cards():
     with open(TEST_CARDS_PATH, "r", encoding="utf-8") as f:
         cards = json.load(f)
 
-    return cards
+    return CardCatalog(cards)
 
 
 def test_generate_image_url(get_cards):
@@ -26,3 +32,310 @@ def test_generate_image_url(get_cards):
     )
 
     assert apprentice_wizard_url == gen_apprentice_wizard_url
+
+
+TEST_DECK_PATH = "test/resources/deck.html"
+TEST_FAQ_PATH = "test/resources/faq.html"
+
+
+class FakeTableBrowser:
+    """A stand-in for a webdriver that renders a deck as tables"""
+
+    def __init__(self):
+        self.pages = []
+
+    def get(self, url):
+        self.pages.append(url)
+
+    def find_element(self, by, value):
+        return SimpleNamespace(text="")
+
+    def find_elements(self, by, value):
+        return [SimpleNamespace(text="Avatar (1)\n1Druid")]
+
+
+def read_page(path: str) -> tuple[int, dict, bytes]:
+    """Reads a saved page as a stub server response"""
+    with open(path, "rb") as f:
+        return (200, {"Content-Type": "text/html"}, f.read())
+
+
+@pytest.fixture
+def curiosa_stub(stub_server, http_client, monkeypatch):
+    """Points curiosa.io requests to the local stub server"""
+    monkeypatch.setattr(curiosa, "curiosa_deck_base_url", stub_server.url + "/decks/")
+    monkeypatch.setattr(curiosa, "curiosa_card_base_url", stub_server.url + "/cards/")
+    curiosa.faq_cache.clear()
+    yield stub_server
+    curiosa.faq_cache.clear()
+
+
+@pytest.fixture
+def disk_store(tmp_path):
+    """Enables a disk store in a temporary directory"""
+    store = DiskStore(tmp_path / "cache.sqlite3")
+    set_store(store)
+    yield store
+    set_store(None)
+
+
+@pytest.fixture
+def deck_page(curiosa_stub):
+    """Serves the saved deck page"""
+    curiosa_stub.routes["/decks/cm2d6ea5g00etsenu9qa7syod"] = read_page(TEST_DECK_PATH)
+
+
+def test_parse_deck_json():
+    """Test that the deck json embedded into a deck page is parsed into a deck"""
+    with open(TEST_DECK_PATH, "r", encoding="utf-8") as f:
+        next_data = curiosa.extract_next_data(f.read())
+
+    deck = curiosa.parse_deck_json(next_data)
+
+    assert list(deck) == ["Avatar", "Aura", "Artifact", "Minion", "Magic", "Site"]
+    assert deck["Avatar"] == [("Druid", "1")]
+    assert deck["Minion"] == [("Raal Dromedary", "4"), ("War Horse", "3")]
+    # Quantities over 9 are not cut to their first digit.
+    assert deck["Site"] == [("Forge", "12"), ("Autumn River", "3")]
+    assert "Total: 26 cards(11 Spellbook, 15 Atlas)" in curiosa.get_card_counts(deck)
+
+    with_maybe = curiosa.parse_deck_json(next_data, include_maybe=True)
+    assert with_maybe["Maybeboard"] == [("Pollimorph", "1")]
+
+
+def test_request_deck_without_browser(deck_page):
+    """Test that decks are retrieved over HTTP without touching the browser"""
+    browser = FakeTableBrowser()
+    deck = curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod", browser)
+
+    assert deck["Avatar"] == [("Druid", "1")]
+    assert browser.pages == []
+
+
+def test_request_deck_browser_fallback(curiosa_stub, http_client):
+    """Test that the browser is used when the page has no deck json"""
+    curiosa_stub.routes["/decks/cm2d6ea5g00etsenu9qa7syod"] = (200, {}, b"<html />")
+    browser = FakeTableBrowser()
+
+    deck = curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod", browser)
+
+    assert deck == {"Avatar": [("Druid", "1")]}
+    assert browser.pages == [
+        curiosa.curiosa_deck_base_url + "cm2d6ea5g00etsenu9qa7syod"
+    ]
+    # The browser page load goes through the request queue of the host as well.
+    host = curiosa_stub.url.split("//")[1]
+    assert http_client.stats()[host]["requests"] == 2
+    assert curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod") is None
+
+
+def test_missing_deck_skips_browser(curiosa_stub):
+    """Test that decks that do not exist are not looked up with the browser"""
+    next_data = {
+        "props": {
+            "pageProps": {
+                "trpcState": {
+                    "json": {
+                        "queries": [
+                            {"queryKey": [["deck", "getById"]], "state": {"data": None}}
+                        ]
+                    }
+                }
+            }
+        }
+    }
+    curiosa_stub.routes["/decks/deleted"] = (
+        200,
+        {"Content-Type": "text/html"},
+        (
+            '<script id="__NEXT_DATA__" type="application/json">'
+            + json.dumps(next_data)
+            + "</script>"
+        ).encode("utf-8"),
+    )
+    browser = FakeTableBrowser()
+
+    assert curiosa.request_deck_from_id("typo", browser) is None
+    assert curiosa.request_deck_from_id("deleted", browser) is None
+    assert browser.pages == []
+
+
+def test_request_faq(curiosa_stub):
+    """Test that FAQ entries are parsed from the saved card page"""
+    curiosa_stub.routes["/cards/midland_army"] = read_page(TEST_FAQ_PATH)
+
+    assert curiosa.request_faq("midland_army") == [
+        {"question": "Are Foot Soldiers Ordinary earth minions?", "answer": "Yes!"}
+    ]
+    assert curiosa.request_faq("not_a_card") == {"failed": "not_found"}
+
+    curiosa_stub.routes["/cards/blink"] = (500, {}, b"")
+    assert curiosa.request_faq("blink") == {"failed": "err_status_code"}
+
+
+def test_request_faq_cached(curiosa_stub):
+    """Test that FAQ responses and missing cards are cached but errors are not"""
+    curiosa_stub.routes["/cards/midland_army"] = read_page(TEST_FAQ_PATH)
+    curiosa_stub.routes["/cards/blink"] = (500, {}, b"")
+
+    for _ in range(3):
+        curiosa.request_faq("midland_army")
+        curiosa.request_faq("not_a_card")
+        curiosa.request_faq("blink")
+
+    assert curiosa_stub.hits.count("/cards/midland_army") == 1
+    assert curiosa_stub.hits.count("/cards/not_a_card") == 1
+    assert curiosa_stub.hits.count("/cards/blink") > 3
+    assert curiosa.faq_cache.stats()["negative_hits"] == 2
+
+
+def test_rate_limited_deck_skips_browser(curiosa_stub):
+    """Test that a deck page that stays rate limited is not loaded with a browser"""
+    curiosa_stub.routes["/decks/cm2d6ea5g00etsenu9qa7syod"] = (429, {}, b"")
+    browser = FakeTableBrowser()
+
+    with pytest.raises(HostBusy):
+        curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod", browser)
+
+    assert browser.pages == []
+
+
+def test_curiosa_busy(curiosa_stub, http_client):
+    """Test that a rate limiting curiosa.io is not tried again with a browser"""
+    http_client.failure_threshold = 1
+    curiosa_stub.routes["/decks/cm2d6ea5g00etsenu9qa7syod"] = (429, {}, b"")
+    browser = FakeTableBrowser()
+
+    with pytest.raises(HostBusy):
+        curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod", browser)
+
+    assert browser.pages == []
+    assert curiosa.request_faq("midland_army") == {"failed": "busy"}
+    assert curiosa.fetch_decks(["cm2d6ea5g00etsenu9qa7syod"]) == [None]
+    assert len(curiosa_stub.hits) == 1
+
+
+def test_request_deck_stored(deck_page, curiosa_stub, disk_store):
+    """Test that stored decks are returned without a request and in the same form"""
+    deck = curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod")
+    stored = curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod")
+
+    assert stored == deck
+    assert curiosa_stub.hits.count("/decks/cm2d6ea5g00etsenu9qa7syod") == 1
+
+    # Decks with and without the maybeboard are stored separately.
+    curiosa.request_deck_from_id("cm2d6ea5g00etsenu9qa7syod", include_maybe=True)
+    assert curiosa_stub.hits.count("/decks/cm2d6ea5g00etsenu9qa7syod") == 2
+
+
+def test_request_faq_stored(curiosa_stub, disk_store):
+    """Test that FAQ entries survive a cleared cache and are warmed into it"""
+    curiosa_stub.routes["/cards/midland_army"] = read_page(TEST_FAQ_PATH)
+
+    faq = curiosa.request_faq("midland_army")
+    curiosa.request_faq("not_a_card")
+    curiosa.faq_cache.clear()
+
+    assert curiosa.request_faq("midland_army") == faq
+    assert curiosa_stub.hits.count("/cards/midland_army") == 1
+    assert disk_store.get("faq", "not_a_card") is None
+
+    curiosa.faq_cache.clear()
+    curiosa.warm_caches()
+    assert curiosa.faq_cache.get("midland_army") == faq
+
+
+def test_warm_caches_expire_from_fetch_time(tmp_path):
+    """Test that warmed FAQ entries expire counting from when they were fetched"""
+    store = DiskStore(tmp_path / "cache.sqlite3", max_age={"faq": 100})
+    store.put("faq", "recent", [], fetched_at=time.time() - 10)
+    store.put("faq", "old", [], fetched_at=time.time() - 60)
+    set_store(store)
+
+    def expires_in(card_name):
+        entry = curiosa.faq_cache._entries[card_name]
+        return entry.expires_at - curiosa.faq_cache.clock()
+
+    try:
+        curiosa.faq_cache.clear()
+        curiosa.faq_cache.configure(ttl=50, max_size=512, negative_ttl=600)
+        curiosa.warm_caches()
+
+        assert curiosa.faq_cache.get("recent") == []
+        assert curiosa.faq_cache.get("old") is None
+        assert expires_in("recent") <= 40
+
+        # The entries are not kept past the maximum age of the disk store either.
+        curiosa.faq_cache.clear()
+        curiosa.faq_cache.configure(ttl=3600, max_size=512, negative_ttl=600)
+        curiosa.warm_caches()
+
+        assert expires_in("recent") <= 90
+        assert expires_in("old") <= 40
+    finally:
+        curiosa.faq_cache.clear()
+        set_store(None)
+
+
+def test_fetch_decks_concurrently(curiosa_stub):
+    """Test that several decks are requested at the same time and kept in order"""
+    page = read_page(TEST_DECK_PATH)
+
+    def slow_page(handler):
+        time.sleep(0.2)
+        return page
+
+    for id in ["a", "b", "c"]:
+        curiosa_stub.routes[f"/decks/{id}"] = slow_page
+
+    start = time.perf_counter()
+    decks = curiosa.fetch_decks(["a", "missing", "b", "c"])
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 0.5
+    assert decks[1] is None
+    assert all(deck["Avatar"] == [("Druid", "1")] for deck in decks[:1] + decks[2:])
+
+
+def test_overlap_partial_failure(deck_page, curiosa_stub):
+    """Test that decks that could not be retrieved are reported instead of compared"""
+    curiosa_stub.routes["/decks/other"] = read_page(TEST_DECK_PATH)
+
+    output = curiosa.get_overlapping_cards(
+        ["cm2d6ea5g00etsenu9qa7syod", "missing", "other"]
+    )
+    assert output.startswith("Could not retrieve deck with id: missing\n\n")
+    assert "The overlapping cards are:" in output
+
+    output = curiosa.get_overlapping_cards(["missing", "other"])
+    assert output == (
+        "Could not retrieve deck with id: missing\n"
+        "At least 2 decks are needed to find overlapping cards."
+    )
+
+
+def test_overlap_browser_unavailable(deck_page, curiosa_stub):
+    """Test that a browser that fails to start only fails the deck that needed it"""
+    pool = BrowserPool(factory=lambda: None)
+    curiosa_stub.routes["/decks/nojson"] = (200, {}, b"<html />")
+    curiosa_stub.routes["/decks/other"] = read_page(TEST_DECK_PATH)
+
+    output = curiosa.get_overlapping_cards(
+        ["cm2d6ea5g00etsenu9qa7syod", "nojson", "other"], pool
+    )
+
+    assert output.startswith("Could not retrieve deck with id: nojson\n\n")
+    assert "The overlapping cards are:" in output
+
+
+def test_overlap_modes(deck_page, curiosa_stub):
+    """Test that overlap modes are passed on and unknown modes rejected"""
+    ids = ["cm2d6ea5g00etsenu9qa7syod", "cm2d6ea5g00etsenu9qa7syod"]
+
+    assert curiosa.get_overlapping_cards(ids, mode="difference") == (
+        "All cards in the first deck are also in the others."
+    )
+    assert "Forge" in curiosa.get_overlapping_cards(ids, mode="union")
+    assert curiosa.get_overlapping_cards(ids, mode="xor").startswith(
+        "Unknown overlap mode: xor"
+    )
@@ -0,0 +1,167 @@
+import json
+import shutil
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+import src.curiosa as curiosa
+import src.daemon_client as daemon_client
+from src.browser import BrowserPool
+from src.catalog import set_catalog
+from src.daemon import CommandRunner, DaemonServer, write_token
+from src.daemon_client import call_daemon
+from src.http_client import CircuitOpen
+
+TEST_CARDS_PATH = "test/resources/cards.json"
+
+
+@pytest.fixture
+def runner(tmp_path):
+    """Sets up a command runner with the test cards and a browser pool never started"""
+    cards_path = tmp_path / "cards.json"
+    shutil.copy(TEST_CARDS_PATH, cards_path)
+
+    browsers = BrowserPool(size=1)
+    yield CommandRunner(browsers, cards_path)
+
+    browsers.close()
+    set_catalog(None)
+
+
+@pytest.fixture
+def daemon(runner, tmp_path, monkeypatch):
+    """Runs the daemon on a free port with its token in a temporary directory"""
+    server = DaemonServer(runner, 0)
+    server.port = server.server_address[1]
+
+    token_path = tmp_path / "daemon.token"
+    write_token(token_path, server.token)
+    monkeypatch.setattr(daemon_client, "DAEMON_TOKEN_PATH", str(token_path))
+
+    thread = threading.Thread(target=server.serve_forever, args=(0.01,), daemon=True)
+    thread.start()
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_card(daemon, runner):
+    """Test that the daemon returns the same output as running the command in process"""
+    output = call_daemon("card", {"card_name": ["apprentice", "wizard"]}, daemon.port)
+
+    assert output is not None
+    assert "Apprentice Wizard" in output
+    assert output == runner.run("card", {"card_name": ["apprentice", "wizard"]})
+    assert daemon.commands_run == 1
+
+
+def test_deck_commands_share_browsers(daemon, runner, monkeypatch):
+    """Test that deck commands are run with the browser pool of the daemon"""
+    seen = []
+
+    def fake_get_deck_from_id(id, browsers, include_maybe=False):
+        seen.append(browsers)
+        return f"deck {id}"
+
+    monkeypatch.setattr(curiosa, "get_deck_from_id", fake_get_deck_from_id)
+
+    for id in ["a", "b"]:
+        assert call_daemon("id", {"id": id}, daemon.port) == f"deck {id}"
+
+    assert seen == [runner.browsers, runner.browsers]
+
+
+def test_deck_busy(daemon, monkeypatch):
+    """Test that a busy curiosa.io is answered with a message instead of an error"""
+
+    def paused(url, include_maybe=False):
+        raise CircuitOpen("Requests to curiosa.io are paused")
+
+    monkeypatch.setattr(curiosa, "request_deck_http", paused)
+
+    output = call_daemon("id", {"id": "a"}, daemon.port)
+
+    assert output == "curiosa.io is busy, please try again later."
+    assert daemon.commands_run == 1
+
+
+def test_invalid_commands(daemon):
+    """Test that unknown commands and invalid arguments are left to the caller"""
+    assert call_daemon("stop", {}, daemon.port) is None
+    assert call_daemon("card", {"name": "forge"}, daemon.port) is None
+    assert daemon.commands_run == 0
+
+
+def test_not_running(daemon):
+    """Test that commands fall back when no daemon is listening"""
+    port = daemon.port
+    daemon.shutdown()
+    daemon.server_close()
+
+    assert call_daemon("card", {"card_name": ["forge"]}, port) is None
+
+
+def test_cards_reloaded(runner):
+    """Test that the card index is loaded again after cards.json changes"""
+    catalog, _ = runner.card_index()
+    assert "autumn_river" not in catalog
+    assert runner.card_index()[0] is catalog
+
+    with open(runner.cards_path, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+    cards.append(
+        {
+            "name": "Autumn River",
+            "guardian": {"rarity": "Ordinary", "type": "Site"},
+            "sets": [{"name": "Beta"}],
+        }
+    )
+    with open(runner.cards_path, "w", encoding="utf-8") as f:
+        json.dump(cards, f)
+
+    catalog, prefix_tree = runner.card_index()
+    assert "autumn_river" in catalog
+    assert prefix_tree.find("autumn_river")
+
+
+def test_status(daemon):
+    """Test that the status of the daemon can be requested"""
+    call_daemon("card", {"card_name": ["forge"]}, daemon.port)
+
+    request = urllib.request.Request(
+        f"http://127.0.0.1:{daemon.port}/status",
+        headers={"Authorization": f"Bearer {daemon.token}"},
+    )
+    with urllib.request.urlopen(request) as response:
+        status = json.load(response)
+
+    assert status["commands_run"] == 1
+    assert status["browsers"]["created"] == 0
+    assert "hits" in status["faq_cache"]
+
+
+def test_requests_need_token(daemon):
+    """Test that requests without the token or a json Content-Type are rejected"""
+
+    def post(path, headers):
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{daemon.port}{path}",
+            data=b'{"name": "card", "args": {"card_name": ["forge"]}}',
+            headers=headers,
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    token = {"Authorization": f"Bearer {daemon.token}"}
+
+    assert post("/shutdown", {"Content-Type": "text/plain"}) == 403
+    assert post("/command", {"Authorization": "Bearer wrong"}) == 403
+    assert post("/shutdown", {**token, "Content-Type": "text/plain"}) == 415
+    assert post("/command", {**token, "Content-Type": "application/json"}) == 200
+    assert daemon.commands_run == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from src.fuzzy import FuzzyIndex
+
+
+@pytest.fixture
+def index():
+    """Sets up a fuzzy index with a few card names"""
+    return FuzzyIndex(
+        [
+            "apprentice_wizard",
+            "abundance",
+            "wills_o_the_wisp",
+            "autumn_river",
+            "winter_river",
+            "blink",
+        ]
+    )
+
+
+def test_grams(index):
+    """Test that words are padded before splitting into n-grams"""
+    assert index.grams("cat") == {" c", "ca", "at", "t "}
+
+
+def test_best_match(index):
+    """Test that common misspellings are matched to the correct word"""
+    assert index.best_match("aprentice_wizard")[1] == "apprentice_wizard"
+    assert index.best_match("abundnace")[1] == "abundance"
+    assert index.best_match("will_o_the_wisp")[1] == "wills_o_the_wisp"
+    assert index.best_match("blnik")[1] == "blink"
+
+
+def test_matches_limit(index):
+    """Test that matches returns the best words first up to the limit"""
+    matches = index.matches("river", limit=2)
+
+    assert len(matches) == 2
+    assert {word for _, word in matches} == {"autumn_river", "winter_river"}
+    assert matches[0][0] >= matches[1][0]
+
+
+def test_no_match():
+    """Test that empty indexes and unrelated queries return nothing"""
+    assert FuzzyIndex().best_match("blink") is None
+    assert FuzzyIndex(["abc"]).matches("xyz") == []
@@ -0,0 +1,230 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from src.http_client import CircuitOpen, HostBusy, HostQueue, HttpClient
+
+
+def test_get(stub_server, http_client):
+    """Test that requests are made to the server and responses returned"""
+    stub_server.routes["/cards"] = (200, {}, b"[]")
+
+    req = http_client.get(stub_server.url + "/cards")
+
+    assert req.status_code == 200
+    assert req.content == b"[]"
+
+
+def test_keep_alive(stub_server, http_client):
+    """Test that consecutive requests reuse the same connection"""
+    ports = []
+
+    def route(handler):
+        ports.append(handler.client_address[1])
+        return (200, {}, b"ok")
+
+    stub_server.routes["/"] = route
+
+    for _ in range(3):
+        http_client.get(stub_server.url + "/")
+
+    assert len(set(ports)) == 1
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retries_with_backoff(stub_server, http_client, status):
+    """Test that rate limited and failing requests are retried"""
+    responses = [(status, {}, b""), (status, {}, b""), (200, {}, b"ok")]
+    stub_server.routes["/flaky"] = lambda handler: responses.pop(0)
+
+    req = http_client.get(stub_server.url + "/flaky")
+
+    assert req.status_code == 200
+    assert len(stub_server.hits) == 3
+
+
+def test_gives_up_after_retries(stub_server, http_client):
+    """Test that the last failing response is returned after running out of retries"""
+    stub_server.routes["/down"] = (503, {}, b"")
+
+    req = http_client.get(stub_server.url + "/down")
+
+    assert req.status_code == 503
+    assert len(stub_server.hits) == 4
+
+
+def test_read_timeout(stub_server):
+    """Test that slow responses time out instead of hanging"""
+
+    def slow(handler):
+        time.sleep(0.5)
+        return (200, {}, b"")
+
+    stub_server.routes["/slow"] = slow
+    client = HttpClient(read_timeout=0.1, retries=0)
+
+    with pytest.raises(requests.Timeout):
+        client.get(stub_server.url + "/slow")
+
+
+def test_max_per_host(stub_server):
+    """Test that concurrent requests to a single host are capped"""
+    lock = threading.Lock()
+    active = 0
+    peak = 0
+
+    def route(handler):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.05)
+        with lock:
+            active -= 1
+        return (200, {}, b"")
+
+    stub_server.routes["/"] = route
+    client = HttpClient(max_per_host=2, requests_per_second=0)
+
+    threads = [
+        threading.Thread(target=client.get, args=(stub_server.url + "/",))
+        for _ in range(6)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == 2
+    assert len(stub_server.hits) == 6
+
+
+def wait_for(condition):
+    """Waits up to a second for a condition set by another thread"""
+    deadline = time.monotonic() + 1
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_requests_per_second(stub_server):
+    """Test that requests to a host are spread out to the configured rate"""
+    stub_server.routes["/"] = (200, {}, b"")
+    client = HttpClient(requests_per_second=20)
+
+    start = time.monotonic()
+    for _ in range(5):
+        client.get(stub_server.url + "/")
+
+    # The first request starts right away, the other four wait 0.05 s each.
+    assert time.monotonic() - start >= 0.2
+
+
+def test_interactive_before_background():
+    """Test that waiting interactive requests start before waiting background ones"""
+    queue = HostQueue("curiosa.io", max_concurrent=1, per_second=0)
+    order = []
+
+    def request(name, priority):
+        slot = queue.acquire(priority)
+        order.append(name)
+        queue.release(slot)
+
+    held = queue.acquire()
+    threads = [
+        threading.Thread(target=request, args=("background", 1)),
+        threading.Thread(target=request, args=("interactive", 0)),
+    ]
+    for waiting, thread in enumerate(threads, 1):
+        thread.start()
+        wait_for(lambda waiting=waiting: queue.stats()["waiting"] == waiting)
+
+    queue.release(held)
+    for thread in threads:
+        thread.join()
+
+    assert order == ["interactive", "background"]
+
+
+def test_queue_full():
+    """Test that requests are rejected when too many are already waiting"""
+    queue = HostQueue("curiosa.io", max_concurrent=1, per_second=0, max_queued=1)
+    held = queue.acquire()
+    waiting = threading.Thread(target=lambda: queue.release(queue.acquire()))
+    waiting.start()
+    wait_for(lambda: queue.stats()["waiting"] == 1)
+
+    with pytest.raises(HostBusy):
+        queue.acquire()
+
+    queue.release(held)
+    waiting.join()
+    assert queue.stats()["rejected"] == 1
+    assert queue.stats()["requests"] == 2
+
+
+def test_circuit_breaker(clock):
+    """Test that failures open the circuit and a trial request closes it again"""
+    queue = HostQueue(
+        "curiosa.io", per_second=0, failure_threshold=2, cooldown=10, clock=clock
+    )
+
+    for _ in range(2):
+        slot = queue.acquire()
+        slot.record(False)
+        queue.release(slot)
+
+    with pytest.raises(CircuitOpen):
+        queue.acquire()
+    assert queue.stats()["circuit"] == "open"
+
+    # A failed trial request opens the circuit for another cooldown.
+    clock.now = 10
+    trial = queue.acquire()
+    assert trial.trial
+    with pytest.raises(CircuitOpen):
+        queue.acquire()
+    trial.record(False)
+    queue.release(trial)
+
+    clock.now = 15
+    with pytest.raises(CircuitOpen):
+        queue.acquire()
+
+    clock.now = 20
+    trial = queue.acquire()
+    queue.release(trial)
+
+    assert not queue.acquire().trial
+    assert queue.stats()["circuit"] == "closed"
+    assert queue.stats()["opened"] == 2
+
+
+def test_retry_after(stub_server, http_client):
+    """Test that a 429 response pauses requests to the host for its Retry-After"""
+    responses = [(429, {"Retry-After": "0.2"}, b""), (200, {}, b"ok")]
+    stub_server.routes["/limited"] = lambda handler: responses.pop(0)
+    stub_server.routes["/other"] = (200, {}, b"")
+
+    start = time.monotonic()
+    req = http_client.get(stub_server.url + "/limited")
+
+    assert req.status_code == 200
+    assert time.monotonic() - start >= 0.2
+    assert len(stub_server.hits) == 2
+    assert http_client.stats()[stub_server.url.split("//")[1]]["throttled"] == 1
+
+
+def test_rate_limited_host_opens_circuit(stub_server):
+    """Test that a host answering only 429 is paused instead of retried forever"""
+    stub_server.routes["/"] = (429, {"Retry-After": "0"}, b"")
+    client = HttpClient(requests_per_second=0, failure_threshold=2)
+
+    with pytest.raises(CircuitOpen):
+        client.get(stub_server.url + "/")
+    with pytest.raises(CircuitOpen):
+        client.get(stub_server.url + "/")
+
+    assert len(stub_server.hits) == 2
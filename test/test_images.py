@@ -0,0 +1,137 @@
+from io import BytesIO
+
+import pytest
+from PIL import Image
+
+import src.curiosa as curiosa
+from src.commands.cimg import CimgCommand
+from src.catalog import CardCatalog
+from src.discord import Attachment
+from src.images import ImageCache
+from src.trie import Trie
+
+
+def make_card(name: str, card_type: str = "Minion") -> dict:
+    return {"name": name, "guardian": {"type": card_type}, "sets": [{"name": "Beta"}]}
+
+
+def make_png(width: int, height: int, color=(200, 30, 30)) -> bytes:
+    output = BytesIO()
+    Image.new("RGB", (width, height), color).save(output, format="PNG")
+    return output.getvalue()
+
+
+def png_response(data: bytes) -> tuple[int, dict, bytes]:
+    return (200, {"Content-Type": "image/png"}, data)
+
+
+@pytest.fixture
+def image_stub(stub_server, http_client, monkeypatch):
+    """Serves card images from the local stub server"""
+    monkeypatch.setattr(curiosa, "curiosa_image_base_url", stub_server.url + "/images/")
+    monkeypatch.setattr(curiosa, "curiosa_image_extension", "_b_s.png")
+    stub_server.routes["/images/bet/apprentice_wizard_b_s.png"] = png_response(
+        make_png(30, 40)
+    )
+    stub_server.routes["/images/bet/forge_b_s.png"] = png_response(make_png(30, 40))
+    return stub_server
+
+
+def test_fetch_once(image_stub, tmp_path):
+    """Test that images are downloaded once into a content addressed path"""
+    images = ImageCache(tmp_path)
+    card = make_card("Apprentice Wizard")
+
+    path = images.fetch(card)
+    assert images.fetch(card) == path
+    assert image_stub.hits.count("/images/bet/apprentice_wizard_b_s.png") == 1
+
+    assert path.parent.parent == tmp_path
+    assert path.name.startswith(path.parent.name)
+    assert (
+        path.read_bytes()
+        == image_stub.routes["/images/bet/apprentice_wizard_b_s.png"][2]
+    )
+
+    # The index survives reopening the cache.
+    assert ImageCache(tmp_path).get(card) == path
+
+
+def test_site_rotated(image_stub, tmp_path):
+    """Test that site images are stored in landscape"""
+    images = ImageCache(tmp_path)
+
+    with Image.open(images.fetch(make_card("Forge", "Site"))) as site:
+        assert site.size == (40, 30)
+
+
+def test_fetch_failures(image_stub, tmp_path):
+    """Test that missing and invalid images are not cached"""
+    image_stub.routes["/images/bet/blink_b_s.png"] = png_response(b"not an image")
+    images = ImageCache(tmp_path)
+
+    assert images.fetch(make_card("Blink")) is None
+    assert images.fetch(make_card("Not a Card")) is None
+    assert images.stats()["images"] == 0
+
+
+def test_eviction(tmp_path):
+    """Test that least recently used images are removed once over max bytes"""
+    red, blue, green = make_png(8, 8), make_png(8, 8, (0, 0, 200)), make_png(4, 4)
+    images = ImageCache(tmp_path, max_bytes=len(red) + len(blue))
+
+    first = images.put("first", red)
+    images.put("shared", red)
+    second = images.put("second", blue)
+    assert images.stats()["bytes"] == len(red) + len(blue)
+
+    images.get(make_card("First"))
+    images.get(make_card("Second"))
+    third = images.put("third", green)
+
+    # Removing shared alone frees no space since first still uses the same image.
+    assert not first.exists()
+    assert second.exists() and third.exists()
+    assert sorted(images.index) == ["second", "third"]
+    assert images.stats()["bytes"] <= images.max_bytes
+
+
+def test_image_over_max_bytes(tmp_path):
+    """Test that an image larger than the whole cache is still kept once stored"""
+    images = ImageCache(tmp_path, max_bytes=10)
+
+    old = images.put("old", make_png(4, 4))
+    path = images.put("new", make_png(8, 8))
+
+    assert path.exists()
+    assert not old.exists()
+    assert sorted(images.index) == ["new"]
+
+
+def test_prefetch(image_stub, tmp_path):
+    """Test that prefetching only downloads images that are missing"""
+    images = ImageCache(tmp_path)
+    cards = [make_card("Apprentice Wizard"), make_card("Forge", "Site")]
+    images.fetch(cards[0])
+
+    counts = images.prefetch(cards + [make_card("Not a Card")])
+
+    assert counts == {"cached": 1, "downloaded": 1, "failed": 1}
+    assert sorted(ImageCache(tmp_path).index) == ["apprentice_wizard", "forge"]
+
+
+def test_cimg_attachment(image_stub, tmp_path):
+    """Test that cimg replies with an attachment and falls back to a link"""
+    catalog = CardCatalog([make_card("Apprentice Wizard"), make_card("Blink")])
+    pt = Trie(catalog.names())
+
+    command = CimgCommand(["cimg"], pt, catalog, ImageCache(tmp_path))
+    content = command.get_content(None, ["apprentice", "wizard"])
+    assert isinstance(content, Attachment)
+    assert content.filename == "apprentice_wizard.png"
+
+    assert "/bet/blink_b_s.png" in command.get_content(None, ["blink"])
+    without_cache = CimgCommand(["cimg"], pt, catalog)
+    assert "/bet/apprentice_wizard_b_s.png" in without_cache.get_content(
+        None, ["apprentice", "wizard"]
+    )
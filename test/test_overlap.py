@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from src import overlap
+
+SECTIONS = ["Avatar", "Minion", "Magic", "Site"]
+CARDS = ["Forge", "Blink", "War Horse", "Raal Dromedary", "Druid", "Pollimorph"]
+
+
+def random_deck(rng: random.Random) -> dict:
+    deck = {}
+    for section in rng.sample(SECTIONS, rng.randint(0, len(SECTIONS))):
+        names = rng.sample(CARDS, rng.randint(0, len(CARDS)))
+        deck[section] = [(name, str(rng.randint(1, 12))) for name in names]
+    return deck
+
+
+def brute_force(decks: list[dict], mode: str) -> dict[tuple[str, str], int]:
+    """Combines decks card by card without multisets"""
+    keys = []
+    for deck in decks:
+        for section, entries in deck.items():
+            for name, _ in entries:
+                if (section, name) not in keys:
+                    keys.append((section, name))
+
+    def count(deck, key):
+        return sum(int(q) for name, q in deck.get(key[0], []) if name == key[1])
+
+    result = {}
+    for key in keys:
+        counts = [count(deck, key) for deck in decks]
+        if mode == "intersection":
+            value = min(counts)
+        elif mode == "union":
+            value = max(counts)
+        else:
+            value = counts[0] - sum(counts[1:])
+        if value > 0:
+            result[key] = value
+
+    return result
+
+
+def flatten(deck: dict) -> dict[tuple[str, str], int]:
+    return {
+        (section, name): int(q)
+        for section, entries in deck.items()
+        for name, q in entries
+    }
+
+
+@pytest.mark.parametrize("mode", overlap.MODES)
+def test_matches_brute_force(mode):
+    """Test that every mode agrees with a brute force reference on random decks"""
+    rng = random.Random(mode)
+
+    for _ in range(300):
+        decks = [random_deck(rng) for _ in range(rng.randint(1, 5))]
+        assert flatten(overlap.combine(decks, mode)) == brute_force(decks, mode)
+
+
+def test_intersection_many_decks():
+    """Test that the smallest count is kept over more than two decks"""
+    decks = [
+        {"Site": [("Forge", "12")], "Magic": [("Blink", "2")]},
+        {"Site": [("Forge", "9")], "Magic": [("Blink", "4")]},
+        {"Site": [("Forge", "10")]},
+    ]
+
+    assert overlap.intersection(*decks) == {"Site": [("Forge", "9")]}
+
+
+def test_difference_and_union():
+    """Test that difference keeps extra copies and union keeps the largest counts"""
+    a = {"Minion": [("War Horse", "3"), ("Raal Dromedary", "4")]}
+    b = {"Minion": [("War Horse", "1")], "Site": [("Forge", "2")]}
+
+    assert overlap.difference(a, b) == {
+        "Minion": [("War Horse", "2"), ("Raal Dromedary", "4")]
+    }
+    assert overlap.union(a, b) == {
+        "Minion": [("War Horse", "3"), ("Raal Dromedary", "4")],
+        "Site": [("Forge", "2")],
+    }
+
+
+def test_unknown_mode():
+    """Test that unknown modes are rejected"""
+    with pytest.raises(ValueError):
+        overlap.combine([], "symmetric")
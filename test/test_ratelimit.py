@@ -0,0 +1,181 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from discord import DMChannel
+
+from src.commands.base import BaseCommand
+from src.commands.cimg import CimgCommand
+from src.commands.deck import DeckCommand
+from src.commands.registry import CommandRegistry
+from src.discord_client import DiscordClient
+from src.ratelimit import Coalescer, RateLimiter
+
+
+LIMITS = {"deck": {"user": [2, 10], "guild": [3, 10], "global": [4, 10]}}
+
+
+def test_user_limit(clock):
+    """Test that a user is limited and tokens refill over time"""
+    limiter = RateLimiter(LIMITS, clock=clock)
+
+    assert limiter.acquire("deck", 1, 100) is None
+    assert limiter.acquire("deck", 1, 100) is None
+    assert limiter.acquire("deck", 1, 100) == ("user", pytest.approx(5))
+
+    clock.now = 5
+    assert limiter.acquire("deck", 1, 100) is None
+    assert limiter.stats()["rejected"] == {"deck": 1}
+    assert limiter.stats()["allowed"] == {"deck": 3}
+
+
+def test_guild_and_global_limits(clock):
+    """Test that users share the limits of their guild and of everyone"""
+    limiter = RateLimiter(LIMITS, clock=clock)
+
+    assert limiter.acquire("deck", 1, 100) is None
+    assert limiter.acquire("deck", 2, 100) is None
+    assert limiter.acquire("deck", 3, 100) is None
+    assert limiter.acquire("deck", 4, 100)[0] == "guild"
+
+    # Private messages have no guild, only the global limit is left.
+    assert limiter.acquire("deck", 4, None) is None
+    assert limiter.acquire("deck", 5, None)[0] == "global"
+
+
+def test_rejected_takes_no_tokens():
+    """Test that a rejected request does not use up the limits of other scopes"""
+    limiter = RateLimiter({"deck": {"user": [1, 10], "global": [2, 10]}})
+
+    assert limiter.acquire("deck", 1) is None
+    for _ in range(5):
+        assert limiter.acquire("deck", 1)[0] == "user"
+    assert limiter.acquire("deck", 2) is None
+
+
+def test_unlimited_and_configure():
+    """Test that commands without limits pass and new limits start from scratch"""
+    limiter = RateLimiter({"deck": {"user": [1, 10]}})
+
+    assert limiter.acquire("card", 1) is None
+    assert limiter.acquire("deck", 1) is None
+    assert limiter.acquire("deck", 1) is not None
+
+    limiter.configure({"deck": {"user": [2, 10]}})
+    assert limiter.acquire("deck", 1) is None
+
+
+def test_max_buckets():
+    """Test that the least recently used buckets are dropped"""
+    limiter = RateLimiter({"deck": {"user": [1, 10]}}, max_buckets=2)
+    for user in range(5):
+        limiter.acquire("deck", user)
+
+    assert limiter.stats()["buckets"] == 2
+
+
+def test_coalesce_identical_requests():
+    """Test that identical requests in flight share a single result"""
+    calls = []
+
+    async def main():
+        coalescer = Coalescer()
+
+        async def request(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return f"deck {key}"
+
+        results = await asyncio.gather(
+            coalescer.run("deck", "a", lambda: request("a")),
+            coalescer.run("deck", "a", lambda: request("a")),
+            coalescer.run("deck", "b", lambda: request("b")),
+        )
+        assert len(coalescer) == 0
+        return results, coalescer.coalesced
+
+    results, coalesced = asyncio.run(main())
+
+    assert results == ["deck a", "deck a", "deck b"]
+    assert calls == ["a", "b"]
+    assert coalesced == {"deck": 1}
+
+
+def test_coalesce_caller_gives_up():
+    """Test that a caller giving up does not cancel the request for the others"""
+
+    async def main():
+        coalescer = Coalescer()
+
+        async def request():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(coalescer.run("deck", "a", request))
+        second = asyncio.create_task(coalescer.run("deck", "a", request))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+class SlowCommand(BaseCommand):
+    """Returns the parameters after a while"""
+
+    coalesce = True
+
+    def __init__(self, command):
+        super().__init__(command)
+        self.calls = 0
+
+    async def get_content_async(self, msg, parameters) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return " ".join(parameters)
+
+
+def test_client_limits_and_coalesces():
+    """Test that the client rejects limited requests and shares identical ones"""
+    client = DiscordClient()
+    command = SlowCommand(["deck", "d"])
+    client.commands = CommandRegistry([command])
+    client.config = {"command_timeout": 5, "command_prefix": "!"}
+    client.limiter.configure({"deck": {"user": [2, 60]}})
+
+    def message(user):
+        return SimpleNamespace(author=SimpleNamespace(id=user), guild=None)
+
+    async def main():
+        return await asyncio.gather(
+            client.invoke_command("deck", message(1), ["abc"]),
+            client.invoke_command("d", message(2), ["abc"]),
+            client.invoke_command("deck", message(1), ["xyz"]),
+            client.invoke_command("deck", message(1), ["abc"]),
+        )
+
+    results = asyncio.run(main())
+
+    assert results[:3] == ["abc", "abc", "xyz"]
+    assert results[3] == "You are using ```!deck``` too often, try again in 30 seconds."
+    assert command.calls == 2
+    assert client.request_stats() == {
+        "allowed": {"deck": 3},
+        "rejected": {"deck": 1},
+        "coalesced": {"deck": 1},
+    }
+    client._executor.shutdown()
+
+
+def test_coalesce_keys():
+    """Test that requests only share results when their content would be the same"""
+    deck = DeckCommand(["deck"], None)
+    dm = SimpleNamespace(channel=DMChannel.__new__(DMChannel))
+    guild = SimpleNamespace(channel=SimpleNamespace())
+
+    assert deck.coalesce_key(dm, ["abc"]) != deck.coalesce_key(guild, ["abc"])
+    assert deck.coalesce_key(guild, ["abc"]) == deck.coalesce_key(guild, ["abc"])
+
+    cimg = CimgCommand(["cimg"], None, None)
+    assert cimg.coalesce_key(guild, ["Forge"]) == cimg.coalesce_key(dm, ["forge"])
@@ -0,0 +1,147 @@
+import asyncio
+import json
+import os
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+import src.reload as reload
+from src.catalog import set_catalog
+from src.commands.reload import ReloadCommand
+from src.discord_client import DiscordClient
+
+CARDS = [
+    {
+        "name": "Apprentice Wizard",
+        "guardian": {"rarity": "Ordinary", "type": "Minion"},
+        "sets": [{"name": "Beta"}],
+    },
+    {
+        "name": "Forge",
+        "guardian": {"rarity": "Ordinary", "type": "Site"},
+        "sets": [{"name": "Beta"}],
+    },
+]
+
+
+def write_cards(path, cards):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cards, f)
+
+
+@pytest.fixture
+def data_files(tmp_path, monkeypatch):
+    """Copies the bot data files into a temporary directory"""
+    paths = {
+        "CARDS_PATH": tmp_path / "cards.json",
+        "TERMS_PATH": tmp_path / "terms.toml",
+        "CONFIG_PATH": tmp_path / "config.toml",
+    }
+    write_cards(paths["CARDS_PATH"], CARDS)
+    shutil.copy("data/terms.toml", paths["TERMS_PATH"])
+    shutil.copy("data/config.toml", paths["CONFIG_PATH"])
+
+    for name, path in paths.items():
+        monkeypatch.setattr(reload, name, path)
+    return SimpleNamespace(**{k.split("_")[0].lower(): v for k, v in paths.items()})
+
+
+def test_load_state_incremental(data_files):
+    """Test that unchanged parts of the previous state are reused"""
+    state, summary = reload.load_state()
+    assert summary == "2 cards"
+
+    cards = [dict(CARDS[0], sets=[{"name": "Alpha"}]), CARDS[1]]
+    write_cards(data_files.cards, cards)
+    changed, summary = reload.load_state(state)
+
+    assert summary == "0 cards added, 1 changed, 0 removed"
+    assert changed.catalog.get_by_set("alpha")[0]["name"] == "Apprentice Wizard"
+    assert changed.prefix_tree is state.prefix_tree
+    assert changed.scanner is state.scanner
+
+    write_cards(data_files.cards, cards + [dict(CARDS[1], name="Blink")])
+    added, summary = reload.load_state(changed)
+
+    assert summary == "1 cards added, 0 changed, 0 removed"
+    assert added.prefix_tree.find("blink")
+    assert not changed.prefix_tree.find("blink")
+
+
+def test_load_state_patterns(data_files):
+    """Test that the message scanner is rebuilt when its patterns change"""
+    state, _ = reload.load_state()
+
+    config = data_files.config.read_text(encoding="utf-8")
+    config = config.replace(
+        "cimg_regex = '''\\[!(.*?)\\]'''", "cimg_regex = '''\\{!(.*?)\\}'''"
+    )
+    data_files.config.write_text(config, encoding="utf-8")
+
+    reloaded, summary = reload.load_state(state)
+    assert summary.endswith("config changed")
+    assert reloaded.scanner.scan("{!forge}")[0].name == "forge"
+
+
+def test_file_watcher(data_files):
+    """Test that changed files are reported once"""
+    watcher = reload.FileWatcher([data_files.cards, data_files.terms])
+
+    stat = os.stat(data_files.cards)
+    os.utime(data_files.cards, (stat.st_atime, stat.st_mtime + 10))
+
+    assert watcher.changed() == [data_files.cards]
+    assert watcher.changed() == []
+
+
+def test_client_reload(data_files):
+    """Test that reloading swaps the catalog and commands of the client"""
+    client = DiscordClient()
+    state, _ = reload.load_state()
+    client.apply_state(state, client.build_commands(state))
+    commands = client.commands
+
+    write_cards(data_files.cards, CARDS[:1])
+    content = asyncio.run(client.reload())
+
+    assert content.endswith("0 cards added, 0 changed, 1 removed.")
+    assert "forge" not in client.catalog
+    assert client.commands is not commands
+
+    client._executor.shutdown()
+    set_catalog(None)
+
+
+def test_client_jobs(data_files):
+    """Test that the file watcher job follows reload_watch_interval across reloads"""
+    client = DiscordClient()
+    state, _ = reload.load_state()
+    client.apply_state(state, client.build_commands(state))
+    assert set(client.scheduler.jobs) == {"presence", "prune_replies"}
+
+    config = data_files.config.read_text(encoding="utf-8")
+    config = config.replace("reload_watch_interval = 0", "reload_watch_interval = 5")
+    data_files.config.write_text(config, encoding="utf-8")
+    asyncio.run(client.reload())
+    assert client.scheduler.jobs["watch_files"].interval == 5
+
+    client._executor.shutdown()
+    set_catalog(None)
+
+
+def test_reload_command_maintainers():
+    """Test that only maintainers can reload"""
+
+    async def reload_bot():
+        return "Reloaded"
+
+    command = ReloadCommand(["reload"], reload_bot, [1])
+
+    def message(user_id):
+        return SimpleNamespace(author=SimpleNamespace(id=user_id))
+
+    assert asyncio.run(command.invoke(message(1), [])) == "Reloaded"
+    assert asyncio.run(command.invoke(message(2), [])) == (
+        "Only maintainers can reload the bot."
+    )
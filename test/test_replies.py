@@ -0,0 +1,91 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.discord_client import DiscordClient
+from src.replies import Reply, ReplyTracker
+
+
+def test_add_and_get():
+    """Test that several replies to a message are tracked with their kinds"""
+    replies = ReplyTracker()
+    replies.add(1, 10, "command")
+    replies.add(1, 11, "regex")
+    replies.add(2, 20)
+
+    assert replies.get(1) == [Reply(10, "command"), Reply(11, "regex")]
+    assert replies.get(2) == [Reply(20, "command")]
+    assert replies.get(3) == []
+    assert len(replies) == 2
+
+
+def test_expiry(clock):
+    """Test that messages expire in the order they were first replied to"""
+    replies = ReplyTracker(ttl=30, clock=clock)
+
+    replies.add(1, 10)
+    clock.now = 10
+    replies.add(2, 20)
+
+    clock.now = 30
+    assert replies.get(1) == []
+    assert replies.get(2) == [Reply(20, "command")]
+
+    assert replies.prune() == 1
+    assert len(replies) == 1
+
+    clock.now = 40
+    assert replies.prune() == 1
+    assert len(replies) == 0
+    assert replies.expired == 2
+
+
+def test_max_size():
+    """Test that the oldest messages are dropped when the tracker is full"""
+    replies = ReplyTracker(max_size=3)
+    for i in range(5):
+        replies.add(i, i + 100)
+
+    assert len(replies) == 3
+    assert replies.get(0) == []
+    assert replies.get(4) == [Reply(104, "command")]
+    assert replies.evictions == 2
+
+    replies.configure(ttl=30, max_size=1)
+    assert len(replies) == 1
+    assert replies.get(4) == [Reply(104, "command")]
+
+
+def test_client_edits_replies():
+    """Test that editing a message edits each reply with the content of its kind"""
+    client = DiscordClient()
+    edits = {}
+
+    class FakeReply:
+        def __init__(self, id):
+            self.id = id
+
+        async def edit(self, **kwargs):
+            edits[self.id] = kwargs["content"]
+
+    async def fetch_message(id):
+        return FakeReply(id)
+
+    async def handle_command(msg):
+        return f"command: {msg.content}"
+
+    async def handle_regex(msg):
+        return None
+
+    client.handle_command = handle_command
+    client.handle_regex = handle_regex
+
+    channel = SimpleNamespace(fetch_message=fetch_message)
+    before = SimpleNamespace(id=1, author="user", channel=channel)
+    after = SimpleNamespace(id=1, content="!card forge", channel=channel)
+
+    client.replies.add(1, 10, "command")
+    client.replies.add(1, 11, "regex")
+    asyncio.run(client.on_message_edit(before, after))
+
+    # The edited message has no card references left, so the regex reply is kept.
+    assert edits == {10: "command: !card forge"}
@@ -0,0 +1,54 @@
+import pytest
+
+from src.scanner import CardReference, MessageScanner
+
+
+@pytest.fixture
+def scanner():
+    """Sets up a scanner with the default patterns from config.toml"""
+    return MessageScanner(r"\[!(.*?)\]", r"\[\[!(.*?)\]\]")
+
+
+def test_scan_kinds(scanner):
+    """Test that card text and card image references are told apart"""
+    assert scanner.scan("I was thinking of adding [!abundance] to my deck.") == [
+        CardReference("cimg", "abundance")
+    ]
+    assert scanner.scan("What does [[!apprentice wizard]] do?") == [
+        CardReference("card", "apprentice wizard")
+    ]
+
+
+def test_scan_multiple(scanner):
+    """Test that all references are returned in the order they appear"""
+    references = scanner.scan("[[!Blink]] or [!Wills-o'-the-Wisp] and [[!forge]]")
+
+    assert references == [
+        CardReference("card", "Blink"),
+        CardReference("cimg", "Wills-o'-the-Wisp"),
+        CardReference("card", "forge"),
+    ]
+
+
+def test_scan_no_references(scanner):
+    """Test that messages without references return nothing"""
+    assert scanner.scan("he[llo] world") == []
+    assert scanner.scan("!card abundance") == []
+
+
+def test_resolve(scanner):
+    """Test that resolving converts names to URL form and drops unknown cards"""
+    names = {"blink", "wills_o_the_wisp"}
+    references = scanner.scan("[[!Blink]] [!Wills-o'-the-Wisp] [!not a card]")
+
+    assert scanner.resolve(references, names) == ["blink", "wills_o_the_wisp"]
+
+
+def test_custom_patterns():
+    """Test that the first group of custom patterns is used as the card name"""
+    scanner = MessageScanner(r"\{(!)?(.*?)\}", r"<<(.*?)>>")
+
+    assert scanner.scan("{!abundance} <<blink>>") == [
+        CardReference("cimg", "!"),
+        CardReference("card", "blink"),
+    ]
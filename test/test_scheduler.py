@@ -0,0 +1,104 @@
+import asyncio
+import random
+
+from src.scheduler import Job, Scheduler
+
+
+def test_runs_periodically():
+    """Test that jobs run at their interval and immediate jobs also run on start"""
+    calls = []
+
+    async def main():
+        scheduler = Scheduler()
+        scheduler.add("sync", lambda: calls.append("sync"), 0.01)
+
+        async def job():
+            calls.append("async")
+
+        scheduler.add("async", job, 10, immediate=True)
+        scheduler.start()
+        await asyncio.sleep(0.055)
+        await scheduler.close()
+        return scheduler.metrics()
+
+    metrics = asyncio.run(main())
+
+    assert calls.count("async") == 1
+    assert 3 <= calls.count("sync") <= 6
+    assert metrics["sync"]["runs"] == calls.count("sync")
+    assert metrics["async"]["runs"] == 1
+
+
+def test_no_duplicate_loops():
+    """Test that starting again or adding a job again does not start a second loop"""
+    calls = []
+
+    async def main():
+        scheduler = Scheduler()
+        job = scheduler.add("job", lambda: calls.append(1), 0.01)
+        scheduler.start()
+        task = job.task
+
+        # Like on_ready after a reconnect and apply_state after a reload.
+        scheduler.start()
+        assert scheduler.add("job", lambda: calls.append(2), 0.01) is job
+        assert job.task is task
+
+        await asyncio.sleep(0.035)
+        await scheduler.close()
+        assert task.cancelled()
+
+    asyncio.run(main())
+
+    assert 2 <= len(calls) <= 4
+    # The loop picks up the updated function.
+    assert set(calls) == {2}
+
+
+def test_remove():
+    """Test that a job with an interval of 0 is removed and its loop cancelled"""
+
+    async def main():
+        scheduler = Scheduler()
+        job = scheduler.add("job", lambda: None, 1)
+        scheduler.start()
+
+        assert scheduler.add("job", lambda: None, 0) is None
+        assert "job" not in scheduler.jobs
+        await asyncio.sleep(0)
+        assert job.task.cancelled()
+
+    asyncio.run(main())
+
+
+def test_failures():
+    """Test that a failing job is recorded and keeps running"""
+
+    def fail():
+        raise ValueError("broken")
+
+    async def main():
+        scheduler = Scheduler()
+        job = scheduler.add("job", fail, 0.01, immediate=True)
+        scheduler.start()
+        await asyncio.sleep(0.025)
+        await scheduler.close()
+        return job
+
+    job = asyncio.run(main())
+
+    assert job.runs >= 2
+    assert job.failures == job.runs
+    assert job.metrics()["last_error"] == "ValueError('broken')"
+
+
+def test_jitter():
+    """Test that delays are spread by at most jitter times the interval"""
+    scheduler = Scheduler(random.Random(0))
+    job = Job("job", lambda: None, 100, jitter=0.1)
+
+    delays = [scheduler.delay(job) for _ in range(200)]
+    assert all(90 <= d <= 110 for d in delays)
+    assert len(set(delays)) > 1
+
+    assert scheduler.delay(Job("exact", lambda: None, 5)) == 5
@@ -0,0 +1,92 @@
+import json
+import os
+import shutil
+
+import pytest
+
+import src.snapshot as snapshot
+from src.snapshot import load_card_index, read_snapshot, snapshot_path
+
+TEST_CARDS_PATH = "test/resources/cards.json"
+
+
+@pytest.fixture
+def cards_path(tmp_path):
+    """Copies the test cards into a temporary directory"""
+    path = tmp_path / "cards.json"
+    shutil.copy(TEST_CARDS_PATH, path)
+    return path
+
+
+def test_round_trip(cards_path):
+    """Test that the catalog and prefix tree loaded from a snapshot match a fresh build"""
+    catalog, prefix_tree = load_card_index(cards_path)
+    assert snapshot_path(cards_path).exists()
+
+    loaded = read_snapshot(cards_path)
+    assert loaded is not None
+
+    loaded_catalog, loaded_tree = loaded
+    assert loaded_catalog.names() == catalog.names()
+    assert loaded_catalog.get("apprentice_wizard") == catalog.get("apprentice_wizard")
+    assert loaded_tree.starts_with("appr") == prefix_tree.starts_with("appr")
+    assert loaded_tree.fuzzy_match("aprentice wizrd") == prefix_tree.fuzzy_match(
+        "aprentice wizrd"
+    )
+
+
+def test_stale_snapshot(cards_path):
+    """Test that a snapshot is not used after cards.json changes"""
+    load_card_index(cards_path)
+
+    with open(cards_path, "r", encoding="utf-8") as f:
+        cards = json.load(f)
+    cards.append(
+        {
+            "name": "Autumn River",
+            "guardian": {"rarity": "Ordinary", "type": "Site"},
+            "sets": [{"name": "Beta"}],
+        }
+    )
+    with open(cards_path, "w", encoding="utf-8") as f:
+        json.dump(cards, f)
+
+    assert read_snapshot(cards_path) is None
+
+    catalog, prefix_tree = load_card_index(cards_path)
+    assert "autumn_river" in catalog
+    assert prefix_tree.find("autumn_river")
+    assert read_snapshot(cards_path) is not None
+
+
+def test_version_mismatch(cards_path, monkeypatch):
+    """Test that snapshots written by another version are ignored"""
+    load_card_index(cards_path)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_VERSION", snapshot.SNAPSHOT_VERSION + 1)
+
+    assert read_snapshot(cards_path) is None
+
+
+def test_corrupt_snapshot(cards_path):
+    """Test that a snapshot that cannot be read is rebuilt"""
+    load_card_index(cards_path)
+    snapshot_path(cards_path).write_bytes(b"not a pickle")
+
+    assert read_snapshot(cards_path) is None
+
+    catalog, _ = load_card_index(cards_path)
+    assert "apprentice_wizard" in catalog
+    assert read_snapshot(cards_path) is not None
+
+
+def test_unwritable_snapshot(cards_path, monkeypatch):
+    """Test that the card index is still returned if the snapshot cannot be written"""
+
+    def fail(*args):
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(snapshot, "write_snapshot", fail)
+
+    catalog, _ = load_card_index(cards_path)
+    assert "apprentice_wizard" in catalog
+    assert not os.path.exists(snapshot_path(cards_path))
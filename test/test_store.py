@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from src.store import DiskStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DiskStore(tmp_path / "cache.sqlite3", max_bytes=100, max_age={"deck": 60})
+    yield store
+    store.close()
+
+
+def test_put_get(store):
+    """Test that stored values are returned as they were stored"""
+    store.put("faq", "blink", [{"question": "Q", "answer": "A"}])
+
+    assert store.get("faq", "blink") == [{"question": "Q", "answer": "A"}]
+    assert store.get("deck", "blink") is None
+
+    store.delete("faq", "blink")
+    assert store.get("faq", "blink") is None
+
+
+def test_persistence(tmp_path):
+    """Test that entries survive reopening the store"""
+    path = tmp_path / "data" / "cache.sqlite3"
+    store = DiskStore(path)
+    store.put("deck", "abc", {"Avatar": [["Druid", "1"]]})
+    store.close()
+
+    store = DiskStore(path)
+    assert store.get("deck", "abc") == {"Avatar": [["Druid", "1"]]}
+    store.close()
+
+
+def test_max_age(store):
+    """Test that entries older than the max age of their namespace are not returned"""
+    store.put("deck", "old", "deck", fetched_at=time.time() - 120)
+    store.put("deck", "new", "deck")
+    store.put("faq", "old", "faq", fetched_at=time.time() - 120)
+
+    assert store.get("deck", "old") is None
+    assert store.get("deck", "new") == "deck"
+    assert store.get("faq", "old") == "faq"
+    assert [(key, value) for key, value, _ in store.recent("deck", 10)] == [
+        ("new", "deck")
+    ]
+
+
+def test_eviction(store):
+    """Test that the oldest entries are evicted once the store exceeds its size"""
+    for i in range(5):
+        store.put("faq", str(i), "x" * 30, fetched_at=1000 + i)
+
+    stats = store.stats()
+    assert stats["bytes"] <= 100
+    assert stats["evictions"] == 2
+    assert [key for key, _, _ in store.recent("faq", 10)] == ["4", "3", "2"]
@@ -57,7 +57,31 @@ def test_starts_with(trie):
     """Tests that starts_with function gives correct suffixes"""
     trie.insert("wordz")
     assert trie.starts_with("te") == ["test"]
-    assert trie.starts_with("word") == ["wordz", "words"]
+    assert trie.starts_with("word") == ["words", "wordz"]
+
+
+def test_starts_with_limit(trie):
+    """Tests that starts_with only returns the first words in alphabetical order"""
+    trie.insert_all(["wordz", "word", "worda", "wordy"])
+    assert trie.starts_with("wor", limit=2) == ["word", "worda"]
+    assert trie.starts_with("w", limit=10) == [
+        "word",
+        "worda",
+        "words",
+        "wordy",
+        "wordz",
+    ]
+    assert trie.starts_with("te", limit=0) == []
+    assert trie.starts_with("x", limit=1) is None
+
+
+def test_iter_prefix_is_lazy(trie):
+    """Tests that iter_prefix produces words one at a time"""
+    trie.insert_all(["wordz", "worda"])
+    words = trie.iter_prefix("")
+    assert next(words) == "test"
+    assert next(words) == "worda"
+    assert trie.iter_prefix("nope") is None
 
 
 def test_fuzzy_match(trie):
@@ -65,3 +89,18 @@ def test_fuzzy_match(trie):
     trie.insert_all(["this_is_a_test_sentence"])
     assert trie.fuzzy_match("dis_is_a_test_sentence")[1] == "this_is_a_test_sentence"
     assert trie.fuzzy_match("low_ratio") is None
+
+
+def test_subtree_counts(trie):
+    """Test that nodes keep count of the whole words in their subtree"""
+    trie.insert_all(["word", "wordz", "test"])
+    assert trie.root.count == 4
+    assert trie.root.child("w").count == 3
+    assert trie.root.child("t").count == 1
+
+
+def test_fuzzy_matches(trie):
+    """Test that fuzzy matches returns the top matches with their ratios"""
+    trie.insert_all(["wordz", "text"])
+    matches = trie.fuzzy_matches("tesd", limit=2)
+    assert [word for _, word in matches] == ["test", "text"]
@@ -1,6 +1,34 @@
+import hashlib
+import json
+import subprocess
+import sys
+from types import SimpleNamespace
+
 import pytest
 
 import src.util as util
+from src.catalog import CardCatalog, set_catalog
+
+# Records json files opened and network connections made while importing src.util.
+IMPORT_ACCOUNTING_SCRIPT = """
+import sys
+
+events = []
+
+
+def hook(event, args):
+    if event == "open" and str(args[0]).endswith(".json"):
+        events.append(f"{event}: {args[0]}")
+    elif event in ("socket.getaddrinfo", "socket.connect"):
+        events.append(f"{event}: {args[0]}")
+
+
+sys.addaudithook(hook)
+
+import src.util
+
+print("\\n".join(events))
+"""
 
 
 @pytest.fixture
@@ -53,3 +81,81 @@ def test_contains_regex():
 
     assert util.contains_regex(test_string, [r"\[(.*?)\]"])
     assert not util.contains_regex(test_string, [r"\[!(.*?)\]"])
+
+
+@pytest.fixture
+def injected_catalog():
+    """Injects a small in-memory catalog as the process-wide catalog"""
+    set_catalog(CardCatalog([{"name": "Abundance", "guardian": {}, "sets": []}]))
+    yield
+    set_catalog(None)
+
+
+def test_import_does_not_load_cards():
+    """Test that importing src.util does not read cards.json or open sockets"""
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_ACCOUNTING_SCRIPT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    assert result.stdout.strip() == ""
+
+
+def test_get_card_entry_uses_catalog(injected_catalog):
+    """Test that get_card_entry falls back to the process-wide catalog"""
+    assert util.get_card_entry("abundance")["name"] == "Abundance"
+    assert util.get_card_entry("apprentice wizard") is None
+
+
+@pytest.fixture
+def cards_api(stub_server, http_client):
+    """Serves card data with an ETag, answering 304 when it has not changed"""
+    api = SimpleNamespace(
+        body=json.dumps([{"name": "Forge"}, {"name": "Blink"}]).encode("utf-8"),
+        requests=[],
+    )
+
+    def route(handler):
+        api.requests.append(dict(handler.headers))
+        etag = '"' + hashlib.sha256(api.body).hexdigest() + '"'
+        if handler.headers.get("If-None-Match") == etag:
+            return (304, {"ETag": etag}, b"")
+        return (200, {"ETag": etag, "Content-Type": "application/json"}, api.body)
+
+    stub_server.routes["/api/cards"] = route
+    api.url = stub_server.url + "/api/cards"
+    return api
+
+
+def test_update_cards_json(cards_api, tmp_path):
+    """Test that card data is only downloaded again when it has changed"""
+    update = util.update_cards_json(str(tmp_path), cards_api.url)
+    assert update == ("updated", ("Forge", "Blink"), ())
+
+    assert util.update_cards_json(str(tmp_path), cards_api.url).status == "unchanged"
+    assert "If-None-Match" in cards_api.requests[1]
+
+    cards_api.body = json.dumps(
+        [{"name": "Forge", "cost": 0}, {"name": "Blink"}, {"name": "Pollimorph"}]
+    ).encode("utf-8")
+    update = util.update_cards_json(str(tmp_path), cards_api.url)
+
+    assert update == ("updated", ("Pollimorph",), ("Forge",))
+    assert util.load_cards(str(tmp_path / "cards.json"))[2]["name"] == "Pollimorph"
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_update_cards_json_invalid(cards_api, tmp_path):
+    """Test that invalid card data does not replace the previous cards.json"""
+    util.update_cards_json(str(tmp_path), cards_api.url)
+    previous = (tmp_path / "cards.json").read_bytes()
+
+    cards_api.body = b'[{"name": "Forge"'
+    assert util.update_cards_json(str(tmp_path), cards_api.url).status == "failed"
+    cards_api.body = b'{"name": "Forge"}'
+    assert not util.download_cards_json(str(tmp_path), cards_api.url)
+
+    assert (tmp_path / "cards.json").read_bytes() == previous
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []